@@ -0,0 +1,144 @@
+import numpy as np
+
+class AdaptiveOutput():
+    '''A description of how the states calculated at the output times are thinned out so that only those needed to follow the solution are kept
+    The power, mean temperatures and temperature of every discretisation are watched. A state is dropped if joining the states kept either side of it by straight lines passes within the tolerance of every watched value of it, and of every other state dropped between them
+    This is the swinging door compression of process historians: a long plateau or steady ramp keeps only its ends, while a sudden spike keeps every state needed to draw it, so the output timestep can be made fine enough to resolve the fastest transient without storing every state
+    The tolerance of each value is atol + rtol * |value|, where the absolute tolerance of the power is in W and those of the temperatures are in K'''
+    def __init__(self, rtol=1e-3, atol_power=0.0, atol_temperature=0.0, max_interval=None):
+        '''Constructs the description of the adaptive output
+        self -- The instance of AdaptiveOutput being constructed (AdaptiveOutput)
+        rtol -- The tolerance of each watched value relative to its size (default 1e-3)(float)
+        atol_power -- The absolute tolerance of the power (W)(default 0.0)(float)
+        atol_temperature -- The absolute tolerance of the mean temperatures and the temperature of each discretisation (K)(default 0.0)(float)
+        max_interval -- The longest time between states which are kept, or None for no limit (s)(default None)(float)'''
+
+        # If the tolerances are negative, or all zero so that nothing could be dropped, or the interval isn't positive raise an exception
+        if rtol < 0 or atol_power < 0 or atol_temperature < 0:
+            raise ValueError("The output tolerances must not be negative, not {}, {} and {}.".format(rtol, atol_power, atol_temperature))
+        if rtol == 0 and atol_power == 0 and atol_temperature == 0:
+            raise ValueError("At least one of the output tolerances must be positive.")
+        if max_interval is not None and max_interval <= 0:
+            raise ValueError("The longest interval between outputs must be positive, not {}.".format(max_interval))
+
+        self._rtol = rtol
+        self._atol_power = atol_power
+        self._atol_temperature = atol_temperature
+        self._max_interval = max_interval
+
+    @property
+    def rtol(self):
+        ''' Returns the relative tolerance of the watched values
+        self -- The adaptive output the value is being returned from (AdaptiveOutput)
+        [return] -- The relative tolerance (float)'''
+        return(self._rtol)
+
+    @property
+    def max_interval(self):
+        ''' Returns the longest time between states which are kept
+        self -- The adaptive output the value is being returned from (AdaptiveOutput)
+        [return] -- The longest interval, or None for no limit (s)(float)'''
+        return(self._max_interval)
+
+    def __repr__(self):
+        '''Returns a string describing the adaptive output and its parameters, used to identify the problem specification it belongs to
+        self -- The adaptive output being described (AdaptiveOutput)
+        [return] -- The construction of the adaptive output (str)'''
+        return("AdaptiveOutput({!r}, {!r}, {!r}, {!r})".format(self._rtol, self._atol_power, self._atol_temperature, self._max_interval))
+
+    def watched_values(self, problem_specification, arrays):
+        '''Calculates the values which are watched and their absolute tolerances
+        self -- The adaptive output being used (AdaptiveOutput)
+        problem_specification -- The specification of the system (ProblemSpecification)
+        arrays -- The full state arrays, one row per time (np.array[float])
+        [return] -- The power, mean temperatures and temperatures, one row per time, and the absolute tolerance of each column (np.array[float], np.array[float])'''
+
+        n_delayed = problem_specification.n_delayed
+        n_temperatures = problem_specification.n_temperatures
+        t_fuel = arrays[:, n_delayed + 1:n_delayed + n_temperatures + 1]
+        t_coolant = arrays[:, n_delayed + n_temperatures + 1:]
+        shape = (len(arrays),) + problem_specification.temperature_shape
+
+        power = arrays[:, :1] * problem_specification.energy_fission / problem_specification.generation_time
+        t_fuel_mean = problem_specification.mean_temperature(t_fuel.reshape(shape))
+        t_coolant_mean = problem_specification.mean_temperature(t_coolant.reshape(shape))
+
+        values = np.column_stack([power, t_fuel_mean, t_coolant_mean, t_fuel, t_coolant])
+        atol = np.full(values.shape[1], self._atol_temperature)
+        atol[0] = self._atol_power
+
+        return(values, atol)
+
+    def decimate(self, problem_specification, chunks):
+        '''Thins out the states calculated at the output times as they are calculated, keeping the first and last states and those needed to follow the solution to within the tolerances
+        self -- The adaptive output being used (AdaptiveOutput)
+        problem_specification -- The specification of the system (ProblemSpecification)
+        chunks -- The times and full state arrays in order of time, in chunks (iterator[(np.array[float], np.array[float])])
+        [return] -- The times and states which are kept, in chunks, some of which may be empty (iterator[(np.array[float], np.array[float])])'''
+
+        # The last state kept, which every line starts from, and the range of slopes from it which pass within the tolerance of every state since
+        anchor_time = None
+        anchor_values = None
+        lower = None
+        upper = None
+
+        # The last state seen, which is kept when the line to a new state would stray from the ones between
+        previous = None
+
+        for times, arrays in chunks:
+            if len(times) == 0:
+                continue
+
+            values, atol = self.watched_values(problem_specification, arrays)
+            kept = []
+            i_time = 0
+
+            if anchor_time is None:
+                anchor_time, anchor_values = times[0], values[0]
+                lower = np.full(values.shape[1], -np.inf)
+                upper = np.full(values.shape[1], np.inf)
+                previous = (times[0], values[0], arrays[0].copy())
+                kept.append(0)
+                i_time = 1
+
+            while i_time < len(times):
+                # The slope from the anchor to each later state, and the range of slopes which pass within the tolerance of it
+                intervals = (times[i_time:] - anchor_time)[:, None]
+                tolerances = atol + self._rtol * np.abs(values[i_time:])
+                slopes = (values[i_time:] - anchor_values) / intervals
+                lowers = np.maximum.accumulate(np.vstack([lower, (values[i_time:] - tolerances - anchor_values) / intervals]), axis=0)
+                uppers = np.minimum.accumulate(np.vstack([upper, (values[i_time:] + tolerances - anchor_values) / intervals]), axis=0)
+
+                # A state can't be reached from the anchor without straying from a state between if its slope is outside the range of those before it
+                strays = np.any((slopes < lowers[:-1]) | (slopes > uppers[:-1]), axis=1)
+                if self._max_interval is not None:
+                    strays |= intervals[:, 0] > self._max_interval
+                # The state straight after the anchor never strays, so the anchor always moves on
+                if anchor_time == previous[0]:
+                    strays[0] = False
+
+                if not np.any(strays):
+                    lower, upper = lowers[-1], uppers[-1]
+                    previous = (times[-1], values[-1], arrays[-1].copy())
+                    break
+
+                # The state before the first which strays is kept and becomes the anchor
+                i_stray = int(np.argmax(strays))
+                if i_stray > 0:
+                    previous = (times[i_time + i_stray - 1], values[i_time + i_stray - 1], arrays[i_time + i_stray - 1])
+                    kept.append(i_time + i_stray - 1)
+                    i_time += i_stray
+                    anchor_time, anchor_values = previous[0], previous[1]
+                else:
+                    # The state to be kept is the last of the previous chunk
+                    yield np.array([previous[0]]), previous[2][None, :].copy()
+                    anchor_time, anchor_values = previous[0], previous[1]
+                lower = np.full(values.shape[1], -np.inf)
+                upper = np.full(values.shape[1], np.inf)
+
+            kept = np.array(kept, dtype=int)
+            yield times[kept], arrays[kept]
+
+        # The last state of all is always kept
+        if previous is not None and previous[0] != anchor_time:
+            yield np.array([previous[0]]), previous[2][None, :].copy()
@@ -0,0 +1,25 @@
+import numpy as np
+
+def uniform_boundaries(n_z, total_height):
+    '''Calculates the boundaries of discretisations of equal height
+    n_z -- The number of discretisations (int)
+    total_height -- The total height of the simulated domain (m)(float)
+    [return] -- The n_z + 1 boundary heights from the bottom to the top (m)(np.array[float])'''
+    return(np.linspace(0, total_height, n_z + 1))
+
+def geometric_boundaries(n_z, total_height, grading):
+    '''Calculates the boundaries of discretisations whose heights change by the same ratio from each discretisation to the one above it
+    n_z -- The number of discretisations (int)
+    total_height -- The total height of the simulated domain (m)(float)
+    grading -- The height of the top discretisation divided by the height of the bottom one, so less than 1 refines the top and more than 1 the bottom (float)
+    [return] -- The n_z + 1 boundary heights from the bottom to the top (m)(np.array[float])'''
+
+    # If the grading doesn't give positive heights raise an exception
+    if grading <= 0:
+        raise ValueError("The axial grading must be positive, not {}.".format(grading))
+    if n_z == 1:
+        return(uniform_boundaries(n_z, total_height))
+
+    cell_heights = grading ** (np.arange(n_z) / (n_z - 1))
+    boundaries = np.concatenate([[0], np.cumsum(cell_heights)])
+    return(boundaries * total_height / boundaries[-1])
@@ -0,0 +1,315 @@
+from input_reader import read_lines, apply_overrides, parse_input
+from derivative import derivative
+from compiled_derivative import CompiledDerivative
+from jacobian import Jacobian
+import multiprocessing
+import numpy as np
+import argparse
+import datetime
+import json
+import os
+import platform
+import resource
+import scipy
+import sys
+import time
+
+# The input the synthetic inputs of the benchmarks are generated from
+sample_input_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Inputs", "sample_input1.txt")
+
+# The delayed neutron fractions and decay rates (1/s) of each number of precursor groups, all with the total fraction of the sample input
+# The single group has the decay rate which gives the same mean delay as the six groups of the sample input and the eight groups have the relative abundances and decay rates of the JEFF-3.1 groups of U-235
+delayed_groups = {1: ([0.0066], [0.0066 / (0.0003 / 0.03 + 0.001 / 0.03 + 0.001 / 0.1 + 0.003 / 0.3 + 0.001 / 1 + 0.0003 / 10)]),
+                  6: ([0.0003, 0.001, 0.001, 0.003, 0.001, 0.0003], [0.03, 0.03, 0.1, 0.3, 1, 10]),
+                  8: ([0.0066 * fraction for fraction in [0.034, 0.150, 0.099, 0.203, 0.312, 0.094, 0.086, 0.022]], [0.0125, 0.0283, 0.0425, 0.133, 0.292, 0.666, 1.635, 3.555])}
+
+# The sizes of the benchmarks. The rate of change is timed on larger meshes than are solved, since the solve time grows much faster with the mesh
+grids = {"quick": {"rhs_n_z": [10, 1000, 100000], "rhs_n_channels": [100], "solve_n_z": [10], "n_delayed": [6], "reactivities": ["constant", "ramp", "piecewise"], "solvers": ["odeint", "BDF"]},
+         "standard": {"rhs_n_z": [10, 100, 1000, 10000, 100000], "rhs_n_channels": [10, 100, 1000], "solve_n_z": [10, 30, 100], "n_delayed": [1, 6, 8], "reactivities": ["constant", "ramp", "piecewise"], "solvers": ["odeint", "BDF", "multirate"]}}
+
+# The number of discretisations in each channel when timing the rate of change of a core with several channels
+channel_n_z = 100
+
+# The longest a benchmark is waited for at a time before checking whether its process has ended (s)
+poll_interval = 0.5
+
+# The metrics compared between runs, all of which are better when smaller
+compared_metrics = ("us_per_derivative", "us_per_compiled_derivative", "us_per_jacobian", "wall_time", "peak_rss_mb", "nfev", "njev")
+
+def make_reactivity_words(reactivity, simulated_time):
+    '''Makes the words following "reactivity" in a synthetic input
+    reactivity -- The type of reactivity profile, "constant", "ramp" or "piecewise" (str)
+    simulated_time -- The simulated time (s)(float)
+    [return] -- The words of the reactivity profile ([str])'''
+
+    if reactivity == "constant":
+        return(["constant", "0.5"])
+    elif reactivity == "ramp":
+        return(["ramp", "1", "2", "0", "1"])
+
+    # A rod withdrawal in 50 sudden steps up to $0.9, which gives the solver 50 breakpoints
+    words = ["piecewise", "0", "0"]
+    for i_step in range(1, 51):
+        step_time = simulated_time * i_step / 51
+        words += [str(step_time), str(0.9 * (i_step - 1) / 50), str(step_time), str(0.9 * i_step / 50)]
+    return(words)
+
+def make_specification(n_z, n_delayed, reactivity="ramp", solver="odeint", simulated_time=20, n_channels=1):
+    '''Makes the specification of a synthetic problem from the sample input, with the mesh, precursor groups, reactivity profile and solver replaced
+    n_z -- The number of discretisations (int)
+    n_delayed -- The number of delayed neutron precursor groups, 1, 6 or 8 (int)
+    reactivity -- The type of reactivity profile, "constant", "ramp" or "piecewise" (default "ramp")(str)
+    solver -- The name of the solver (default "odeint")(str)
+    simulated_time -- The simulated time (default 20)(s)(float)
+    n_channels -- The number of channels making up the core (default 1)(int)
+    [return] -- The specification of the problem (ProblemSpecification)'''
+
+    betas, lambdas = delayed_groups[n_delayed]
+    split_lines = [line for line in read_lines(sample_input_path) if line and not line[0].startswith("delayed_") and line[0] not in ("n_delayed", "reactivity")]
+    split_lines += [["n_delayed", str(n_delayed)],
+                    ["delayed_fractions"] + [str(beta) for beta in betas],
+                    ["delayed_decay_rates"] + [str(decay_rate) for decay_rate in lambdas],
+                    ["reactivity"] + make_reactivity_words(reactivity, simulated_time)]
+
+    return(parse_input(apply_overrides(split_lines, {"n_z": n_z, "simulated_time": simulated_time, "solver": solver, "n_channels": n_channels})))
+
+def time_per_call(function, min_time=0.1, repeats=3):
+    '''Times a function by calling it repeatedly, taking the fastest of several repeats to reduce the effect of other processes
+    function -- The function being timed (function())
+    min_time -- The shortest time each repeat is run for (default 0.1)(s)(float)
+    repeats -- The number of repeats (default 3)(int)
+    [return] -- The time per call (us)(float)'''
+
+    # Find how many calls take at least the minimum time
+    n_calls = 1
+    while True:
+        start = time.perf_counter()
+        for i_call in range(n_calls):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        n_calls *= 2
+
+    best = elapsed
+    for i_repeat in range(repeats - 1):
+        start = time.perf_counter()
+        for i_call in range(n_calls):
+            function()
+        best = min(best, time.perf_counter() - start)
+
+    return(1e6 * best / n_calls)
+
+def benchmark_rhs(n_z, n_delayed, n_channels=1):
+    '''Times a single calculation of the rate of change and of the Jacobian
+    n_z -- The number of discretisations (int)
+    n_delayed -- The number of delayed neutron precursor groups (int)
+    n_channels -- The number of channels making up the core (default 1)(int)
+    [return] -- The metrics of the benchmark ({str: float})'''
+
+    from nuclear_reactor import make_initial_state
+
+    problem_specification = make_specification(n_z, n_delayed, n_channels=n_channels)
+
+    # A warm reactor with some neutrons, so that no term of the rate of change is zero
+    state_array = make_initial_state(problem_specification).as_array
+    state_array[0] = 1e3
+    state_array[n_delayed + 1:] += np.linspace(0, 50, 2 * problem_specification.n_temperatures)
+
+    compiled = CompiledDerivative(problem_specification)
+    jacobian = Jacobian(problem_specification)
+
+    return({"us_per_derivative": time_per_call(lambda: derivative(state_array, 1.5, problem_specification)),
+            "us_per_compiled_derivative": time_per_call(lambda: compiled(state_array, 1.5)),
+            "us_per_jacobian": time_per_call(lambda: jacobian(state_array, 1.5))})
+
+def benchmark_solve(n_z, n_delayed, reactivity, solver):
+    '''Times the calculation of the future states of a problem
+    n_z -- The number of discretisations (int)
+    n_delayed -- The number of delayed neutron precursor groups (int)
+    reactivity -- The type of reactivity profile (str)
+    solver -- The name of the solver (str)
+    [return] -- The metrics of the benchmark ({str: float})'''
+
+    from nuclear_reactor import make_initial_state
+    from future_states import calculate_future_states
+
+    problem_specification = make_specification(n_z, n_delayed, reactivity, solver)
+    initial_state = make_initial_state(problem_specification)
+
+    start = time.perf_counter()
+    trajectory, statistics = calculate_future_states(initial_state, problem_specification, return_statistics=True)
+    wall_time = time.perf_counter() - start
+
+    return({"wall_time": wall_time, "nfev": statistics["nfev"], "njev": statistics["njev"], "n_steps": statistics["n_steps"], "final_power": float(trajectory.power[-1])})
+
+def _run_case(case, connection):
+    '''Runs a single benchmark in a fresh process and sends its metrics, including the peak memory of the process, back through a pipe
+    case -- The description of the benchmark ({str: value})
+    connection -- The end of the pipe the result is sent through (multiprocessing.connection.Connection)'''
+
+    try:
+        if case["kind"] == "rhs":
+            metrics = benchmark_rhs(case["n_z"], case["n_delayed"], case.get("n_channels", 1))
+        else:
+            metrics = benchmark_solve(case["n_z"], case["n_delayed"], case["reactivity"], case["solver"])
+        # ru_maxrss is in kilobytes on Linux
+        metrics["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        connection.send(("ok", metrics))
+    except Exception as error:
+        connection.send(("failed", repr(error)))
+
+def run_case(case, timeout):
+    '''Runs a single benchmark in its own process so that its peak memory is measured alone and a benchmark which doesn't finish can be stopped
+    case -- The description of the benchmark ({str: value})
+    timeout -- The longest the benchmark may run for (s)(float)
+    [return] -- The description of the benchmark with its status and either its metrics or the reason it failed ({str: value})'''
+
+    context = multiprocessing.get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_run_case, args=(case, sender))
+    process.start()
+
+    # Wait for the result in short intervals, so that a benchmark whose process dies without sending one, such as one killed for running out of memory, is reported as soon as it does
+    result = dict(case)
+    deadline = time.monotonic() + timeout
+    received = False
+    while not received and process.is_alive() and time.monotonic() < deadline:
+        received = receiver.poll(min(poll_interval, max(deadline - time.monotonic(), 0)))
+
+    # The process may have sent its result just before it ended
+    if received or receiver.poll(0):
+        status, value = receiver.recv()
+        result["status"] = status
+        result["metrics" if status == "ok" else "error"] = value
+    elif process.is_alive():
+        process.terminate()
+        result["status"] = "timeout"
+    else:
+        result["status"] = "crashed"
+        result["error"] = "The process ended with exit code {}.".format(process.exitcode)
+    process.join()
+
+    return(result)
+
+def make_cases(grid):
+    '''Makes the descriptions of every benchmark of a grid
+    grid -- The name of the grid, "quick" or "standard" (str)
+    [return] -- The descriptions of the benchmarks ([{str: value}])'''
+
+    sizes = grids[grid]
+    cases = []
+    for n_delayed in sizes["n_delayed"]:
+        for n_z in sizes["rhs_n_z"]:
+            cases.append({"kind": "rhs", "n_z": n_z, "n_delayed": n_delayed})
+        for n_channels in sizes["rhs_n_channels"]:
+            cases.append({"kind": "rhs", "n_z": channel_n_z, "n_delayed": n_delayed, "n_channels": n_channels})
+    for n_delayed in sizes["n_delayed"]:
+        for n_z in sizes["solve_n_z"]:
+            for reactivity in sizes["reactivities"]:
+                for solver in sizes["solvers"]:
+                    cases.append({"kind": "solve", "n_z": n_z, "n_delayed": n_delayed, "reactivity": reactivity, "solver": solver})
+    return(cases)
+
+def run_benchmarks(grid="standard", timeout=300, verbose=True):
+    '''Runs every benchmark of a grid
+    grid -- The name of the grid, "quick" or "standard" (default "standard")(str)
+    timeout -- The longest each benchmark may run for (default 300)(s)(float)
+    verbose -- Whether to print each result as it is found (default True)(bool)
+    [return] -- The results, with a description of the machine and versions they were found with ({str: value})'''
+
+    results = []
+    for case in make_cases(grid):
+        result = run_case(case, timeout)
+        results.append(result)
+        if verbose:
+            print(case_key(result), result["status"], result.get("metrics", result.get("error", "")))
+
+    metadata = {"grid": grid,
+                "date": datetime.datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "scipy": scipy.__version__,
+                "machine": platform.platform(),
+                "processor": platform.processor()}
+
+    return({"metadata": metadata, "results": results})
+
+def case_key(result):
+    '''Makes the key which identifies the same benchmark in different runs
+    result -- The result of the benchmark ({str: value})
+    [return] -- The key of the benchmark (str)'''
+    return(" ".join("{}={}".format(name, result[name]) for name in ("kind", "n_z", "n_channels", "n_delayed", "reactivity", "solver") if name in result))
+
+def compare_benchmarks(baseline, current, threshold=0.1):
+    '''Compares the results of two runs of the benchmarks, finding the metrics which have become worse by more than a fraction of their baseline value
+    baseline -- The results being compared against ({str: value})
+    current -- The new results ({str: value})
+    threshold -- The fraction by which a metric must increase to be a regression (default 0.1)(float)
+    [return] -- The regressions, each as the benchmark key, metric, baseline value and current value, and the benchmarks which ran in the baseline but not now ([(str, str, float, float)], [str])'''
+
+    baseline_results = {case_key(result): result for result in baseline["results"]}
+
+    regressions = []
+    failures = []
+    for result in current["results"]:
+        key = case_key(result)
+        if key not in baseline_results or baseline_results[key]["status"] != "ok":
+            continue
+        if result["status"] != "ok":
+            failures.append(key)
+            continue
+
+        for metric in compared_metrics:
+            old_value = baseline_results[key]["metrics"].get(metric)
+            new_value = result["metrics"].get(metric)
+            if old_value is None or new_value is None:
+                continue
+            if new_value > old_value * (1 + threshold):
+                regressions.append((key, metric, old_value, new_value))
+
+    return(regressions, failures)
+
+def main(arguments=None):
+    '''Runs the benchmarks or compares two runs of them from the command line
+    arguments -- The command line arguments, or None to use those the program was run with (default None)([str])
+    [return] -- The exit status, which is 1 if a comparison found regressions (int)'''
+
+    parser = argparse.ArgumentParser(description="Runs the performance benchmarks or compares two runs of them.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="run the benchmarks and save the results as JSON")
+    run_parser.add_argument("output_path", help="the path of the JSON file the results are saved to")
+    run_parser.add_argument("--grid", default="standard", choices=sorted(grids), help="the sizes of the benchmarks (default standard)")
+    run_parser.add_argument("--timeout", type=float, default=300, help="the longest each benchmark may run for in seconds (default 300)")
+
+    compare_parser = subparsers.add_parser("compare", help="compare results with a saved baseline")
+    compare_parser.add_argument("baseline_path", help="the path of the JSON file of the baseline results")
+    compare_parser.add_argument("current_path", help="the path of the JSON file of the new results")
+    compare_parser.add_argument("--threshold", type=float, default=0.1, help="the fractional increase in a metric which is a regression (default 0.1)")
+
+    options = parser.parse_args(arguments)
+
+    if options.command == "run":
+        results = run_benchmarks(options.grid, options.timeout)
+        with open(options.output_path, "w") as f:
+            json.dump(results, f, indent=1)
+        return(0)
+
+    with open(options.baseline_path) as f:
+        baseline = json.load(f)
+    with open(options.current_path) as f:
+        current = json.load(f)
+
+    regressions, failures = compare_benchmarks(baseline, current, options.threshold)
+    for key, metric, old_value, new_value in regressions:
+        print("REGRESSION {}: {} {:.4g} -> {:.4g} ({:+.1%})".format(key, metric, old_value, new_value, new_value / old_value - 1))
+    for key in failures:
+        print("FAILED {}".format(key))
+    if not regressions and not failures:
+        print("No regressions")
+
+    return(1 if regressions or failures else 0)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,31 @@
+from scipy.sparse import csc_matrix
+from scipy.sparse.linalg import splu
+
+def block_diagonal_method(method_class, block_size):
+    '''Makes a version of an implicit solve_ivp method for a system whose Jacobian is the same block repeated along its diagonal, such as a state and its sensitivities
+    The matrices the method factorises are then made of the same blocks, so only the first block is factorised and that factorisation is used to solve for every block together, where the method would otherwise factorise the whole matrix
+    method_class -- The solve_ivp method, which must be one that factorises its matrices with the lu and solve_lu attributes, as BDF and Radau do (scipy.integrate.OdeSolver)
+    block_size -- The number of rows in each block (int)
+    [return] -- The method which factorises a single block (scipy.integrate.OdeSolver)'''
+
+    class BlockDiagonalMethod(method_class):
+        def __init__(self, *args, **kwargs):
+            '''Constructs the method, replacing the factorisation of the whole matrix with that of its first block
+            self -- The instance of BlockDiagonalMethod being constructed (BlockDiagonalMethod)
+            args -- The positional arguments of the method ([value])
+            kwargs -- The keyword arguments of the method ({str: value})'''
+
+            super().__init__(*args, **kwargs)
+
+            def lu(matrix):
+                self.nlu += 1
+                return(splu(csc_matrix(matrix[:block_size, :block_size])))
+
+            # Each block of the right hand side is a column of a single solve
+            def solve_lu(factorisation, right_hand_side):
+                return(factorisation.solve(right_hand_side.reshape(-1, block_size).T).T.ravel())
+
+            self.lu = lu
+            self.solve_lu = solve_lu
+
+    return(BlockDiagonalMethod)
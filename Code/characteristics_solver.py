@@ -0,0 +1,59 @@
+from multirate_solver import MultirateSolver
+
+class CharacteristicsSolver(MultirateSolver):
+    '''A solver which moves the coolant along its characteristics and integrates the rest of the equations separately, coupling the two by Strang splitting
+    Each step moves the coolant for half the step, advances the neutron kinetics and temperatures without the advection over the whole step as MultirateSolver does and moves the coolant for the other half
+    The coolant only moves by whole discretisations, so fronts are carried without numerical diffusion
+    The advection is what makes the equations stiffer as the mesh is refined, and without it the temperatures of each discretisation are only coupled to their neighbours by conduction, so neither the size of the steps nor the cost of the implicit solves grows faster than the mesh
+    The error of each step, including that of the splitting, is estimated by comparing it with two steps of half the size, and the steps end on the output times and breakpoints
+    The solver needs the analytic Jacobian of a single system with full kinetics and discretisations of equal height built without the advection, which provides the coolant transport'''
+
+    # Whether the solver moves the coolant itself, in which case the equations it is given don't include the advection
+    transports_coolant = True
+
+    @property
+    def name(self):
+        ''' Returns the name of the solver
+        self -- The solver the value is being returned from (CharacteristicsSolver)
+        [return] -- The name of the solver (str)'''
+        return("characteristics")
+
+    def __repr__(self):
+        '''Returns a string describing the solver and its options, used to identify the problem specification it belongs to
+        self -- The solver being described (CharacteristicsSolver)
+        [return] -- The name and options of the solver (str)'''
+        return("CharacteristicsSolver({!r}, {!r}, {!r}, {!r})".format(self._rtol, self._atol, self._max_step, self._first_step))
+
+    def _step(self, system, state_array, time, step, substep, statistics):
+        '''Takes a single step of the splitting, moving the coolant for half the step either side of a coupled step of the kinetics and temperatures
+        self -- The solver being used (CharacteristicsSolver)
+        system -- The blocks of the equations ({str: value})
+        state_array -- The state at the start of the step (np.array[float])
+        time -- The time at the start of the step (s)(float)
+        step -- The size of the step (s)(float)
+        substep -- The size of the first kinetics substep (s)(float)
+        statistics -- The solver statistics, in which substeps and factorisations are counted (dict)
+        [return] -- The state at the end of the step and the size of the next kinetics substep (np.array[float], float)'''
+
+        coolant_transport = system["jacobian"].coolant_transport
+        state_array = coolant_transport(state_array, time, time + step / 2)
+        state_array, next_substep = super()._step(system, state_array, time, step, substep, statistics)
+        return(coolant_transport(state_array, time + step / 2, time + step), next_substep)
+
+    def _integrate(self, derivative_function, jacobian, start_array, times, breakpoints, first_step, statistics):
+        '''Integrates the system from the start state, yielding the state at each of the requested times after the first as it is reached
+        self -- The solver being used (CharacteristicsSolver)
+        derivative_function -- Calculates the rate of change without the advection from the state array and time (function(np.array[float], float) -> np.array[float])
+        jacobian -- The analytic Jacobian without the advection (Jacobian)
+        start_array -- The state of the system at the first of the times (np.array[float])
+        times -- The times at which the state is to be returned (s)(np.array[float])
+        breakpoints -- Times at which the equations change suddenly, which the steps end on, or None if there are none (s)(np.array[float])
+        first_step -- The size of the first step, or None to use that of the solver (s)(float)
+        statistics -- The solver statistics, which are updated as the integration goes on (dict)
+        [return] -- The index of each time, the state at it and the size of the last step (iterator[(int, np.array[float], float)])'''
+
+        # If the coolant transport isn't available raise an exception
+        if getattr(jacobian, "coolant_transport", None) is None or not hasattr(jacobian, "kinetics_matrix"):
+            raise ValueError("The solver 'characteristics' needs the analytic Jacobian of a single system with full kinetics and discretisations of equal height, built without the advection of the coolant.")
+
+        return(super()._integrate(derivative_function, jacobian, start_array, times, breakpoints, first_step, statistics))
@@ -0,0 +1,85 @@
+import numpy as np
+import os
+
+class Checkpoint:
+    '''A snapshot of a simulation part way through, from which it can be continued
+    The outputs calculated before the checkpoint are kept in a separate trajectory file, so the checkpoint itself stays small'''
+    def __init__(self, time, state_array, step_size, n_outputs, specification_hash, trajectory_path):
+        '''Constructs the checkpoint
+        self -- The instance of Checkpoint being constructed (Checkpoint)
+        time -- The time of the state (s)(float)
+        state_array -- The state of the system at the time of the checkpoint (np.array[float])
+        step_size -- The last step size taken by the solver, or None if it hadn't taken a step (s)(float)
+        n_outputs -- The number of output times which had been calculated, the last being the time of the checkpoint (int)
+        specification_hash -- The content hash of the problem specification being simulated (str)
+        trajectory_path -- The path of the file holding the outputs calculated before the checkpoint (str)'''
+
+        self._time = time
+        self._state_array = state_array
+        self._step_size = step_size
+        self._n_outputs = n_outputs
+        self._specification_hash = specification_hash
+        self._trajectory_path = trajectory_path
+
+    @property
+    def time(self):
+        ''' Returns the time of the checkpoint
+        self -- The checkpoint the value is being returned from (Checkpoint)
+        [return] -- The time of the state (s)(float)'''
+        return(self._time)
+
+    @property
+    def state_array(self):
+        ''' Returns the state of the system at the time of the checkpoint
+        self -- The checkpoint the value is being returned from (Checkpoint)
+        [return] -- The state of the system (np.array[float])'''
+        return(self._state_array)
+
+    @property
+    def step_size(self):
+        ''' Returns the last step size taken by the solver
+        self -- The checkpoint the value is being returned from (Checkpoint)
+        [return] -- The last step size, or None if the solver hadn't taken a step (s)(float)'''
+        return(self._step_size)
+
+    @property
+    def n_outputs(self):
+        ''' Returns the number of output times which had been calculated
+        self -- The checkpoint the value is being returned from (Checkpoint)
+        [return] -- The number of output times calculated (int)'''
+        return(self._n_outputs)
+
+    @property
+    def specification_hash(self):
+        ''' Returns the content hash of the problem specification being simulated
+        self -- The checkpoint the value is being returned from (Checkpoint)
+        [return] -- The content hash of the problem specification (str)'''
+        return(self._specification_hash)
+
+    @property
+    def trajectory_path(self):
+        ''' Returns the path of the file holding the outputs calculated before the checkpoint
+        self -- The checkpoint the value is being returned from (Checkpoint)
+        [return] -- The path of the trajectory file (str)'''
+        return(self._trajectory_path)
+
+    def save(self, file_path):
+        '''Saves the checkpoint to a .npz file
+        The checkpoint is written to a temporary file which then replaces the old one, so a run stopped while saving still leaves the previous checkpoint intact
+        self -- The checkpoint being saved (Checkpoint)
+        file_path -- The path of the file to be written (str)'''
+
+        step_size = np.nan if self._step_size is None else self._step_size
+        temporary_path = file_path + ".tmp"
+        with open(temporary_path, "wb") as f:
+            np.savez(f, time=self._time, state_array=self._state_array, step_size=step_size, n_outputs=self._n_outputs, specification_hash=self._specification_hash, trajectory_path=self._trajectory_path)
+        os.replace(temporary_path, file_path)
+
+def load_checkpoint(file_path):
+    '''Loads a checkpoint previously saved by Checkpoint.save
+    file_path -- The path of the file to be read (str)
+    [return] -- The checkpoint (Checkpoint)'''
+
+    with np.load(file_path) as data:
+        step_size = None if np.isnan(data["step_size"]) else float(data["step_size"])
+        return Checkpoint(float(data["time"]), data["state_array"], step_size, int(data["n_outputs"]), str(data["specification_hash"]), str(data["trajectory_path"]))
@@ -0,0 +1,152 @@
+from time import perf_counter_ns
+import numpy as np
+
+class CompiledDerivative():
+    '''A fused, allocation-free form of the derivative function
+    All of the constant coefficients of the equations are calculated from the problem specification once when the instance is constructed
+    When called, the state array is sliced into views and the rate of change is written into a preallocated array, so no instances of State or StateVariables are created
+    The returned array is reused by every call, so callers which need to keep the result must copy it
+    The temperatures of a core with several channels are viewed with one row per channel and the coefficients which differ between channels are columns, so every channel is calculated at once
+    Each physical term can be timed by passing a list for the ends of the terms, which is how InstrumentedDerivative times a run without a copy of the equations'''
+    def __init__(self, problem_specification, advection=True):
+        '''Precomputes the coefficients of the equations and allocates the working arrays
+        self -- The instance of CompiledDerivative being constructed (CompiledDerivative)
+        problem_specification -- The specification of the current physical system (ProblemSpecification)
+        advection -- Whether the advection of the coolant is included, which it isn't when the solver moves the coolant along its characteristics itself (default True)(bool)'''
+
+        n_z = problem_specification.n_z
+        n_delayed = problem_specification.n_delayed
+        n_temperatures = problem_specification.n_temperatures
+        shape = problem_specification.temperature_shape
+        heat_capacity_fuel = problem_specification.heat_capacity_per_discretisation_fuel
+        heat_capacity_coolant = problem_specification.heat_capacity_per_discretisation_coolant
+
+        self._n_z = n_z
+        self._shape = shape
+        self._advection = advection
+
+        # The positions of the different variables in the state array, matching StateVariables.as_array
+        self._delayed = slice(1, n_delayed + 1)
+        self._fuel = slice(n_delayed + 1, n_delayed + n_temperatures + 1)
+        self._coolant = slice(n_delayed + n_temperatures + 1, n_delayed + 2 * n_temperatures + 1)
+
+        # The coefficients of the neutron and delayed neutron precursor equations
+        self._neutron_coefficient = problem_specification.beta / problem_specification.generation_time
+        self._delayed_coefficients = problem_specification.betas / problem_specification.generation_time
+        self._lambdas = np.array(problem_specification.lambdas, dtype=float)
+        self._source = problem_specification.source
+
+        # The coefficients of the reactivity feedback
+        self._reactivity_driving = problem_specification.reactivity_driving
+        self._feedback_fuel = problem_specification.feedback_fuel
+        self._feedback_coolant = problem_specification.feedback_coolant
+        self._temperature_zero = problem_specification.temperature_zero
+        self._temperature_weights = problem_specification.temperature_weights.ravel()
+
+        # The coefficients of the fuel and coolant temperature equations
+        # The power deposited in each discretisation per neutron is folded into a single array
+        self._heating_fuel = problem_specification.energy_fission * problem_specification.power_distribution / (problem_specification.generation_time * heat_capacity_fuel)
+        self._transfer_fuel = problem_specification.heat_transfer_per_discretisation / heat_capacity_fuel
+        self._transfer_coolant = problem_specification.heat_transfer_per_discretisation / heat_capacity_coolant
+        self._advection_coolant = np.array(problem_specification.advection_rates)
+
+        # The thermal diffusion coefficients of each discretisation with the one above it, and of each with the one below it
+        below, above = problem_specification.conduction_factors
+        conduction_fuel = np.broadcast_to(problem_specification.channel_thermal_conductivity_fuel / heat_capacity_fuel, shape)
+        self._conduction_above = conduction_fuel[..., :-1] * above[:-1]
+        self._conduction_below = conduction_fuel[..., 1:] * below[1:]
+
+        # The array the gradient is written into and views of its parts
+        self._gradient = np.zeros(problem_specification.n_state_variables)
+        self._gradient_delayed = self._gradient[self._delayed]
+        self._gradient_fuel = self._gradient[self._fuel].reshape(shape)
+        self._gradient_coolant = self._gradient[self._coolant].reshape(shape)
+
+        # Working arrays for intermediate values
+        self._work_delayed = np.zeros(n_delayed)
+        self._work_transfer = np.zeros(shape)
+        self._work_difference = np.zeros(shape)
+        self._work_conduction = np.zeros(shape)
+
+    @property
+    def advection(self):
+        ''' Returns whether the advection of the coolant is included in the rate of change
+        self -- The instance of CompiledDerivative the value is being returned from (CompiledDerivative)
+        [return] -- Whether the advection is included (bool)'''
+        return(self._advection)
+
+    def __call__(self, state_array, time, term_ends=None):
+        '''Calculates the current rate of change of the state variables of the system
+        Takes the same arguments as derivative, other than the problem specification which was supplied at construction
+        self -- The instance of CompiledDerivative being called (CompiledDerivative)
+        state_array -- The current state of the system contained in a single array (np.array[float])
+        time -- The current time of the state (s)(float)
+        term_ends -- A list the counter value at the end of each physical term is appended to, in the order of Instrumentation.terms, or None for the terms not to be timed (default None)([int])
+        [return] -- The current rate of change of the different variables describing the state of the system, which is overwritten by the next call (np.array[float])'''
+
+        n_z = self._n_z
+        n_neutron = state_array[0]
+        n_delayed = state_array[self._delayed]
+        t_fuel = state_array[self._fuel]
+        t_coolant = state_array[self._coolant]
+
+        gradient_delayed = self._gradient_delayed
+        gradient_fuel = self._gradient_fuel
+        gradient_coolant = self._gradient_coolant
+        transfer = self._work_transfer
+        difference = self._work_difference
+
+        reactivity = self._reactivity_driving(time)
+        reactivity += self._feedback_fuel * (self._temperature_weights.dot(t_fuel) - self._temperature_zero)
+        reactivity += self._feedback_coolant * (self._temperature_weights.dot(t_coolant) - self._temperature_zero)
+        t_fuel = t_fuel.reshape(self._shape)
+        t_coolant = t_coolant.reshape(self._shape)
+        if term_ends is not None:
+            term_ends.append(perf_counter_ns())
+
+        # The rate of change of the number of neutrons
+        self._gradient[0] = self._neutron_coefficient * (reactivity - 1) * n_neutron + self._lambdas.dot(n_delayed) + self._source
+        if term_ends is not None:
+            term_ends.append(perf_counter_ns())
+
+        # The rate of change of the number of delayed neutron precursors
+        np.multiply(self._delayed_coefficients, reactivity * n_neutron, out=gradient_delayed)
+        np.multiply(self._lambdas, n_delayed, out=self._work_delayed)
+        gradient_delayed -= self._work_delayed
+        if term_ends is not None:
+            term_ends.append(perf_counter_ns())
+
+        # The heat transferred from the fuel to the coolant, used by both temperature equations
+        np.subtract(t_fuel, t_coolant, out=transfer)
+
+        # The rate of change of the coolant temperature
+        np.multiply(transfer, self._transfer_coolant, out=gradient_coolant)
+
+        # The rate of change of the fuel temperature
+        np.multiply(self._heating_fuel, n_neutron, out=gradient_fuel)
+        transfer *= self._transfer_fuel
+        gradient_fuel -= transfer
+
+        # The thermal diffusion term is only present if there are at least 2 discretisations, and is made of the exchange of each discretisation with the ones above and below it
+        if n_z > 1:
+            upwards = difference[..., :n_z - 1]
+            conduction = self._work_conduction[..., :n_z - 1]
+            np.subtract(t_fuel[..., 1:], t_fuel[..., :-1], out=upwards)
+            np.multiply(self._conduction_above, upwards, out=conduction)
+            gradient_fuel[..., :-1] -= conduction
+            np.multiply(self._conduction_below, upwards, out=conduction)
+            gradient_fuel[..., 1:] += conduction
+        if term_ends is not None:
+            term_ends.append(perf_counter_ns())
+
+        # The advection of the coolant, with coolant entering the bottom at the reference temperature
+        if self._advection:
+            upwind = difference[..., :n_z - 1]
+            np.subtract(t_coolant[..., 1:], t_coolant[..., :-1], out=upwind)
+            upwind *= self._advection_coolant[..., 1:]
+            gradient_coolant[..., 1:] -= upwind
+            gradient_coolant[..., :1] -= self._advection_coolant[..., :1] * (t_coolant[..., :1] - self._temperature_zero)
+        if term_ends is not None:
+            term_ends.append(perf_counter_ns())
+
+        return(self._gradient)
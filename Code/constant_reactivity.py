@@ -1,14 +1,31 @@
+import numpy as np
+
 class ConstantReactivity():
     '''A representation of a constant reactivity'''
     def __init__(self, reactivity):
         '''Constructs a constant reactivity profile
         self -- The instance of the constant reactivity being constructed (ConstantReactivity)
         reactivity -- The constant reactivity to be returned ($)(float)'''
-        self._reactivity
+        self._reactivity = reactivity
+
+    @property
+    def breakpoints(self):
+        ''' Returns the times at which the reactivity or its rate of change jumps, which the solver should step onto rather than across
+        self -- The reactivity profile the value is being returned from (ConstantReactivity)
+        [return] -- The times of the breakpoints, of which there are none (s)(np.array[float])'''
+        return(np.zeros(0))
+
+    def __repr__(self):
+        '''Returns a string describing the reactivity profile and its parameters, used to identify the problem specification it belongs to
+        self -- The reactivity profile being described (ConstantReactivity)
+        [return] -- The construction of the reactivity profile (str)'''
+        return("ConstantReactivity({!r})".format(self._reactivity))
 
     def __call__(self, time):
         ''' Returns the reactivity at a given time 
         self -- The reactivity profile the value is being returned from (ConstantReactivity)
-        time -- 
-        [return] -- The reactivity at the specified time'''
-        return(self._reactivity)
\ No newline at end of file
+        time -- The time or times the reactivity is to be returned at (s)(float or np.array[float])
+        [return] -- The reactivity at the specified time or times ($)(float or np.array[float])'''
+        if np.ndim(time) == 0:
+            return(self._reactivity)
+        return(np.full(np.shape(time), self._reactivity, dtype=float))
@@ -0,0 +1,54 @@
+import numpy as np
+
+class ControlledReactivity():
+    '''A representation of a reactivity which follows another profile until it is set by an operator, from when it holds the value it was set to
+    The value may be set again at any time, so the reactivity is only known up to the present and the solver is restarted whenever it changes'''
+    def __init__(self, reactivity):
+        '''Constructs a controlled reactivity profile
+        self -- The instance of the controlled reactivity being constructed (ControlledReactivity)
+        reactivity -- The driving reactivity until the value is first set ($ as a function of time in s)(ReactivityFunction)'''
+
+        self._reactivity = reactivity
+        self._value = None
+
+    @property
+    def value(self):
+        ''' Returns the value the reactivity has been set to
+        self -- The reactivity profile the value is being returned from (ControlledReactivity)
+        [return] -- The reactivity it has been set to, or None if it still follows the profile ($)(float)'''
+        return(self._value)
+
+    @value.setter
+    def value(self, value):
+        ''' Sets the reactivity, which then holds this value
+        self -- The reactivity profile the value is being set for (ControlledReactivity)
+        value -- The new reactivity ($)(float)'''
+        self._value = float(value)
+
+    @property
+    def breakpoints(self):
+        ''' Returns the times at which the reactivity or its rate of change jumps, which the solver should step onto rather than across
+        self -- The reactivity profile the value is being returned from (ControlledReactivity)
+        [return] -- The breakpoints of the profile until the value is set, after which there are none (s)(np.array[float])'''
+
+        if self._value is None:
+            return(np.asarray(self._reactivity.breakpoints, dtype=float))
+        return(np.zeros(0))
+
+    def __repr__(self):
+        '''Returns a string describing the reactivity profile and its parameters, used to identify the problem specification it belongs to
+        self -- The reactivity profile being described (ControlledReactivity)
+        [return] -- The construction of the reactivity profile (str)'''
+        return("ControlledReactivity({!r})".format(self._reactivity))
+
+    def __call__(self, time):
+        ''' Returns the reactivity at a given time
+        self -- The reactivity profile the value is being returned from (ControlledReactivity)
+        time -- The time or times the reactivity is to be returned at (s)(float or np.array[float])
+        [return] -- The reactivity at the specified time or times ($)(float or np.array[float])'''
+
+        if self._value is None:
+            return(self._reactivity(time))
+        if np.ndim(time) == 0:
+            return(self._value)
+        return(np.full(np.shape(time), self._value, dtype=float))
@@ -0,0 +1,50 @@
+import numpy as np
+
+class CoolantTransport():
+    '''Moves the coolant up the channels along its characteristics, which is the advection term of the coolant equation solved exactly for discretisations of equal height
+    The coolant of each channel only ever moves by whole discretisations, so the temperature of each discretisation is always that of the coolant which was in a single discretisation below, and fronts are carried up the channel without being smeared out, however many steps they are moved over
+    The number of discretisations the coolant of a channel has moved by a time is the nearest whole number to the distance it has travelled since time 0, so the coolant of each channel is never more than half a discretisation from where it should be, and that error doesn't build up from one step to the next
+    Coolant which has entered the bottom is at the reference temperature'''
+    def __init__(self, problem_specification):
+        '''Precomputes the speed of the coolant of each channel in discretisations
+        self -- The instance of CoolantTransport being constructed (CoolantTransport)
+        problem_specification -- The specification of the current physical system, which must have discretisations of equal height (ProblemSpecification)'''
+
+        # If the discretisations have different heights the coolant can't move by whole discretisations, so raise an exception
+        if not problem_specification.uniform_mesh:
+            raise ValueError("The coolant can only be moved along its characteristics through discretisations of equal height.")
+
+        self._n_z = problem_specification.n_z
+        self._n_temperatures = problem_specification.n_temperatures
+        self._shape = problem_specification.temperature_shape
+        self._temperature_zero = problem_specification.temperature_zero
+
+        # The distance moved in a unit time in discretisations, one row per channel
+        self._cell_speeds = np.reshape(np.broadcast_to(problem_specification.coolant_speeds / problem_specification.d_z, self._shape)[..., 0], (-1, 1))
+
+        # The index of each discretisation within its channel
+        self._positions = np.arange(self._n_z)
+
+    def __call__(self, solved_array, start_time, end_time):
+        '''Moves the coolant from one time to a later one, with nothing else changing
+        The coolant temperatures are the last variables of the array for every kinetics model, so any array solved for may be moved
+        self -- The instance of CoolantTransport being used (CoolantTransport)
+        solved_array -- The variables solved for at the start time (np.array[float])
+        start_time -- The time the coolant moves from (s)(float)
+        end_time -- The time the coolant moves to (s)(float)
+        [return] -- The variables solved for after the coolant has moved (np.array[float])'''
+
+        # The number of whole discretisations each channel moves, which is the difference between those it has moved by each time
+        whole = (np.rint(self._cell_speeds * end_time) - np.rint(self._cell_speeds * start_time)).astype(int)
+        if not np.any(whole):
+            return(solved_array)
+
+        # The coolant is padded with a discretisation at the reference temperature below the bottom, which is where any index below the channel points to
+        coolant = solved_array[-self._n_temperatures:].reshape(-1, self._n_z)
+        padded = np.empty((coolant.shape[0], self._n_z + 1))
+        padded[:, 0] = self._temperature_zero
+        padded[:, 1:] = coolant
+
+        moved_array = solved_array.copy()
+        moved_array[-self._n_temperatures:] = np.take_along_axis(padded, np.maximum(self._positions - whole, -1) + 1, axis=1).ravel()
+        return(moved_array)
@@ -2,17 +2,19 @@ from state_variables import StateVariables
 from state import State
 import numpy as np
 
-def derivative(state_array, time, problem_specification):
+def derivative(state_array, time, problem_specification, advection=True):
     '''This function takes the current state of the system and the current time of the system and calculates the current rate of change of the state variables of the system
     It takes the array providing the state variables and uses this to construct an instance of State to make it easier to interrogate the current state
     The rate of change is created in an instance of StateVariables from which an array containing the rates of change is extracted and returned
-    state_array -- The current state of the system contained in a single array (np.array[float])
+    state_array -- The current values of the variables solved for, which are the whole state unless a reduced kinetics model is used (np.array[float])
     time -- The current time of the state (s)(float)
     problem_specification -- The specification of the current physical system (ProblemSpecifcation)
-    [return] -- The current rate of change of the different variables describing the state of the system (np.array[float])'''
+    advection -- Whether the advection of the coolant is included, which it isn't when the solver moves the coolant along its characteristics itself (default True)(bool)
+    [return] -- The current rate of change of the variables solved for (np.array[float])'''
 
-    # Create the instance of State to hold the current state of the system
-    state = State(problem_specification, time, state_array)
+    # Create the instance of State to hold the current state of the system, which for the reduced kinetics models is found from the variables solved for
+    state = State(problem_specification, time)
+    state.populate_from_solved_array(state_array)
 
     # Create the instance of StateVariable to hold the current rate of change of the variables
     gradient = StateVariables(problem_specification, time)
@@ -30,25 +32,24 @@ def derivative(state_array, time, problem_specification):
     gradient.n_delayed = problem_specification.betas * reactivity * state.n_neutron / problem_specification.generation_time
     gradient.n_delayed -= problem_specification.lambdas * state.n_delayed
 
-    # The rate of change of the fuel temperature
-    gradient.t_fuel = state.power * problem_specification.power_profile / problem_specification.heat_capacity_per_discretisation_fuel
-    gradient.t_fuel -= (state.t_fuel - state.t_coolant) * problem_specification.heat_transfer_coefficient / problem_specification.heat_capacity_per_discretisation_fuel
-    try:
-        # The thermal diffusion term may raise an error if there are 2 or fewer discretisations, so put it in a try block
-        gradient.t_fuel[0] -= problem_specification.thermal_conductivity_fuel * (state.t_fuel[1] - state.t_fuel[0]) / (problem_specification.heat_capacity_per_discretisation_fuel * problem_specification.d_z ** 2)
-        gradient.t_fuel[-1] -= problem_specification.thermal_conductivity_fuel * (state.t_fuel[-2] - state.t_fuel[-1]) / (problem_specification.heat_capacity_per_discretisation_fuel * problem_specification.d_z ** 2)
-        gradient.t_fuel[1:-1] -= problem_specification.thermal_conductivity_fuel * (state.t_fuel[:-2] + state.t_fuel[2:] - 2 * state.t_fuel[1:-1]) / (problem_specification.heat_capacity_per_discretisation_fuel * problem_specification.d_z ** 2)
-    except IndexError:
-        pass
+    # The rate of change of the fuel temperature, in which each channel has its own row if there are several channels
+    gradient.t_fuel = state.power * problem_specification.power_distribution / problem_specification.heat_capacity_per_discretisation_fuel
+    gradient.t_fuel -= (state.t_fuel - state.t_coolant) * problem_specification.heat_transfer_per_discretisation / problem_specification.heat_capacity_per_discretisation_fuel
+    # The thermal diffusion term is only present if there are at least 2 discretisations, and is made of the exchange of each discretisation with the ones below and above it
+    if problem_specification.n_z > 1:
+        below, above = problem_specification.conduction_factors
+        conduction = np.zeros(problem_specification.temperature_shape)
+        conduction[..., 1:] += below[1:] * (state.t_fuel[..., :-1] - state.t_fuel[..., 1:])
+        conduction[..., :-1] += above[:-1] * (state.t_fuel[..., 1:] - state.t_fuel[..., :-1])
+        gradient.t_fuel -= problem_specification.channel_thermal_conductivity_fuel * conduction / problem_specification.heat_capacity_per_discretisation_fuel
 
     # The rate of change of the coolant temperature
-    gradient.t_coolant = (state.t_fuel - state.t_coolant) * problem_specification.heat_transfer_coefficient / problem_specification.heat_capacity_per_discretisation_coolant
-    try:
-        # The advection term may fail if there is 1 discretisation, so put it in a try block
-        gradient.t_coolant[1:] -= problem_specification.speed_coolant * (state.t_coolant[1:] - state.t_coolant[:-1]) / problem_specification.d_z
-    except IndexError:
-        pass
-    gradient.t_coolant[0] -= problem_specification.speed_coolant * (state.t_coolant[0] - problem_specification.temperature_zero) / problem_specification.d_z
-
-    # Extract an array containing the gradient and return it
-    return gradient.as_array
\ No newline at end of file
+    gradient.t_coolant = (state.t_fuel - state.t_coolant) * problem_specification.heat_transfer_per_discretisation / problem_specification.heat_capacity_per_discretisation_coolant
+    if advection:
+        # The coolant of each discretisation is replaced by the coolant below, with the coolant entering the bottom at the reference temperature
+        advection_rates = problem_specification.advection_rates
+        gradient.t_coolant[..., 1:] -= advection_rates[..., 1:] * (state.t_coolant[..., 1:] - state.t_coolant[..., :-1])
+        gradient.t_coolant[..., [0]] -= advection_rates[..., [0]] * (state.t_coolant[..., [0]] - problem_specification.temperature_zero)
+
+    # Extract an array containing the gradient of the variables solved for and return it
+    return gradient.as_solved_array
\ No newline at end of file
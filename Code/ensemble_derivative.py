@@ -0,0 +1,157 @@
+import numpy as np
+
+class EnsembleDerivative():
+    '''Calculates the rate of change of an ensemble of systems at once
+    The state arrays of the members are stacked into a single array of length n_members * n_state_variables, so the ensemble can be integrated as one system of equations
+    Each member may have its own parameters, but all must have the same number of discretisations and delayed neutron precursor groups
+    The equations are those of derivative, evaluated with Numpy operations over all the members together
+    The returned array is reused by every call, so callers which need to keep the result must copy it'''
+    def __init__(self, problem_specifications):
+        '''Precomputes the coefficients of the equations for every member and allocates the working arrays
+        self -- The instance of EnsembleDerivative being constructed (EnsembleDerivative)
+        problem_specifications -- The specifications of the members of the ensemble ([ProblemSpecification])'''
+
+        first = problem_specifications[0]
+        for problem_specification in problem_specifications:
+            if problem_specification.n_z != first.n_z or problem_specification.n_delayed != first.n_delayed:
+                raise ValueError("All members of an ensemble must have the same number of discretisations and delayed neutron precursor groups.")
+            # The members are calculated as rows of a single array, so each must be a single channel
+            if problem_specification.n_channels != 1:
+                raise ValueError("The members of an ensemble must each have a single channel.")
+
+        n_members = len(problem_specifications)
+        n_z = first.n_z
+        n_delayed = first.n_delayed
+
+        self._n_members = n_members
+        self._n_z = n_z
+        self._n_state_variables = first.n_state_variables
+
+        # The positions of the different variables in the state array of each member, matching StateVariables.as_array
+        self._delayed = slice(1, n_delayed + 1)
+        self._fuel = slice(n_delayed + 1, n_delayed + n_z + 1)
+        self._coolant = slice(n_delayed + n_z + 1, n_delayed + 2 * n_z + 1)
+
+        def collect(function):
+            # Stacks a value calculated from each specification into an array with one row per member
+            return(np.array([function(problem_specification) for problem_specification in problem_specifications], dtype=float))
+
+        # The coefficients of the neutron and delayed neutron precursor equations
+        self._neutron_coefficient = collect(lambda ps: ps.beta / ps.generation_time)
+        self._delayed_coefficients = collect(lambda ps: ps.betas / ps.generation_time)
+        self._lambdas = collect(lambda ps: ps.lambdas)
+        self._source = collect(lambda ps: ps.source)
+
+        # The coefficients of the reactivity feedback
+        self._reactivities_driving = [problem_specification.reactivity_driving for problem_specification in problem_specifications]
+        self._feedback_fuel = collect(lambda ps: ps.feedback_fuel)
+        self._feedback_coolant = collect(lambda ps: ps.feedback_coolant)
+        self._temperature_zero = collect(lambda ps: ps.temperature_zero)
+
+        # The coefficients of the fuel and coolant temperature equations, shaped to broadcast along the discretisations
+        self._heating_fuel = collect(lambda ps: ps.energy_fission * ps.power_profile / (ps.generation_time * ps.heat_capacity_per_discretisation_fuel))
+        self._transfer_fuel = collect(lambda ps: ps.heat_transfer_coefficient / ps.heat_capacity_per_discretisation_fuel)[:, np.newaxis]
+        self._transfer_coolant = collect(lambda ps: ps.heat_transfer_coefficient / ps.heat_capacity_per_discretisation_coolant)[:, np.newaxis]
+        self._conduction_fuel = collect(lambda ps: ps.thermal_conductivity_fuel / (ps.heat_capacity_per_discretisation_fuel * ps.d_z ** 2))[:, np.newaxis]
+        self._advection_coolant = collect(lambda ps: ps.speed_coolant / ps.d_z)[:, np.newaxis]
+
+        # The array the gradient is written into and views of its parts
+        self._gradient = np.zeros(n_members * self._n_state_variables)
+        gradient = self._gradient.reshape(n_members, self._n_state_variables)
+        self._gradient_neutron = gradient[:, 0]
+        self._gradient_delayed = gradient[:, self._delayed]
+        self._gradient_fuel = gradient[:, self._fuel]
+        self._gradient_coolant = gradient[:, self._coolant]
+
+        # Working arrays for intermediate values
+        self._reactivity = np.zeros(n_members)
+        self._work_member = np.zeros(n_members)
+        self._work_delayed = np.zeros((n_members, n_delayed))
+        self._work_transfer = np.zeros((n_members, n_z))
+        self._work_difference = np.zeros((n_members, n_z))
+
+    @property
+    def n_members(self):
+        ''' Returns the number of members of the ensemble
+        self -- The ensemble the value is being returned from (EnsembleDerivative)
+        [return] -- The number of members of the ensemble (int)'''
+        return(self._n_members)
+
+    def __call__(self, state_array, time):
+        '''Calculates the current rate of change of the state variables of every member of the ensemble
+        self -- The instance of EnsembleDerivative being called (EnsembleDerivative)
+        state_array -- The current states of the members, one after another in a single array (np.array[float])
+        time -- The current time of the states (s)(float)
+        [return] -- The current rates of change of the members in a single array, which is overwritten by the next call (np.array[float])'''
+
+        n_z = self._n_z
+        states = state_array.reshape(self._n_members, self._n_state_variables)
+        n_neutron = states[:, 0]
+        n_delayed = states[:, self._delayed]
+        t_fuel = states[:, self._fuel]
+        t_coolant = states[:, self._coolant]
+
+        gradient_delayed = self._gradient_delayed
+        gradient_fuel = self._gradient_fuel
+        gradient_coolant = self._gradient_coolant
+        reactivity = self._reactivity
+        work = self._work_member
+        transfer = self._work_transfer
+        difference = self._work_difference
+
+        # The driving reactivity of each member, followed by the temperature feedback
+        for i_member, reactivity_driving in enumerate(self._reactivities_driving):
+            reactivity[i_member] = reactivity_driving(time)
+        np.mean(t_fuel, axis=1, out=work)
+        work -= self._temperature_zero
+        work *= self._feedback_fuel
+        reactivity += work
+        np.mean(t_coolant, axis=1, out=work)
+        work -= self._temperature_zero
+        work *= self._feedback_coolant
+        reactivity += work
+
+        # The rate of change of the number of neutrons
+        np.multiply(self._lambdas, n_delayed, out=self._work_delayed)
+        np.sum(self._work_delayed, axis=1, out=self._gradient_neutron)
+        np.subtract(reactivity, 1, out=work)
+        work *= self._neutron_coefficient
+        work *= n_neutron
+        self._gradient_neutron += work
+        self._gradient_neutron += self._source
+
+        # The rate of change of the number of delayed neutron precursors
+        np.multiply(reactivity, n_neutron, out=work)
+        np.multiply(self._delayed_coefficients, work[:, np.newaxis], out=gradient_delayed)
+        gradient_delayed -= self._work_delayed
+
+        # The heat transferred from the fuel to the coolant, used by both temperature equations
+        np.subtract(t_fuel, t_coolant, out=transfer)
+
+        # The rate of change of the coolant temperature
+        np.multiply(transfer, self._transfer_coolant, out=gradient_coolant)
+
+        # The rate of change of the fuel temperature
+        np.multiply(self._heating_fuel, n_neutron[:, np.newaxis], out=gradient_fuel)
+        transfer *= self._transfer_fuel
+        gradient_fuel -= transfer
+
+        # The thermal diffusion term is only present if there are at least 2 discretisations
+        if n_z > 1:
+            gradient_fuel[:, 0] -= self._conduction_fuel[:, 0] * (t_fuel[:, 1] - t_fuel[:, 0])
+            gradient_fuel[:, -1] -= self._conduction_fuel[:, 0] * (t_fuel[:, -2] - t_fuel[:, -1])
+            interior = difference[:, :n_z - 2]
+            np.add(t_fuel[:, :-2], t_fuel[:, 2:], out=interior)
+            interior -= t_fuel[:, 1:-1]
+            interior -= t_fuel[:, 1:-1]
+            interior *= self._conduction_fuel
+            gradient_fuel[:, 1:-1] -= interior
+
+        # The advection of the coolant, with coolant entering the bottom at the reference temperature
+        upwind = difference[:, :n_z - 1]
+        np.subtract(t_coolant[:, 1:], t_coolant[:, :-1], out=upwind)
+        upwind *= self._advection_coolant
+        gradient_coolant[:, 1:] -= upwind
+        gradient_coolant[:, 0] -= self._advection_coolant[:, 0] * (t_coolant[:, 0] - self._temperature_zero)
+
+        return(self._gradient)
@@ -0,0 +1,100 @@
+from trajectory import Trajectory
+from ensemble_derivative import EnsembleDerivative
+from ensemble_jacobian import EnsembleJacobian
+from multirate_solver import MultirateSolver
+import numpy as np
+
+def estimate_stiffness(problem_specification):
+    '''Estimates the fastest rate in the equations of a system, used to group members of an ensemble which will take similar steps
+    problem_specification -- The specification of the system (ProblemSpecification)
+    [return] -- The largest of the rates of the neutron, fuel and coolant equations (1/s)(float)'''
+
+    rate_neutron = problem_specification.beta / problem_specification.generation_time
+    rate_fuel = (problem_specification.heat_transfer_coefficient + 4 * problem_specification.thermal_conductivity_fuel / problem_specification.d_z ** 2) / problem_specification.heat_capacity_per_discretisation_fuel
+    rate_coolant = problem_specification.heat_transfer_coefficient / problem_specification.heat_capacity_per_discretisation_coolant + problem_specification.speed_coolant / problem_specification.d_z
+
+    return(max(rate_neutron, rate_fuel, rate_coolant))
+
+def ensemble_key(problem_specification):
+    '''Finds which problems can be integrated together as an ensemble, which are those with the same key
+    A problem can only be a member of an ensemble if it has full kinetics, a single channel of discretisations of equal height, no events, adaptive output, checkpoints or restart, and a solver which integrates the equations as given
+    problem_specification -- The specification of the problem (ProblemSpecification)
+    [return] -- The number of discretisations and precursor groups, the solver and the output times, or None if the problem can't be a member of an ensemble (tuple)'''
+
+    if (problem_specification.kinetics_model.name != "full" or problem_specification.n_channels != 1 or not problem_specification.uniform_mesh
+            or problem_specification.events or problem_specification.adaptive_output is not None or problem_specification.checkpoint_interval is not None
+            or problem_specification.restart_from is not None or isinstance(problem_specification.solver, MultirateSolver)):
+        return(None)
+
+    return((problem_specification.n_z, problem_specification.n_delayed, repr(problem_specification.solver), problem_specification.output_times.tobytes()))
+
+def calculate_ensemble_future_states(start_states, problem_specifications, group_size=None, jacobian=True):
+    '''Calculates the states of an ensemble of systems at the output times by integrating the members together as a single system
+    All members must have the same number of discretisations, delayed neutron precursor groups and output times. The solver of the first member is used for all of them
+    The combined system is integrated with the error control of the solver applied across every member. If group_size is set, the members are sorted by their estimated stiffness and integrated in groups of that size so that quickly changing members don't force small steps on slowly changing ones
+    As the members don't interact, the sparse Jacobian is block diagonal, so the implicit solve_ivp solvers "BDF" and "Radau" scale much better with ensemble size than odeint, which treats the Jacobian as dense
+    start_states -- The state of each member at the start of the period being simulated ([State])
+    problem_specifications -- The specification of each member ([ProblemSpecification])
+    group_size -- The number of members to be integrated together, or None to integrate all of them together (default None)(int)
+    jacobian -- If True the analytic Jacobian is supplied to the solver, otherwise the solver estimates it by finite differences (default True)(bool)
+    [return] -- The states at the output times of each member, in the same order as the specifications ([Trajectory])'''
+
+    # If the members aren't output at the same times raise an exception
+    output_times = problem_specifications[0].output_times
+    for problem_specification in problem_specifications:
+        if not np.array_equal(problem_specification.output_times, output_times):
+            raise ValueError("All members of an ensemble must have the same output times.")
+
+    # The combined equations are those of the full kinetics, so if any member uses a reduced model raise an exception
+    for problem_specification in problem_specifications:
+        if problem_specification.kinetics_model.name != "full":
+            raise ValueError("All members of an ensemble must use full kinetics.")
+
+    # The members are integrated together to the end, so if any member has events which could stop it or change its reactivity raise an exception
+    for problem_specification in problem_specifications:
+        if problem_specification.events:
+            raise ValueError("The members of an ensemble can't have events.")
+
+    # The members share their output times, so if any member keeps only some of them raise an exception
+    for problem_specification in problem_specifications:
+        if problem_specification.adaptive_output is not None:
+            raise ValueError("The members of an ensemble can't have adaptive output.")
+
+    # The combined equations take every discretisation of a member to have the same height, so if any member has axial boundaries raise an exception
+    for problem_specification in problem_specifications:
+        if not problem_specification.uniform_mesh:
+            raise ValueError("The members of an ensemble must have discretisations of equal height.")
+
+    solver = problem_specifications[0].solver
+
+    # The solver steps onto the breakpoints of every member
+    breakpoints = np.unique(np.concatenate([problem_specification.reactivity_breakpoints for problem_specification in problem_specifications]))
+    n_members = len(problem_specifications)
+
+    if group_size is None:
+        groups = [list(range(n_members))]
+    else:
+        order = sorted(range(n_members), key=lambda i_member: estimate_stiffness(problem_specifications[i_member]))
+        groups = [order[i_start:i_start + group_size] for i_start in range(0, n_members, group_size)]
+
+    output_states = [None] * n_members
+
+    for group in groups:
+        group_specifications = [problem_specifications[i_member] for i_member in group]
+
+        start_array = np.concatenate([start_states[i_member].as_array for i_member in group])
+
+        if jacobian:
+            analytic_jacobian = EnsembleJacobian(group_specifications)
+        else:
+            analytic_jacobian = None
+
+        calculated_arrays, statistics = solver(EnsembleDerivative(group_specifications), analytic_jacobian, start_array, output_times, breakpoints)
+
+        # Split the combined arrays back into the arrays of each member
+        calculated_arrays = calculated_arrays.reshape(len(output_times), len(group), -1)
+
+        for i_group, i_member in enumerate(group):
+            output_states[i_member] = Trajectory(problem_specifications[i_member], output_times, calculated_arrays[:, i_group])
+
+    return output_states
@@ -0,0 +1,40 @@
+from scipy.sparse import block_diag
+from jacobian import Jacobian
+
+class EnsembleJacobian():
+    '''The analytic Jacobian of an ensemble of systems integrated together
+    The members don't interact, so the Jacobian is block diagonal with the Jacobian of each member on the diagonal'''
+    def __init__(self, problem_specifications):
+        '''Constructs the Jacobian of each member
+        self -- The instance of EnsembleJacobian being constructed (EnsembleJacobian)
+        problem_specifications -- The specifications of the members of the ensemble ([ProblemSpecification])'''
+
+        self._jacobians = [Jacobian(problem_specification) for problem_specification in problem_specifications]
+        self._n_state_variables = problem_specifications[0].n_state_variables
+
+    @property
+    def sparsity(self):
+        '''Returns the sparsity pattern of the Jacobian, suitable for use as jac_sparsity in scipy.integrate.solve_ivp
+        self -- The Jacobian the sparsity pattern is being returned from (EnsembleJacobian)
+        [return] -- A matrix which is 1 where the Jacobian may be non-zero (scipy.sparse.csc_matrix)'''
+
+        return(block_diag([jacobian.sparsity for jacobian in self._jacobians], format="csc"))
+
+    def __call__(self, state_array, time):
+        '''Calculates the Jacobian at the specified states and time
+        self -- The instance of EnsembleJacobian being called (EnsembleJacobian)
+        state_array -- The current states of the members, one after another in a single array (np.array[float])
+        time -- The current time of the states (s)(float)
+        [return] -- The Jacobian of the rates of change with respect to the state variables (scipy.sparse.csc_matrix)'''
+
+        states = state_array.reshape(len(self._jacobians), self._n_state_variables)
+        return(block_diag([jacobian(state, time) for jacobian, state in zip(self._jacobians, states)], format="csc"))
+
+    def dense(self, state_array, time):
+        '''Calculates the Jacobian at the specified states and time as a dense array, suitable for use as Dfun in scipy.integrate.odeint
+        self -- The instance of EnsembleJacobian being used (EnsembleJacobian)
+        state_array -- The current states of the members, one after another in a single array (np.array[float])
+        time -- The current time of the states (s)(float)
+        [return] -- The Jacobian of the rates of change with respect to the state variables (np.array[float])'''
+
+        return(self(state_array, time).toarray())
@@ -0,0 +1,132 @@
+from state import State
+from scram_reactivity import ScramReactivity
+import numpy as np
+
+class Event():
+    '''A condition on the state of the system, such as the power rising above a trip setpoint, and what is done when the state crosses it
+    "stop" ends the simulation at the event, "record" notes the time of the event and carries on, and "scram" inserts the control rods after a delay, reducing the driving reactivity
+    An event happens when the quantity crosses its setpoint during the simulation, so a state which is already past the setpoint at the start doesn't set it off
+    The period is watched through its inverse, which unlike the period doesn't jump from large positive to large negative values as the power passes through a peak'''
+
+    # The quantities, directions and actions which are accepted
+    quantities = ("power", "max_t_fuel", "max_t_coolant", "period")
+    directions = ("above", "below")
+    actions = ("stop", "record", "scram")
+
+    # The time of an event is located to within this fraction of the time between the output times either side of it
+    relative_time_tolerance = 1e-6
+
+    def __init__(self, quantity, direction, setpoint, action, delay=0.0, depth=None, insertion_time=None):
+        '''Constructs the event
+        self -- The instance of Event being constructed (Event)
+        quantity -- The quantity watched, one of "power" (W), "max_t_fuel" (K), "max_t_coolant" (K) or "period" (s)(str)
+        direction -- Whether the event happens when the quantity rises "above" or falls "below" the setpoint (str)
+        setpoint -- The value of the quantity at which the event happens, which for the period must be positive (float)
+        action -- What is done when the event happens, one of "stop", "record" or "scram" (str)
+        delay -- The time from the event to the start of the insertion of the control rods for a scram (s)(default 0.0)(float)
+        depth -- The reactivity of the control rods once fully inserted for a scram, or None for other actions ($)(default None)(float)
+        insertion_time -- The time taken to insert the control rods for a scram, or None for other actions (s)(default None)(float)'''
+
+        # If the event isn't one which is recognised raise an exception
+        if quantity not in self.quantities:
+            raise ValueError("The event quantity '{}' is not one of {}.".format(quantity, ", ".join(self.quantities)))
+        if direction not in self.directions:
+            raise ValueError("The event direction '{}' is not one of {}.".format(direction, ", ".join(self.directions)))
+        if action not in self.actions:
+            raise ValueError("The event action '{}' is not one of {}.".format(action, ", ".join(self.actions)))
+        if quantity == "period" and setpoint <= 0:
+            raise ValueError("The setpoint of a period event must be positive, not {}.".format(setpoint))
+        if action == "scram" and (depth is None or insertion_time is None or delay < 0):
+            raise ValueError("A scram needs a delay which isn't negative, a depth and an insertion time.")
+
+        self._quantity = quantity
+        self._direction = direction
+        self._setpoint = setpoint
+        self._action = action
+        self._delay = delay
+        self._depth = depth
+        self._insertion_time = insertion_time
+
+        # An event on the period is found from the inverse period, which passes its inverse setpoint in the opposite direction
+        self._sign = 1 if (direction == "above") != (quantity == "period") else -1
+
+    @property
+    def quantity(self):
+        ''' Returns the quantity watched
+        self -- The event the value is being returned from (Event)
+        [return] -- The name of the quantity (str)'''
+        return(self._quantity)
+
+    @property
+    def direction(self):
+        ''' Returns whether the event happens when the quantity rises above or falls below the setpoint
+        self -- The event the value is being returned from (Event)
+        [return] -- Either "above" or "below" (str)'''
+        return(self._direction)
+
+    @property
+    def setpoint(self):
+        ''' Returns the value of the quantity at which the event happens
+        self -- The event the value is being returned from (Event)
+        [return] -- The setpoint (float)'''
+        return(self._setpoint)
+
+    @property
+    def action(self):
+        ''' Returns what is done when the event happens
+        self -- The event the value is being returned from (Event)
+        [return] -- One of "stop", "record" or "scram" (str)'''
+        return(self._action)
+
+    @property
+    def description(self):
+        ''' Returns a description of the event as it is given in the input
+        self -- The event the value is being returned from (Event)
+        [return] -- The quantity, direction, setpoint and action of the event (str)'''
+        return("{} {} {:g} {}".format(self._quantity, self._direction, self._setpoint, self._action))
+
+    def __repr__(self):
+        '''Returns a string describing the event and its parameters, used to identify the problem specification it belongs to
+        self -- The event being described (Event)
+        [return] -- The construction of the event (str)'''
+        return("Event({!r}, {!r}, {!r}, {!r}, {!r}, {!r}, {!r})".format(self._quantity, self._direction, self._setpoint, self._action, self._delay, self._depth, self._insertion_time))
+
+    def value(self, state):
+        '''Returns the quantity watched in a state
+        self -- The event being used (Event)
+        state -- The state of the system (State)
+        [return] -- The value of the quantity (float)'''
+
+        if self._quantity == "power":
+            return(state.power)
+        elif self._quantity == "max_t_fuel":
+            return(np.max(state.t_fuel))
+        elif self._quantity == "max_t_coolant":
+            return(np.max(state.t_coolant))
+
+        with np.errstate(divide="ignore"):
+            return(1 / state.inverse_period)
+
+    def __call__(self, problem_specification, state_array, time):
+        '''Returns how far past the setpoint the state is, which is negative before the event and changes sign when it happens
+        self -- The event being used (Event)
+        problem_specification -- The specification of the system (ProblemSpecification)
+        state_array -- The full state array (np.array[float])
+        time -- The time of the state (s)(float)
+        [return] -- The distance past the setpoint, in the units of the quantity or for the period those of its inverse (float)'''
+
+        state = State(problem_specification, time, state_array)
+
+        if self._quantity == "period":
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return(self._sign * (state.inverse_period - 1 / self._setpoint))
+
+        return(self._sign * (self.value(state) - self._setpoint))
+
+    def scram_reactivity(self, reactivity, time):
+        '''Returns the driving reactivity after a scram set off by the event
+        self -- The event being used (Event)
+        reactivity -- The driving reactivity before the scram ($ as a function of time in s)(ReactivityFunction)
+        time -- The time of the event (s)(float)
+        [return] -- The driving reactivity with the control rods inserted from the end of the delay (ScramReactivity)'''
+        return(ScramReactivity(reactivity, time + self._delay, self._depth, self._insertion_time))
@@ -1,19 +1,335 @@
-from scipy.integrate import odeint
-from state import State
+from contextlib import nullcontext
+from functools import partial
+from trajectory import Trajectory, load_trajectory
+from trajectory_writer import TrajectoryWriter
 from derivative import derivative
+from compiled_derivative import CompiledDerivative
+from jacobian import Jacobian
+from checkpoint import Checkpoint, load_checkpoint
+from scipy.optimize import brentq
 import numpy as np
+import os
 
-def calculate_future_states(start_state, problem_specification):
+def make_system_functions(problem_specification, compiled, jacobian, instrumentation=None):
+    '''Creates the functions describing the equations of the system which are passed to the solver
+    problem_specification -- The specification of the current physical system (ProblemSpecification)
+    compiled -- If True the rate of change is calculated by a CompiledDerivative, otherwise the derivative function is used (bool)
+    jacobian -- If True the analytic Jacobian is created, otherwise None is returned for the solver to estimate it by finite differences (bool)
+    instrumentation -- Records the evaluations of the functions, or None for them not to be instrumented (default None)(Instrumentation)
+    [return] -- The rate of change of the variables solved for as a function of them and time, and their Jacobian (function(np.array[float], float) -> np.array[float], Jacobian)'''
+
+    kinetics_model = problem_specification.kinetics_model
+
+    # A solver which moves the coolant along its characteristics itself is given the equations without the advection
+    advection = not problem_specification.solver.transports_coolant
+
+    # The analytic Jacobian saves the solver from estimating it with an extra call to the derivative for every state variable
+    if jacobian:
+        analytic_jacobian = kinetics_model.reduce_jacobian(Jacobian(problem_specification, advection))
+    else:
+        analytic_jacobian = None
+
+    # The solver integrates the variables of the kinetics model, which derivative works with directly through State
+    if compiled:
+        derivative_function = kinetics_model.reduce_derivative(CompiledDerivative(problem_specification, advection))
+    else:
+        derivative_function = partial(derivative, problem_specification=problem_specification, advection=advection)
+
+    if instrumentation is not None:
+        derivative_function, analytic_jacobian = instrumentation.instrument(problem_specification, derivative_function, analytic_jacobian)
+
+    return derivative_function, analytic_jacobian
+
+def calculate_future_states(start_state, problem_specification, compiled=True, jacobian=True, return_statistics=False, checkpoint_path=None, instrumentation=None, cache=None):
     '''Calculates the state at a series of times from the state at the initial time by using the equations of the system
     start_state -- The state at the start of the period being simulated (State)
-    end_time -- The time at the end of the simulated period (s)(float)
-    [return] -- The states at the specified times (np.array[State])'''
+    problem_specification -- The specification of the current physical system (ProblemSpecification)
+    compiled -- If True the rate of change is calculated by a CompiledDerivative, otherwise the derivative function is used (default True)(bool)
+    jacobian -- If True the analytic Jacobian is supplied to the solver, otherwise the solver estimates it by finite differences (default True)(bool)
+    return_statistics -- If True the statistics reported by the solver are returned as well as the states (default False)(bool)
+    checkpoint_path -- The path checkpoints are written to if the problem specification has a checkpoint interval (default None)(str)
+    instrumentation -- Records the evaluations of the equations and the steps of the solver, or None for the run not to be instrumented (default None)(Instrumentation)
+    cache -- Results of earlier runs which are reused if they match this one, and which this run is added to, or None not to use a cache. Checkpointed, restarted, instrumented and adaptive output runs don't use the cache (default None)(ResultCache)
+    [return] -- The states at the specified times (Trajectory) and, if requested, the solver statistics (dict)'''
+
+    if cache is not None and instrumentation is None and not problem_specification.events and problem_specification.adaptive_output is None and problem_specification.restart_from is None and (checkpoint_path is None or problem_specification.checkpoint_interval is None):
+        calculated_states, statistics = calculate_with_cache(start_state, problem_specification, compiled, jacobian, cache)
+        if return_statistics:
+            return calculated_states, statistics
+        return calculated_states
 
-    start_array = start_state.as_array
+    start_array = start_state.as_solved_array
 
-    calculated_arrays = odeint(derivative, start_array, problem_specification.output_times, args=(problem_specification,))
+    if instrumentation is not None:
+        instrumentation_span = instrumentation.span("solve")
+    else:
+        instrumentation_span = nullcontext()
 
-    calculated_states = np.array([State(problem_specification, time, array) for array, time in zip(calculated_arrays, problem_specification.output_times)])
+    # Runs with events are integrated from one output time to the next and may end early, and runs with adaptive output keep only some of the output times, so they make their own states
+    # They, and checkpointed and restarted runs, are calculated in chunks, for which the solver doesn't report statistics
+    with instrumentation_span:
+        if problem_specification.events:
+            calculated_states = calculate_with_events(start_state, problem_specification, compiled, jacobian, instrumentation)
+            statistics = {"solver": problem_specification.solver.name, "nfev": None, "njev": None, "nlu": None, "n_steps": None}
+        elif problem_specification.adaptive_output is not None:
+            derivative_function, analytic_jacobian = make_system_functions(problem_specification, compiled, jacobian, instrumentation)
+            calculated_states = calculate_with_adaptive_output(start_state, problem_specification, derivative_function, analytic_jacobian)
+            statistics = {"solver": problem_specification.solver.name, "nfev": None, "njev": None, "nlu": None, "n_steps": None}
+        else:
+            derivative_function, analytic_jacobian = make_system_functions(problem_specification, compiled, jacobian, instrumentation)
+            if problem_specification.restart_from is not None or (checkpoint_path is not None and problem_specification.checkpoint_interval is not None):
+                calculated_arrays = calculate_with_checkpoints(start_state, problem_specification, derivative_function, analytic_jacobian, checkpoint_path)
+                statistics = {"solver": problem_specification.solver.name, "nfev": None, "njev": None, "nlu": None, "n_steps": None}
+            else:
+                calculated_arrays, statistics = problem_specification.solver(derivative_function, analytic_jacobian, start_array, problem_specification.output_times, problem_specification.reactivity_breakpoints)
+
+            # The states are stored in full, whichever variables the solver integrated
+            calculated_arrays = problem_specification.kinetics_model.expand(calculated_arrays, problem_specification.output_times)
+            calculated_states = Trajectory(problem_specification, problem_specification.output_times, calculated_arrays)
+
+    if instrumentation is not None:
+        instrumentation.record_statistics(statistics)
+
+    if return_statistics:
+        return calculated_states, statistics
 
     return calculated_states
-  
\ No newline at end of file
+
+def calculate_with_adaptive_output(start_state, problem_specification, derivative_function, analytic_jacobian, chunk_size=1000):
+    '''Calculates the states at the output times in chunks, keeping only those the adaptive output of the problem specification needs to follow the solution
+    The output times are those the solver's dense output is sampled at, so the output timestep sets the shortest transient which can be seen, while only the states kept are held in memory
+    start_state -- The state at the start of the period being simulated (State)
+    problem_specification -- The specification of the current physical system, including its adaptive output (ProblemSpecification)
+    derivative_function -- The rate of change of the variables solved for as a function of them and time (function(np.array[float], float) -> np.array[float])
+    analytic_jacobian -- The Jacobian of the variables solved for, or None for the solver to estimate it (Jacobian)
+    chunk_size -- The number of output times calculated before they are thinned out (default 1000)(int)
+    [return] -- The states kept, at the times they were kept (Trajectory)'''
+
+    kinetics_model = problem_specification.kinetics_model
+    times = problem_specification.output_times
+
+    # The states are thinned out in full, whichever variables the solver integrated
+    chunks = ((chunk_times, kinetics_model.expand(chunk_arrays, chunk_times)) for chunk_times, chunk_arrays, _ in problem_specification.solver.stream(derivative_function, analytic_jacobian, start_state.as_solved_array, times, chunk_size, breakpoints=problem_specification.reactivity_breakpoints))
+    kept = list(problem_specification.adaptive_output.decimate(problem_specification, chunks))
+
+    return Trajectory(problem_specification, np.concatenate([kept_times for kept_times, _ in kept]), np.concatenate([kept_arrays for _, kept_arrays in kept]))
+
+def calculate_with_cache(start_state, problem_specification, compiled, jacobian, cache):
+    '''Calculates the states at the output times, reusing the results of an earlier run of the same problem from the same state where there is one
+    If the earlier run has all of the output times its results are returned without integrating at all. If it only shares the earlier ones, as when the problem has been extended in time, the integration continues from its last shared state
+    The results of a run which integrates are added to the cache
+    start_state -- The state at the start of the period being simulated (State)
+    problem_specification -- The specification of the current physical system (ProblemSpecification)
+    compiled -- If True the rate of change is calculated by a CompiledDerivative, otherwise the derivative function is used (bool)
+    jacobian -- If True the analytic Jacobian is supplied to the solver, otherwise the solver estimates it by finite differences (bool)
+    cache -- Results of earlier runs (ResultCache)
+    [return] -- The states at the output times (Trajectory) and the solver statistics, in which "n_cached" is the number of output times taken from the cache (dict)'''
+
+    kinetics_model = problem_specification.kinetics_model
+    times = problem_specification.output_times
+    key = cache.key(problem_specification, start_state.as_array, compiled, jacobian)
+
+    cached = cache.load(key, times)
+    if cached is not None and cached[0] == len(times):
+        n_cached, arrays, statistics = cached
+        statistics = dict(statistics, n_cached=n_cached)
+        return Trajectory(problem_specification, times, arrays), statistics
+
+    # The integration continues from the last shared state, which is repeated as the first row of the new states
+    if cached is None:
+        n_cached = 0
+        start_array = start_state.as_solved_array
+        integration_times = times
+    else:
+        n_cached, cached_arrays, _ = cached
+        start_array = kinetics_model.reduce(cached_arrays[-1:])[0]
+        integration_times = times[n_cached - 1:]
+
+    derivative_function, analytic_jacobian = make_system_functions(problem_specification, compiled, jacobian)
+    calculated_arrays, statistics = problem_specification.solver(derivative_function, analytic_jacobian, start_array, integration_times, problem_specification.reactivity_breakpoints)
+    calculated_arrays = kinetics_model.expand(calculated_arrays, integration_times)
+    if cached is not None:
+        calculated_arrays = np.concatenate((cached_arrays[:-1], calculated_arrays))
+
+    statistics = dict(statistics, n_cached=n_cached)
+    cache.save(key, times, calculated_arrays, statistics)
+
+    return Trajectory(problem_specification, times, calculated_arrays), statistics
+
+def calculate_with_events(start_state, problem_specification, compiled, jacobian, instrumentation=None):
+    '''Calculates the states at the output times, acting on the events of the problem specification as they happen
+    The system is integrated one output time at a time, and when an event is found to have been crossed since the last output time its time is located by root finding, integrating again from the last output time each time the event is evaluated
+    A "stop" event ends the states with the state at the event, a "scram" event changes the driving reactivity and continues from the state at the event, and a "record" event is only noted
+    Only the first scram sets off the insertion of the control rods, and later scram events are noted like "record" events
+    start_state -- The state at the start of the period being simulated (State)
+    problem_specification -- The specification of the current physical system, including its events (ProblemSpecification)
+    compiled -- If True the rate of change is calculated by a CompiledDerivative, otherwise the derivative function is used (bool)
+    jacobian -- If True the analytic Jacobian is supplied to the solver, otherwise the solver estimates it by finite differences (bool)
+    instrumentation -- Records the evaluations of the equations, or None for the run not to be instrumented (default None)(Instrumentation)
+    [return] -- The states at the output times reached, and at the event which stopped the simulation if there was one, with the events which happened (Trajectory)'''
+
+    times = problem_specification.output_times
+    output_times = [times[0]]
+    output_arrays = [start_state.as_array]
+    happened = []
+    scrammed = False
+
+    # The integration is restarted from the time of each scram with the new driving reactivity
+    start_time = times[0]
+    start_array = start_state.as_solved_array
+    scram_event = None
+
+    while True:
+        kinetics_model = problem_specification.kinetics_model
+        derivative_function, analytic_jacobian = make_system_functions(problem_specification, compiled, jacobian, instrumentation)
+        breakpoints = problem_specification.reactivity_breakpoints
+        segment_times = np.concatenate(([start_time], times[times > start_time]))
+
+        def state_at(time):
+            # The full state at a time after the last output time, integrated from it
+            if time == previous_time:
+                return(kinetics_model.expand(previous_array, time))
+            calculated_arrays, _ = problem_specification.solver(derivative_function, analytic_jacobian, previous_array, np.array([previous_time, time]), breakpoints)
+            return(kinetics_model.expand(calculated_arrays[-1], time))
+
+        previous_time = start_time
+        previous_array = start_array
+        previous_distances = [event(problem_specification, kinetics_model.expand(start_array, start_time), start_time) for event in problem_specification.events]
+        scram = None
+
+        # The root finding leaves the state at a scram just short of the setpoint of the event which set it off, so that event is taken as already crossed rather than being found again
+        for i_event, event in enumerate(problem_specification.events):
+            if event is scram_event:
+                previous_distances[i_event] = max(previous_distances[i_event], 0)
+
+        for chunk_times, chunk_arrays, _ in problem_specification.solver.stream(derivative_function, analytic_jacobian, start_array, segment_times, 1, breakpoints=breakpoints):
+            time = chunk_times[0]
+            if time <= previous_time:
+                continue
+
+            full_array = kinetics_model.expand(chunk_arrays[0], time)
+            distances = [event(problem_specification, full_array, time) for event in problem_specification.events]
+
+            # Locate each event crossed since the last output time and act on them in the order they happened
+            crossings = []
+            for event, previous_distance, distance in zip(problem_specification.events, previous_distances, distances):
+                if previous_distance < 0 <= distance:
+                    # The ends of the interval keep the distances already found, so the root stays bracketed
+                    def distance_at(t, event=event, distance=distance):
+                        return(distance if t == time else event(problem_specification, state_at(t), t))
+                    event_time = brentq(distance_at, previous_time, time, xtol=event.relative_time_tolerance * (time - previous_time))
+                    crossings.append((event_time, event))
+
+            stop = None
+            for event_time, event in sorted(crossings, key=lambda crossing: crossing[0]):
+                happened.append((event_time, event))
+                if event.action == "stop":
+                    stop = event_time
+                    break
+                elif event.action == "scram" and not scrammed:
+                    scram = (event_time, event)
+                    scrammed = True
+                    break
+
+            if stop is not None:
+                output_times.append(stop)
+                output_arrays.append(state_at(stop))
+                return(Trajectory(problem_specification, np.array(output_times), np.array(output_arrays), happened))
+            if scram is not None:
+                break
+
+            output_times.append(time)
+            output_arrays.append(full_array)
+            previous_time, previous_array, previous_distances = time, chunk_arrays[0], distances
+
+        if scram is None:
+            return(Trajectory(problem_specification, np.array(output_times), np.array(output_arrays), happened))
+
+        # Continue from the state at the scram with the control rods inserted after the delay
+        start_time, scram_event = scram
+        start_array = kinetics_model.reduce(state_at(start_time))
+        problem_specification = problem_specification.with_reactivity(scram[1].scram_reactivity(problem_specification.reactivity_profile, start_time))
+
+def calculate_with_checkpoints(start_state, problem_specification, derivative_function, analytic_jacobian, checkpoint_path):
+    '''Calculates the states at the output times in chunks of the checkpoint interval, saving a checkpoint after each chunk
+    If the problem specification has a checkpoint to restart from, the earlier outputs are loaded and the calculation continues from the state and step size of the checkpoint
+    The outputs are appended to a trajectory file next to the checkpoint, which is what allows a later restart to recover them
+    start_state -- The state at the start of the period being simulated, which is ignored when restarting (State)
+    problem_specification -- The specification of the current physical system (ProblemSpecification)
+    derivative_function -- Calculates the rate of change from the state array and time (function(np.array[float], float) -> np.array[float])
+    analytic_jacobian -- The analytic Jacobian of the system, or None for the solver to estimate it (Jacobian)
+    checkpoint_path -- The path checkpoints are written to, or None for no checkpoints (str)
+    [return] -- The variables solved for at the output times, one per row (np.array[float])'''
+
+    kinetics_model = problem_specification.kinetics_model
+    times = problem_specification.output_times
+    arrays = np.zeros((len(times), problem_specification.n_solved_variables))
+    i_start = 0
+    start_array = start_state.as_solved_array
+    first_step = None
+
+    if problem_specification.restart_from is not None:
+        # If the checkpoint is from a different problem raise an exception
+        checkpoint = load_checkpoint(problem_specification.restart_from)
+        if checkpoint.specification_hash != problem_specification.content_hash:
+            raise ValueError("The checkpoint '{}' was not created from this problem specification.".format(problem_specification.restart_from))
+
+        # The outputs up to the checkpoint are read into memory, as the trajectory file may be about to be rewritten
+        i_start = checkpoint.n_outputs - 1
+        arrays[:i_start] = kinetics_model.reduce(load_trajectory(checkpoint.trajectory_path, problem_specification, None).arrays[:i_start])
+        start_array = checkpoint.state_array
+        first_step = checkpoint.step_size
+
+    if checkpoint_path is None or problem_specification.checkpoint_interval is None:
+        chunk_size = len(times)
+        writer = None
+    else:
+        # The number of output times in each checkpoint interval
+        chunk_size = max(1, np.searchsorted(times, times[0] + problem_specification.checkpoint_interval, side="right") - 1)
+        trajectory_path = os.path.splitext(checkpoint_path)[0] + "_trajectory.npy"
+        writer = TrajectoryWriter(trajectory_path, len(times), problem_specification.n_state_variables)
+        if i_start > 0:
+            writer.append(Trajectory(problem_specification, times[:i_start], kinetics_model.expand(arrays[:i_start], times[:i_start])))
+
+    for chunk_times, chunk_arrays, step_size in problem_specification.solver.stream(derivative_function, analytic_jacobian, start_array, times[i_start:], chunk_size, first_step, problem_specification.reactivity_breakpoints):
+        i_end = i_start + len(chunk_times)
+        arrays[i_start:i_end] = chunk_arrays
+
+        if writer is not None:
+            writer.append(Trajectory(problem_specification, chunk_times, kinetics_model.expand(chunk_arrays, chunk_times)))
+            Checkpoint(times[i_end - 1], arrays[i_end - 1], step_size, i_end, problem_specification.content_hash, trajectory_path).save(checkpoint_path)
+
+        i_start = i_end
+
+    if writer is not None:
+        writer.close()
+
+    return arrays
+
+def stream_future_states(start_state, problem_specification, chunk_size=1000, compiled=True, jacobian=True):
+    '''Calculates the states at the output times in chunks, yielding each chunk as soon as it has been calculated so that the whole run is never held in memory
+    start_state -- The state at the start of the period being simulated (State)
+    problem_specification -- The specification of the current physical system (ProblemSpecification)
+    chunk_size -- The maximum number of output times in each chunk (default 1000)(int)
+    compiled -- If True the rate of change is calculated by a CompiledDerivative, otherwise the derivative function is used (default True)(bool)
+    jacobian -- If True the analytic Jacobian is supplied to the solver, otherwise the solver estimates it by finite differences (default True)(bool)
+    [return] -- The states at consecutive output times (iterator[Trajectory])'''
+
+    derivative_function, analytic_jacobian = make_system_functions(problem_specification, compiled, jacobian)
+
+    for times, arrays, step_size in problem_specification.solver.stream(derivative_function, analytic_jacobian, start_state.as_solved_array, problem_specification.output_times, chunk_size, breakpoints=problem_specification.reactivity_breakpoints):
+        yield Trajectory(problem_specification, times, problem_specification.kinetics_model.expand(arrays, times))
+
+def write_future_states(start_state, problem_specification, file_path, chunk_size=1000, compiled=True, jacobian=True):
+    '''Calculates the states at the output times and writes them to a .npy file chunk by chunk as they are calculated
+    The file can be loaded with load_trajectory, including while the run is going or after it has stopped early
+    start_state -- The state at the start of the period being simulated (State)
+    problem_specification -- The specification of the current physical system (ProblemSpecification)
+    file_path -- The path of the .npy file to be written (str)
+    chunk_size -- The maximum number of output times in each chunk (default 1000)(int)
+    compiled -- If True the rate of change is calculated by a CompiledDerivative, otherwise the derivative function is used (default True)(bool)
+    jacobian -- If True the analytic Jacobian is supplied to the solver, otherwise the solver estimates it by finite differences (default True)(bool)'''
+
+    with TrajectoryWriter(file_path, len(problem_specification.output_times), problem_specification.n_state_variables) as writer:
+        for chunk in stream_future_states(start_state, problem_specification, chunk_size, compiled, jacobian):
+            writer.append(chunk)
@@ -0,0 +1,104 @@
+import numpy as np
+
+class InputIndex():
+    '''The lines of an input indexed by their identifier, the first word of the line, so that each value is found without searching the input
+    The index is built in a single pass over the lines, which also checks that no identifier is given twice and, if the known identifiers are given, that every identifier is known
+    An identifier ending in "_" and a number, such as "delayed_fraction_1", is known if the identifier without the number, "delayed_fraction_", is in the known identifiers'''
+    def __init__(self, split_lines, known_identifiers=None, repeatable_identifiers=()):
+        '''Constructs the index of an input
+        self -- The instance of InputIndex being constructed (InputIndex)
+        split_lines -- The lines of the input split into individual words ([[String]])
+        known_identifiers -- The identifiers which may appear in the input, or None to allow any identifier (default None)({String})
+        repeatable_identifiers -- The identifiers which may appear on more than one line (default ())((String))'''
+
+        self._entries = {}
+        self._line_numbers = {}
+
+        for i_line, line in enumerate(split_lines):
+            # Blank lines are ignored
+            if len(line) == 0:
+                continue
+
+            identifier = line[0]
+
+            # If the identifier isn't known or has been given before raise an exception
+            prefix = identifier.rstrip("0123456789")
+            if known_identifiers is not None and identifier not in known_identifiers and not (prefix.endswith("_") and prefix in known_identifiers):
+                raise(ValueError("Line {} of the input has the unknown identifier '{}'".format(i_line + 1, identifier)))
+            if identifier in self._entries and identifier not in repeatable_identifiers:
+                raise(ValueError("The identifier '{}' is given on both line {} and line {} of the input".format(identifier, self._line_numbers[identifier][0], i_line + 1)))
+
+            self._entries.setdefault(identifier, []).append(line[1:])
+            self._line_numbers.setdefault(identifier, []).append(i_line + 1)
+
+    @property
+    def identifiers(self):
+        ''' Returns the identifiers given in the input
+        self -- The index the value is being returned from (InputIndex)
+        [return] -- The identifiers in the order they first appear ([String])'''
+        return(list(self._entries))
+
+    def __contains__(self, identifier):
+        ''' Returns whether the input contains an identifier
+        self -- The index being checked (InputIndex)
+        identifier -- The identifier being looked for (String)
+        [return] -- Whether the identifier is in the input (bool)'''
+        return(identifier in self._entries)
+
+    def words(self, identifier):
+        ''' Returns the words following the identifier on its line
+        self -- The index the value is being returned from (InputIndex)
+        identifier -- The identifier of the line (String)
+        [return] -- The words following the identifier ([String])'''
+
+        # If the identifier isn't in the input or has nothing following it raise an exception
+        if identifier not in self._entries or len(self._entries[identifier][0]) == 0:
+            raise(ValueError("The input did not contain a specification of the value '" + identifier + "'"))
+
+        return(self._entries[identifier][0])
+
+    def all_words(self, identifier):
+        ''' Returns the words following the identifier on each of the lines it is given on, for identifiers which may be repeated
+        self -- The index the value is being returned from (InputIndex)
+        identifier -- The identifier of the lines (String)
+        [return] -- The words following the identifier on each line, which is empty if there are no such lines ([[String]])'''
+        return(self._entries.get(identifier, []))
+
+    def value(self, identifier, return_type):
+        ''' Returns the value following the identifier as the specified type
+        self -- The index the value is being returned from (InputIndex)
+        identifier -- The identifier of the value (String)
+        return_type -- The type the returned value should have (Type)
+        [return] -- The value (return_type)'''
+
+        word = self.words(identifier)[0]
+        try:
+            return(return_type(word))
+        except ValueError:
+            raise(ValueError("The value '{}' of '{}' on line {} of the input is not a valid {}".format(word, identifier, self._line_numbers[identifier][0], return_type.__name__)))
+
+    def optional_value(self, identifier, return_type, default):
+        ''' Returns the value following the identifier as the specified type, or a default value if the input does not specify it
+        self -- The index the value is being returned from (InputIndex)
+        identifier -- The identifier of the value (String)
+        return_type -- The type the returned value should have (Type)
+        default -- The value to be returned if the input doesn't contain the identifier
+        [return] -- The value (return_type)'''
+
+        if identifier not in self._entries:
+            return(default)
+
+        return(self.value(identifier, return_type))
+
+    def array(self, identifier, return_type=float):
+        ''' Returns all of the values following the identifier as an array of the specified type
+        self -- The index the value is being returned from (InputIndex)
+        identifier -- The identifier of the values (String)
+        return_type -- The type the values should have (default float)(Type)
+        [return] -- The values (np.array[return_type])'''
+
+        words = self.words(identifier)
+        try:
+            return(np.array([return_type(word) for word in words]))
+        except ValueError:
+            raise(ValueError("The values of '{}' on line {} of the input are not all valid {}".format(identifier, self._line_numbers[identifier][0], return_type.__name__)))
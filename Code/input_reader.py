@@ -1,60 +1,161 @@
 import numpy as np
+import os
 from constant_reactivity import ConstantReactivity
 from ramp_reactivity import RampReactivity
+from tabulated_reactivity import TabulatedReactivity
+from odeint_solver import OdeintSolver
+from solve_ivp_solver import SolveIvpSolver
+from multirate_solver import MultirateSolver
+from characteristics_solver import CharacteristicsSolver
+from event import Event
+from adaptive_output import AdaptiveOutput
+from axial_mesh import geometric_boundaries
 from problem_specification import ProblemSpecification
+from input_index import InputIndex
+from sweep_specification import SweepSpecification
 
-def get_value(split_lines, identifier, return_type):
-    '''Attempts to find a single line which begins with the identifier and returns the following value. Lines with only one word will be ignored. If more than one line has this identifier the first value will be selected
-    lines -- The lines of the input split into individual words ([[String]])
+# The identifiers which may be given in an input. Identifiers ending in a number, such as "delayed_fraction_1", are listed without the number but with the "_" before it
+known_identifiers = {"simulation_name", "n_z", "n_delayed", "delayed_fraction_", "delayed_decay_rate_", "delayed_fractions", "delayed_decay_rates",
+                     "source", "generation_time", "feedback_fuel", "feedback_coolant", "energy_fission", "heat_capacity_fuel", "total_height",
+                     "heat_transfer_coefficient", "thermal_conductivity_fuel", "heat_capacity_coolant", "speed_coolant", "temperature_zero",
+                     "extrapolation_distance_bottom", "extrapolation_distance_top", "reactivity", "simulated_time", "output_timestep",
+                     "solver", "rtol", "atol", "max_step", "first_step", "initial_condition", "kinetics", "checkpoint_interval", "restart_from",
+                     "n_channels", "channel_peaking", "channel_speed_coolant", "channel_heat_capacity_fuel", "channel_heat_capacity_coolant", "event",
+                     "output_mode", "output_rtol", "output_atol_power", "output_atol_temperature", "output_max_interval",
+                     "axial_mesh", "axial_boundaries", "axial_grading"}
+
+# The identifiers which may be given on more than one line of an input
+repeatable_identifiers = ("event",)
+
+
+# The identifiers which may be given in a sweep file
+known_sweep_identifiers = {"base", "mode", "samples", "seed", "ensemble", "parameter"}
+
+# The identifiers which may be changed on a problem specification which has already been read without reading the input again, as they don't change the shapes of its arrays
+cheap_identifiers = ("reactivity", "feedback_fuel", "feedback_coolant", "simulated_time")
+
+# The identifiers whose values are whole numbers, which a Latin hypercube sweep draws as whole numbers
+integer_identifiers = ("n_z", "n_delayed", "n_channels")
+
+def get_reactivity(input_index, identifier):
+    '''Finds the line which begins with the identifier which specifies a reactivity profile and then constructs that profile.
+    input_index -- The lines of the input indexed by their identifier (InputIndex)
     identifier -- The identifier which is being searched for (String)
-    return_type -- The type the returned value should have (Type)'''
-
-    # Check each line
-    for line in split_lines:
-        # If the line isn't long enough, progress to the next
-        if len(line) < 2:
-            continue
-        # If the line begins with the identifier, try to return the value as the specified type
-        if line[0] == identifier:
-            try:
-                return  return_type(line[1])
-            # If the value doesn't exist or can't be converted move to the next one
-            except (ValueError, IndexError):
-                continue
-    else:
-        raise (ValueError("The input did not contain a specification of the value '" + identifier + "'"))
-
-def get_reactivity(split_lines, identifier):
-    '''Attempts to find a single line which begins with the identifier which specifies a reactivity profile and the constructs that profile.
-    lines -- The lines of the input split into individual words ([[String]])
-    identifier -- The identifier which is being searched for (String)'''
-
-    # Check each line
-    for line in split_lines:
-        # If the line isn't long enough, progress to the next
-        if len(line) < 3:
-            continue
-        if line[0] == identifier:
-            # If the line begins with the identifier, check what type of reactivity profile is being created and create it
-            if line[1] == "constant":
-                try:
-                    return ConstantReactivity(float(line[2]))
-                except (ValueError):
-                    # If the value can't be converted then move on to the next line move on to the next line
-                    continue
-            elif line[1] == "ramp":
-                try:
-                    return RampReactivity(float(line[2]), float(line[3]), float(line[4]), float(line[5]))
-                except (IndexError, ValueError):
-                    # If the value doesn't exist on the line or can't be converted to a real move on to the next line
-                    continue
+    [return] -- The reactivity profile (ConstantReactivity, RampReactivity or TabulatedReactivity)'''
+
+    words = input_index.words(identifier)
+
+    # Check what type of reactivity profile is being created and create it
+    try:
+        if words[0] == "constant":
+            return ConstantReactivity(float(words[1]))
+        elif words[0] == "ramp":
+            return RampReactivity(float(words[1]), float(words[2]), float(words[3]), float(words[4]))
+        elif words[0] == "piecewise":
+            # The rest of the line alternates between times and reactivities, which are joined by straight lines
+            values = [float(word) for word in words[1:]]
+            return TabulatedReactivity(values[0::2], values[1::2])
+        elif words[0] == "table":
+            # The table is read from a file with a time and a reactivity on each line, and is interpolated linearly unless "spline" follows the file path
+            table = np.loadtxt(words[1], ndmin=2)
+            interpolation = words[2] if len(words) > 2 else "linear"
+            return TabulatedReactivity(table[:, 0], table[:, 1], interpolation)
+    except (IndexError, ValueError) as error:
+        # If a value doesn't exist on the line or can't be converted to a real, say which line is wrong
+        raise(ValueError("The reactivity '{}' is not valid: {}".format(" ".join(words), error)))
+
+    raise(ValueError("The reactivity type '{}' is not one of constant, ramp, piecewise or table.".format(words[0])))
+
+def get_reactivity_files(split_lines):
+    '''Finds the files, other than the input itself, which the reactivity profile of an input is read from
+    split_lines -- The lines of the input split into individual words ([[String]])
+    [return] -- The paths of the files ([String])'''
+    return([line[2] for line in split_lines if len(line) > 2 and line[0] == "reactivity" and line[1] == "table"])
+
+def get_events(input_index):
+    '''Constructs the events from the optional "event" lines, of which there may be any number
+    Each line gives the quantity, "above" or "below", the setpoint and the action, and a scram is followed by the delay, the depth and the insertion time, as in "event power above 2e8 scram 0.1 5 0.5"
+    input_index -- The lines of the input indexed by their identifier (InputIndex)
+    [return] -- The events ([Event])'''
+
+    events = []
+    for words in input_index.all_words("event"):
+        try:
+            if len(words) != (7 if words[3] == "scram" else 4):
+                raise ValueError("it should have a quantity, a direction, a setpoint and an action, and a scram should also have a delay, a depth and an insertion time")
+            events.append(Event(words[0], words[1], float(words[2]), words[3], *[float(word) for word in words[4:]]))
+        except (IndexError, ValueError) as error:
+            # If a value doesn't exist on the line or can't be converted, say which line is wrong
+            raise(ValueError("The event '{}' is not valid: {}".format(" ".join(words), error)))
+
+    return events
+
+def get_adaptive_output(input_index):
+    '''Constructs the adaptive output from the optional lines "output_mode", "output_rtol", "output_atol_power", "output_atol_temperature" and "output_max_interval". Unless the output mode is "adaptive" every output time is kept
+    input_index -- The lines of the input indexed by their identifier (InputIndex)
+    [return] -- The adaptive output, or None if every output time is kept (AdaptiveOutput)'''
+
+    output_mode = input_index.optional_value("output_mode", str, "uniform")
+
+    # If the output mode isn't recognised raise an exception
+    if output_mode not in ("uniform", "adaptive"):
+        raise(ValueError("The output mode '{}' is not 'uniform' or 'adaptive'.".format(output_mode)))
+    if output_mode == "uniform":
+        return None
+
+    rtol = input_index.optional_value("output_rtol", float, 1e-3)
+    atol_power = input_index.optional_value("output_atol_power", float, 0.0)
+    atol_temperature = input_index.optional_value("output_atol_temperature", float, 0.0)
+    max_interval = input_index.optional_value("output_max_interval", float, None)
+
+    return AdaptiveOutput(rtol, atol_power, atol_temperature, max_interval)
+
+def get_axial_boundaries(input_index, n_z, total_height):
+    '''Finds the boundaries of the vertical discretisations from the optional lines "axial_mesh", "axial_boundaries" and "axial_grading"
+    The axial mesh is "uniform" for discretisations of equal height, "boundaries" for the heights listed on the "axial_boundaries" line or "geometric" for heights changing by the same ratio from each discretisation to the next with the top one "axial_grading" times the height of the bottom one
+    input_index -- The lines of the input indexed by their identifier (InputIndex)
+    n_z -- The number of discretisations (int)
+    total_height -- The total height of the simulated domain (m)(float)
+    [return] -- The boundaries of the discretisations, or None for discretisations of equal height (m)(np.array[float])'''
+
+    axial_mesh = input_index.optional_value("axial_mesh", str, "boundaries" if "axial_boundaries" in input_index else "uniform")
+
+    # If the axial mesh isn't recognised, or its boundaries aren't given with it, raise an exception
+    if axial_mesh not in ("uniform", "boundaries", "geometric"):
+        raise(ValueError("The axial mesh '{}' is not 'uniform', 'boundaries' or 'geometric'.".format(axial_mesh)))
+    if ("axial_boundaries" in input_index) != (axial_mesh == "boundaries"):
+        raise(ValueError("The axial boundaries are given by the line 'axial_boundaries' if and only if the axial mesh is 'boundaries'."))
+
+    if axial_mesh == "uniform":
+        return None
+    elif axial_mesh == "boundaries":
+        return input_index.array("axial_boundaries")
+    return geometric_boundaries(n_z, total_height, input_index.value("axial_grading", float))
+
+def get_solver(input_index):
+    '''Constructs the solver from the optional lines "solver", "rtol", "atol", "max_step" and "first_step". If there is no solver line odeint is used
+    input_index -- The lines of the input indexed by their identifier (InputIndex)
+    [return] -- The solver (OdeintSolver, MultirateSolver, CharacteristicsSolver or SolveIvpSolver)'''
+
+    solver = input_index.optional_value("solver", str, "odeint")
+    rtol = input_index.optional_value("rtol", float, None)
+    atol = input_index.optional_value("atol", float, None)
+    max_step = input_index.optional_value("max_step", float, None)
+    first_step = input_index.optional_value("first_step", float, None)
+
+    if solver == "odeint":
+        return OdeintSolver(rtol, atol, max_step, first_step)
+    elif solver == "multirate":
+        return MultirateSolver(rtol, atol, max_step, first_step)
+    elif solver == "characteristics":
+        return CharacteristicsSolver(rtol, atol, max_step, first_step)
     else:
-        raise(ValueError("The input did not contain a specification for the reactivity."))
+        return SolveIvpSolver(solver, rtol, atol, max_step, first_step)
 
-def read_input(file_path):
-    '''Reads the an input file from a specified path, reads it, extracts the relevant values and populates an instance of ProblemSpecification
-    file_path -- The relative file path to the input file (string)
-    [return] -- The specification of the problem'''
+def read_lines(file_path):
+    '''Reads a file from a specified path and splits each of its lines into individual words
+    file_path -- The relative file path to the file (string)
+    [return] -- The lines of the file split into individual words ([[String]])'''
 
     # This syntax causes the specified file to be open during the construct below
     # If there is an error the file will be closed
@@ -63,41 +164,201 @@ def read_input(file_path):
         lines = f.readlines()
 
     # Split each line into individual words
-    split_lines = [line.split() for line in lines]
+    return [line.split() for line in lines]
+
+def split_content(content):
+    '''Splits the content of a file into lines and each of its lines into individual words
+    content -- The content of the file (bytes)
+    [return] -- The lines of the file split into individual words ([[String]])'''
+    return [line.split() for line in content.decode().splitlines()]
+
+def apply_overrides(split_lines, overrides):
+    '''Creates a copy of the split lines of an input with some of the values replaced
+    Each override is identified either by an identifier, which replaces the value following it, or by "identifier:position", which replaces the word at that position on the line counting the identifier as position 0
+    For example, "reactivity:5" is the final reactivity of the line "reactivity ramp 1 2 0 1"
+    If an identifier which is replaced by its following value is not in the input, it is added as a new line
+    split_lines -- The lines of the input split into individual words ([[String]])
+    overrides -- The replacement values, keyed by the identifier and optional position ({String: value})
+    [return] -- The lines of the input with the values replaced ([[String]])'''
+
+    new_lines = [list(line) for line in split_lines]
+
+    for key, value in overrides.items():
+        if ":" in key:
+            identifier, position = key.split(":")
+            position = int(position)
+        else:
+            identifier, position = key, 1
+
+        # Replace the word on the first line which begins with the identifier and is long enough
+        for line in new_lines:
+            if len(line) > position and line[0] == identifier:
+                line[position] = str(value)
+                break
+        else:
+            if position == 1:
+                new_lines.append([identifier, str(value)])
+            else:
+                raise(ValueError("The input did not contain a line '" + identifier + "' with a word at position " + str(position)))
+
+    return new_lines
+
+def override_specification(problem_specification, split_lines, overrides):
+    '''Applies overrides to a problem specification which has already been read from an input, without reading the input again, if they only change the values of cheap_identifiers
+    problem_specification -- The specification read from the lines (ProblemSpecification)
+    split_lines -- The lines of the input the problem specification was read from, split into individual words ([[String]])
+    overrides -- Values which replace those in the input, as described in apply_overrides ({String: value})
+    [return] -- The specification with the values replaced, or None if an override changes another value so the input must be read again (ProblemSpecification)'''
+
+    identifiers = set(key.split(":")[0] for key in overrides)
+    if not identifiers.issubset(cheap_identifiers):
+        return None
+
+    input_index = InputIndex(apply_overrides(split_lines, overrides), known_identifiers, repeatable_identifiers)
+
+    if "reactivity" in identifiers:
+        problem_specification = problem_specification.with_reactivity(get_reactivity(input_index, "reactivity"))
+    if "feedback_fuel" in identifiers or "feedback_coolant" in identifiers:
+        problem_specification = problem_specification.with_feedback(input_index.value("feedback_fuel", float), input_index.value("feedback_coolant", float))
+    if "simulated_time" in identifiers:
+        problem_specification = problem_specification.with_simulated_time(input_index.value("simulated_time", float))
+
+    return problem_specification
+
+def read_input(file_path, overrides=None, cache=None):
+    '''Reads the an input file from a specified path, reads it, extracts the relevant values and populates an instance of ProblemSpecification
+    file_path -- The relative file path to the input file (string)
+    overrides -- Values which replace those in the file, as described in apply_overrides (default None)({String: value})
+    cache -- A cache of problem specifications which have already been read, or None to always read the input (default None)(SpecificationCache)
+    [return] -- The specification of the problem'''
+
+    with open(file_path, "rb") as f:
+        content = f.read()
+
+    return parse_content(content, overrides, cache)
+
+def parse_content(content, overrides=None, cache=None):
+    '''Extracts the relevant values from the content of an input file and populates an instance of ProblemSpecification
+    If a cache is given and holds the problem specification of the same content and overrides it is returned without reading the input, otherwise the problem specification is added to the cache
+    content -- The content of the input file (bytes)
+    overrides -- Values which replace those in the file, as described in apply_overrides (default None)({String: value})
+    cache -- A cache of problem specifications which have already been read, or None to always read the input (default None)(SpecificationCache)
+    [return] -- The specification of the problem'''
+
+    if cache is not None:
+        key = cache.key(content, overrides)
+        problem_specification = cache.load(key)
+        if problem_specification is not None:
+            return problem_specification
+
+    split_lines = split_content(content)
+
+    if overrides:
+        split_lines = apply_overrides(split_lines, overrides)
+
+    problem_specification = parse_input(split_lines)
+
+    if cache is not None:
+        cache.save(key, problem_specification, get_reactivity_files(split_lines))
+
+    return problem_specification
+
+def parse_input(split_lines):
+    '''Extracts the relevant values from the lines of an input and populates an instance of ProblemSpecification
+    split_lines -- The lines of the input split into individual words ([[String]])
+    [return] -- The specification of the problem'''
+
+    # Index the lines in a single pass so that each value is found without searching the input
+    input_index = InputIndex(split_lines, known_identifiers, repeatable_identifiers)
 
     # Find out how many delayed neutron precursor groups there are
-    n_delayed = get_value(split_lines, "n_delayed", int)
+    n_delayed = input_index.value("n_delayed", int)
 
-    # Create the arrays to hold the values of beta and lambda fir the delayed neutron precursor groups
-    betas = np.zeros([n_delayed])
-    lambdas = np.zeros([n_delayed])
+    # The values of beta and lambda for the delayed neutron precursor groups are either given as arrays or one per line
+    if "delayed_fractions" in input_index:
+        betas = input_index.array("delayed_fractions")
+    else:
+        betas = np.array([input_index.value("delayed_fraction_" + str(i_delayed + 1), float) for i_delayed in range(n_delayed)])
+    if "delayed_decay_rates" in input_index:
+        lambdas = input_index.array("delayed_decay_rates")
+    else:
+        lambdas = np.array([input_index.value("delayed_decay_rate_" + str(i_delayed + 1), float) for i_delayed in range(n_delayed)])
 
-    for i_delayed in range(n_delayed):
-        betas[i_delayed] = get_value(split_lines, "delayed_fraction_" + str(i_delayed + 1), float)
-        lambdas[i_delayed] = get_value(split_lines, "delayed_decay_rate_" + str(i_delayed + 1), float)
+    # If the number of groups doesn't match the values given, raise an exception
+    if len(betas) != n_delayed or len(lambdas) != n_delayed:
+        raise(ValueError("The input has {} delayed neutron precursor groups but {} fractions and {} decay rates.".format(n_delayed, len(betas), len(lambdas))))
+    numbered_identifiers = ["delayed_fraction_" + str(i_delayed + 1) for i_delayed in range(n_delayed)] + ["delayed_decay_rate_" + str(i_delayed + 1) for i_delayed in range(n_delayed)]
+    for identifier in input_index.identifiers:
+        if identifier.startswith(("delayed_fraction_", "delayed_decay_rate_")) and identifier not in numbered_identifiers:
+            raise(ValueError("The input has {} delayed neutron precursor groups but specifies '{}'.".format(n_delayed, identifier)))
 
     # Get various other values from the input file
-    n_z = get_value(split_lines, "n_z", int)
-    source = get_value(split_lines, "source", float)
-    generation_time = get_value(split_lines, "generation_time", float)
-    feedback_fuel = get_value(split_lines, "feedback_fuel", float)
-    feedback_coolant = get_value(split_lines, "feedback_coolant", float)
-    energy_fission = get_value(split_lines, "energy_fission", float)
-    heat_capacity_fuel = get_value(split_lines, "heat_capacity_fuel", float)
-    total_height = get_value(split_lines, "total_height", float)
-    heat_transfer_coefficient = get_value(split_lines, "heat_transfer_coefficient", float)
-    thermal_conductivity_fuel = get_value(split_lines, "thermal_conductivity_fuel", float)
-    heat_capacity_coolant = get_value(split_lines, "heat_capacity_coolant", float)
-    speed_coolant = get_value(split_lines, "speed_coolant", float)
-    extrapolation_distance_bottom = get_value(split_lines, "extrapolation_distance_bottom", float)
-    extrapolation_distance_top = get_value(split_lines, "extrapolation_distance_top", float)
-    temperature_zero = get_value(split_lines, "temperature_zero", float)
-    reactivity_driving = get_reactivity(split_lines, "reactivity")
-
-    simulated_time = get_value(split_lines, "simulated_time", float)
-    output_timestep = get_value(split_lines, "output_timestep", float)
-
-    simulation_name = get_value(split_lines, "simulation_name", str)
+    n_z = input_index.value("n_z", int)
+    source = input_index.value("source", float)
+    generation_time = input_index.value("generation_time", float)
+    feedback_fuel = input_index.value("feedback_fuel", float)
+    feedback_coolant = input_index.value("feedback_coolant", float)
+    energy_fission = input_index.value("energy_fission", float)
+    heat_capacity_fuel = input_index.value("heat_capacity_fuel", float)
+    total_height = input_index.value("total_height", float)
+    heat_transfer_coefficient = input_index.value("heat_transfer_coefficient", float)
+    thermal_conductivity_fuel = input_index.value("thermal_conductivity_fuel", float)
+    heat_capacity_coolant = input_index.value("heat_capacity_coolant", float)
+    speed_coolant = input_index.value("speed_coolant", float)
+    extrapolation_distance_bottom = input_index.value("extrapolation_distance_bottom", float)
+    extrapolation_distance_top = input_index.value("extrapolation_distance_top", float)
+    temperature_zero = input_index.value("temperature_zero", float)
+    reactivity_driving = get_reactivity(input_index, "reactivity")
+
+    simulated_time = input_index.value("simulated_time", float)
+    output_timestep = input_index.value("output_timestep", float)
+
+    simulation_name = input_index.value("simulation_name", str)
+
+    solver = get_solver(input_index)
+
+    initial_condition = input_index.optional_value("initial_condition", str, "cold")
+    kinetics = input_index.optional_value("kinetics", str, "full")
+
+    # The core may be split into channels, each of which has one value per channel of any of the parameters given, otherwise the channels are identical
+    n_channels = input_index.optional_value("n_channels", int, 1)
+    channel_arrays = [input_index.array(identifier) if identifier in input_index else None for identifier in ("channel_peaking", "channel_speed_coolant", "channel_heat_capacity_fuel", "channel_heat_capacity_coolant")]
+
+    checkpoint_interval = input_index.optional_value("checkpoint_interval", float, None)
+    restart_from = input_index.optional_value("restart_from", str, None)
+
+    events = get_events(input_index)
+    adaptive_output = get_adaptive_output(input_index)
+
+    axial_boundaries = get_axial_boundaries(input_index, n_z, total_height)
 
     # Make and return the problem specification
-    return ProblemSpecification(n_z, betas, reactivity_driving, generation_time, lambdas, source, feedback_fuel, temperature_zero, feedback_coolant, energy_fission, heat_capacity_fuel, total_height, heat_transfer_coefficient, thermal_conductivity_fuel, heat_capacity_coolant, speed_coolant, extrapolation_distance_bottom, extrapolation_distance_top, simulated_time, output_timestep, simulation_name)
\ No newline at end of file
+    return ProblemSpecification(n_z, betas, reactivity_driving, generation_time, lambdas, source, feedback_fuel, temperature_zero, feedback_coolant, energy_fission, heat_capacity_fuel, total_height, heat_transfer_coefficient, thermal_conductivity_fuel, heat_capacity_coolant, speed_coolant, extrapolation_distance_bottom, extrapolation_distance_top, simulated_time, output_timestep, simulation_name, solver, checkpoint_interval, restart_from, initial_condition, kinetics, n_channels, *channel_arrays, events, adaptive_output, axial_boundaries)
+
+def read_sweep(file_path):
+    '''Reads a sweep file from a specified path and constructs the specification of the sweep
+    The file has the lines "base" with the path to the base input, relative to the sweep file, "mode" with the sweep mode and one line per swept parameter of the form "parameter identifier value value ...". A Latin hypercube sweep also has "samples" and optionally "seed", and any sweep may have "ensemble" with the number of runs integrated together as an ensemble
+    file_path -- The relative file path to the sweep file (string)
+    [return] -- The specification of the sweep (SweepSpecification)'''
+
+    input_index = InputIndex(read_lines(file_path), known_sweep_identifiers, ("parameter",))
+
+    # The base input is found from the directory of the sweep file, so that the sweep can be run from any directory
+    base_path = os.path.join(os.path.dirname(file_path), input_index.value("base", str))
+    mode = input_index.value("mode", str)
+    samples = input_index.optional_value("samples", int, None)
+    seed = input_index.optional_value("seed", int, None)
+    ensemble_size = input_index.optional_value("ensemble", int, None)
+
+    # Each parameter line gives the identifier of the parameter followed by its values
+    parameters = {}
+    for words in input_index.all_words("parameter"):
+        if len(words) > 1:
+            parameters[words[0]] = words[1:]
+
+    if not parameters:
+        raise(ValueError("The sweep did not contain any parameters."))
+
+    integer_parameters = [name for name in parameters if name.split(":")[0] in integer_identifiers]
+
+    return SweepSpecification(base_path, mode, parameters, samples, seed, integer_parameters, ensemble_size)
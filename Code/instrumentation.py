@@ -0,0 +1,202 @@
+from compiled_derivative import CompiledDerivative
+from instrumented_derivative import InstrumentedDerivative
+from instrumented_jacobian import InstrumentedJacobian
+from contextlib import contextmanager
+from time import perf_counter_ns
+import numpy as np
+import json
+import os
+
+class Instrumentation():
+    '''Records where the time of a run is spent: the number and cost of the rate of change and Jacobian evaluations, the time of each physical term of the rate of change and the steps taken by the solver
+    A run is only instrumented when an instance is passed to calculate_future_states, which then wraps the rate of change and Jacobian; otherwise nothing is wrapped and the run costs exactly what it did before
+    The multirate solvers count their rejected steps, while those of the explicit Runge-Kutta methods RK23 and RK45 are inferred from the times at which they evaluate the rate of change, which only go back after a rejected step
+    The other solvers may evaluate the rate of change at earlier times within their steps, so their rejected steps are reported as unknown
+    The records can be saved as a JSON summary and as a trace in the Chrome trace event format, which can be opened in Perfetto or chrome://tracing'''
+
+    # The physical terms of the rate of change which are timed separately
+    terms = ("reactivity", "neutron_kinetics", "precursors", "fuel_conduction", "coolant_advection")
+
+    # The solvers whose stages are evaluated at times which increase through each step, so evaluating before the time already reached means the step was rejected
+    # DOP853 and the implicit methods evaluate some stages, Newton iterations or differences for the Jacobian at earlier times within a step
+    inferred_rejection_solvers = ("RK23", "RK45")
+
+    def __init__(self, max_trace_events=100000):
+        '''Constructs the instrumentation with nothing recorded
+        self -- The instance of Instrumentation being constructed (Instrumentation)
+        max_trace_events -- The largest number of events kept for the trace, after which calls are only counted in the summary (default 100000)(int)'''
+
+        self._max_trace_events = max_trace_events
+        self._origin = perf_counter_ns()
+        self._events = []
+
+        self._n_derivative = 0
+        self._derivative_time = 0
+        self._term_times = np.zeros(len(self.terms), dtype=np.int64)
+        self._n_jacobian = 0
+        self._jacobian_time = 0
+
+        # The furthest time the rate of change has been evaluated at, how many evaluations ago an integration started, and the rejected steps found from them
+        self._furthest_time = -np.inf
+        self._since_start = 0
+        self._rejected_steps = []
+
+        self._statistics = None
+        self._spans = {}
+
+    def instrument(self, problem_specification, derivative_function, jacobian):
+        '''Wraps the functions describing the equations of the system so that their calls are recorded
+        The fused CompiledDerivative is replaced by an InstrumentedDerivative which times each term, while other rates of change are only timed as a whole
+        self -- The instrumentation the calls are recorded in (Instrumentation)
+        problem_specification -- The specification of the current physical system (ProblemSpecification)
+        derivative_function -- Calculates the rate of change from the state array and time (function(np.array[float], float) -> np.array[float])
+        jacobian -- The analytic Jacobian of the system, or None if the solver estimates it (Jacobian)
+        [return] -- The wrapped rate of change and Jacobian (function(np.array[float], float) -> np.array[float], InstrumentedJacobian)'''
+
+        if isinstance(derivative_function, CompiledDerivative):
+            instrumented_function = InstrumentedDerivative(problem_specification, self, derivative_function.advection)
+        else:
+            def instrumented_function(state_array, time):
+                start = perf_counter_ns()
+                gradient = derivative_function(state_array, time)
+                self.record_derivative(time, start, ())
+                return(gradient)
+
+        if jacobian is not None:
+            jacobian = InstrumentedJacobian(jacobian, self)
+
+        return(instrumented_function, jacobian)
+
+    def record_derivative(self, time, start, term_ends):
+        '''Records a single evaluation of the rate of change
+        self -- The instrumentation the call is recorded in (Instrumentation)
+        time -- The simulation time the rate of change was evaluated at (s)(float)
+        start -- The counter value at the start of the evaluation (ns)(int)
+        term_ends -- The counter values at the end of each term, in the order of terms, or empty if the terms weren't timed (ns)((int))'''
+
+        end = term_ends[-1] if term_ends else perf_counter_ns()
+        self._n_derivative += 1
+        self._derivative_time += end - start
+
+        # Evaluating at an earlier time than has already been reached means the step reaching it was rejected
+        # An integration starts by evaluating at the time already reached, and its next evaluation may only probe the size of the first step, so going back after that isn't a rejection
+        if time < self._furthest_time and self._since_start != 2:
+            self._rejected_steps.append((self._furthest_time, time))
+        self._since_start = 1 if time == self._furthest_time or self._furthest_time == -np.inf else self._since_start + 1
+        self._furthest_time = time
+
+        if term_ends:
+            previous = start
+            for i_term, term_end in enumerate(term_ends):
+                self._term_times[i_term] += term_end - previous
+                previous = term_end
+
+        if len(self._events) < self._max_trace_events:
+            self._add_event("derivative", start, end, {"time": time})
+            if term_ends:
+                previous = start
+                for term, term_end in zip(self.terms, term_ends):
+                    self._add_event(term, previous, term_end)
+                    previous = term_end
+
+    def record_jacobian(self, time, start, end):
+        '''Records a single evaluation of the Jacobian
+        self -- The instrumentation the call is recorded in (Instrumentation)
+        time -- The simulation time the Jacobian was evaluated at (s)(float)
+        start -- The counter value at the start of the evaluation (ns)(int)
+        end -- The counter value at the end of the evaluation (ns)(int)'''
+
+        self._n_jacobian += 1
+        self._jacobian_time += end - start
+
+        if len(self._events) < self._max_trace_events:
+            self._add_event("jacobian", start, end, {"time": time})
+
+    def record_statistics(self, statistics):
+        '''Records the statistics reported by the solver, including the times and sizes of its steps
+        self -- The instrumentation the statistics are recorded in (Instrumentation)
+        statistics -- The statistics of the solver (dict)'''
+
+        self._statistics = statistics
+
+    @contextmanager
+    def span(self, name):
+        '''Records the time taken by a block of code, such as the call to the solver, as a single event
+        self -- The instrumentation the span is recorded in (Instrumentation)
+        name -- The name of the span (str)'''
+
+        start = perf_counter_ns()
+        try:
+            yield
+        finally:
+            end = perf_counter_ns()
+            self._spans[name] = self._spans.get(name, 0) + end - start
+            self._add_event(name, start, end)
+
+    def _add_event(self, name, start, end, arguments=None):
+        '''Adds a complete event to the trace
+        self -- The instrumentation the event is added to (Instrumentation)
+        name -- The name of the event (str)
+        start -- The counter value at the start of the event (ns)(int)
+        end -- The counter value at the end of the event (ns)(int)
+        arguments -- Values shown with the event (default None)(dict)'''
+
+        event = {"name": name, "ph": "X", "ts": (start - self._origin) / 1000, "dur": (end - start) / 1000, "pid": os.getpid(), "tid": 0}
+        if arguments is not None:
+            event["args"] = arguments
+        self._events.append(event)
+
+    @property
+    def summary(self):
+        ''' Returns a summary of everything recorded
+        self -- The instrumentation the summary is being returned from (Instrumentation)
+        [return] -- The summary, with times in seconds, which can be written as JSON ({str: value})'''
+
+        summary = {"derivative": {"calls": self._n_derivative,
+                                  "time": self._derivative_time / 1e9,
+                                  "time_per_call": self._derivative_time / 1e9 / max(self._n_derivative, 1),
+                                  "terms": {term: int(term_time) / 1e9 for term, term_time in zip(self.terms, self._term_times)}},
+                   "jacobian": {"calls": self._n_jacobian,
+                                "time": self._jacobian_time / 1e9},
+                   "spans": {name: span_time / 1e9 for name, span_time in self._spans.items()},
+                   "rejected_steps": self._rejected_summary()}
+
+        # The rest of the time in the solver is spent by the solver itself
+        if "solve" in self._spans:
+            summary["solver_overhead"] = (self._spans["solve"] - self._derivative_time - self._jacobian_time) / 1e9
+
+        if self._statistics is not None:
+            summary["solver"] = {name: value.tolist() if isinstance(value, np.ndarray) else value for name, value in self._statistics.items()}
+
+        return(summary)
+
+    def _rejected_summary(self):
+        '''Returns the number of rejected steps, taken from the solver if it counts them, inferred for the explicit Runge-Kutta methods and otherwise unknown
+        self -- The instrumentation the summary is being returned from (Instrumentation)
+        [return] -- The number of rejected steps, or None if it isn't known, where it was found, and for inferred steps the times reached and retried from ({str: value})'''
+
+        if self._statistics is not None and self._statistics.get("n_rejected") is not None:
+            return({"count": self._statistics["n_rejected"], "source": "solver"})
+
+        if self._statistics is not None and self._statistics["solver"] in self.inferred_rejection_solvers:
+            return({"count": len(self._rejected_steps), "source": "inferred",
+                    "reached_times": [reached for reached, retried in self._rejected_steps],
+                    "retried_times": [retried for reached, retried in self._rejected_steps]})
+
+        return({"count": None, "source": "unknown"})
+
+    def save_summary(self, file_path):
+        '''Saves the summary as JSON
+        self -- The instrumentation being saved (Instrumentation)
+        file_path -- The path of the JSON file (str)'''
+
+        with open(file_path, "w") as f:
+            json.dump(self.summary, f, indent=1)
+
+    def save_trace(self, file_path):
+        '''Saves the recorded events in the Chrome trace event format
+        self -- The instrumentation being saved (Instrumentation)
+        file_path -- The path of the JSON trace file (str)'''
+
+        with open(file_path, "w") as f:
+            json.dump({"traceEvents": self._events, "displayTimeUnit": "ms"}, f)
@@ -0,0 +1,30 @@
+from compiled_derivative import CompiledDerivative
+from time import perf_counter_ns
+
+class InstrumentedDerivative(CompiledDerivative):
+    '''A CompiledDerivative which times each physical term of the rate of change and reports every call to an instance of Instrumentation
+    The terms are calculated by CompiledDerivative itself, which records the end of each term in the list it is passed
+    It is only used when a run is instrumented, so the CompiledDerivative used otherwise reads no clocks'''
+    def __init__(self, problem_specification, instrumentation, advection=True):
+        '''Precomputes the coefficients of the equations and allocates the working arrays
+        self -- The instance of InstrumentedDerivative being constructed (InstrumentedDerivative)
+        problem_specification -- The specification of the current physical system (ProblemSpecification)
+        instrumentation -- The instrumentation the calls are reported to (Instrumentation)
+        advection -- Whether the advection of the coolant is included (default True)(bool)'''
+
+        super().__init__(problem_specification, advection)
+        self._instrumentation = instrumentation
+
+    def __call__(self, state_array, time):
+        '''Calculates the current rate of change of the state variables of the system, timing each term
+        self -- The instance of InstrumentedDerivative being called (InstrumentedDerivative)
+        state_array -- The current state of the system contained in a single array (np.array[float])
+        time -- The current time of the state (s)(float)
+        [return] -- The current rate of change of the different variables describing the state of the system, which is overwritten by the next call (np.array[float])'''
+
+        start = perf_counter_ns()
+        term_ends = []
+        gradient = super().__call__(state_array, time, term_ends)
+        self._instrumentation.record_derivative(time, start, tuple(term_ends))
+
+        return(gradient)
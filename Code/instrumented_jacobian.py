@@ -0,0 +1,51 @@
+from time import perf_counter_ns
+
+class InstrumentedJacobian():
+    '''Wraps a Jacobian, timing each evaluation and reporting it to an instance of Instrumentation
+    It has the same interface as Jacobian, so it can be passed to the solvers in its place'''
+    def __init__(self, jacobian, instrumentation):
+        '''Constructs the wrapper
+        self -- The instance of InstrumentedJacobian being constructed (InstrumentedJacobian)
+        jacobian -- The Jacobian being timed (Jacobian)
+        instrumentation -- The instrumentation the evaluations are reported to (Instrumentation)'''
+
+        self._jacobian = jacobian
+        self._instrumentation = instrumentation
+
+    @property
+    def sparsity(self):
+        ''' Returns the sparsity pattern of the wrapped Jacobian
+        self -- The Jacobian the value is being returned from (InstrumentedJacobian)
+        [return] -- The sparsity pattern (scipy.sparse.csc_matrix)'''
+        return(self._jacobian.sparsity)
+
+    def __getattr__(self, name):
+        '''Returns the other attributes of the wrapped Jacobian, such as the blocks of the equations used by the multirate solver, which aren't timed
+        self -- The Jacobian the value is being returned from (InstrumentedJacobian)
+        name -- The name of the attribute (str)
+        [return] -- The attribute of the wrapped Jacobian (value)'''
+        return(getattr(self._jacobian, name))
+
+    def __call__(self, state_array, time):
+        '''Calculates the Jacobian as a sparse matrix
+        self -- The Jacobian being evaluated (InstrumentedJacobian)
+        state_array -- The current state of the system contained in a single array (np.array[float])
+        time -- The current time of the state (s)(float)
+        [return] -- The Jacobian (scipy.sparse.csc_matrix)'''
+
+        start = perf_counter_ns()
+        matrix = self._jacobian(state_array, time)
+        self._instrumentation.record_jacobian(time, start, perf_counter_ns())
+        return(matrix)
+
+    def dense(self, state_array, time):
+        '''Calculates the Jacobian as a dense array
+        self -- The Jacobian being evaluated (InstrumentedJacobian)
+        state_array -- The current state of the system contained in a single array (np.array[float])
+        time -- The current time of the state (s)(float)
+        [return] -- The Jacobian (np.array[float])'''
+
+        start = perf_counter_ns()
+        matrix = self._jacobian.dense(state_array, time)
+        self._instrumentation.record_jacobian(time, start, perf_counter_ns())
+        return(matrix)
@@ -0,0 +1,232 @@
+import numpy as np
+from scipy.sparse import coo_matrix
+from coolant_transport import CoolantTransport
+
+class Jacobian():
+    '''The analytic Jacobian of the equations calculated by derivative, stored as a sparse matrix
+    Element [i, j] is the rate of change of the gradient of state variable i with respect to state variable j, using the ordering of StateVariables.as_array
+    The rows for the neutrons and delayed neutron precursors are dense as the reactivity depends on the mean temperatures, and the column for the neutrons is dense as the power heats every fuel discretisation
+    Otherwise the fuel temperatures are coupled by a tridiagonal conduction term, the coolant temperatures by a lower bidiagonal advection term and the fuel and coolant pointwise, with no coupling between the temperatures of different channels
+    Only the neutron and precursor rows depend on the state, so the rest of the matrix is calculated once at construction'''
+    def __init__(self, problem_specification, advection=True):
+        '''Builds the sparsity pattern and the constant part of the Jacobian
+        self -- The instance of Jacobian being constructed (Jacobian)
+        problem_specification -- The specification of the current physical system (ProblemSpecification)
+        advection -- Whether the advection of the coolant is included, which it isn't when the solver moves the coolant along its characteristics itself (default True)(bool)'''
+
+        n_z = problem_specification.n_z
+        n_delayed = problem_specification.n_delayed
+        n_temperatures = problem_specification.n_temperatures
+        n_state_variables = problem_specification.n_state_variables
+        shape = problem_specification.temperature_shape
+        heat_capacity_fuel = problem_specification.heat_capacity_per_discretisation_fuel
+        heat_capacity_coolant = problem_specification.heat_capacity_per_discretisation_coolant
+
+        self._n_z = n_z
+        self._n_delayed = n_delayed
+        self._n_temperatures = n_temperatures
+        self._n_state_variables = n_state_variables
+        self._coolant_transport = None if advection or not problem_specification.uniform_mesh else CoolantTransport(problem_specification)
+
+        # The coefficients of the neutron and delayed neutron precursor equations
+        self._neutron_coefficient = problem_specification.beta / problem_specification.generation_time
+        self._delayed_coefficients = problem_specification.betas / problem_specification.generation_time
+        self._lambdas = np.array(problem_specification.lambdas, dtype=float)
+        self._reactivity_driving = problem_specification.reactivity_driving
+        self._feedback_fuel = problem_specification.feedback_fuel
+        self._feedback_coolant = problem_specification.feedback_coolant
+        self._temperature_zero = problem_specification.temperature_zero
+        self._temperature_weights = problem_specification.temperature_weights.ravel()
+
+        # The coefficients of the fuel and coolant temperature equations, which for several channels are columns with one row per channel
+        heating_fuel = problem_specification.energy_fission * problem_specification.power_distribution / (problem_specification.generation_time * heat_capacity_fuel)
+        transfer_fuel = problem_specification.heat_transfer_per_discretisation / heat_capacity_fuel
+        transfer_coolant = problem_specification.heat_transfer_per_discretisation / heat_capacity_coolant
+        conduction_fuel = problem_specification.channel_thermal_conductivity_fuel / heat_capacity_fuel
+        advection_coolant = problem_specification.advection_rates if advection else 0
+        conduction_below, conduction_above = problem_specification.conduction_factors
+
+        # The coefficients of every discretisation, in the shape of the temperatures
+        transfer_fuel = np.broadcast_to(transfer_fuel, shape)
+        transfer_coolant = np.broadcast_to(transfer_coolant, shape)
+        conduction_below = np.broadcast_to(conduction_fuel, shape) * conduction_below
+        conduction_above = np.broadcast_to(conduction_fuel, shape) * conduction_above
+        advection_coolant = np.broadcast_to(advection_coolant, shape)
+
+        first_fuel = n_delayed + 1
+        first_coolant = n_delayed + n_temperatures + 1
+        fuel = np.arange(first_fuel, first_coolant).reshape(shape)
+        coolant = np.arange(first_coolant, n_state_variables).reshape(shape)
+        temperatures = np.arange(first_fuel, n_state_variables)
+        delayed = np.arange(1, n_delayed + 1)
+
+        # The entries are listed as blocks of (rows, columns, values), with the state dependent kinetics rows first
+        # The temperatures of each channel are only coupled to each other, so the blocks of the channels are listed together
+        blocks = []
+
+        # The neutron row depends on every state variable
+        blocks.append((np.zeros(n_state_variables, dtype=int), np.arange(n_state_variables), None))
+
+        # Each precursor row depends on the neutrons, its own precursors and every temperature
+        delayed_columns = np.column_stack([np.zeros(n_delayed, dtype=int), delayed, np.tile(temperatures, (n_delayed, 1))])
+        blocks.append((np.repeat(delayed, 2 + 2 * n_temperatures), delayed_columns.ravel(), None))
+        self._n_kinetics = n_state_variables + n_delayed * (2 + 2 * n_temperatures)
+
+        # The fuel is heated by the neutrons and exchanges heat with the coolant
+        blocks.append((fuel, np.zeros(shape, dtype=int), heating_fuel))
+        blocks.append((fuel, coolant, transfer_fuel))
+
+        # The diagonal and off-diagonal terms of the fuel, including the thermal diffusion term if there are at least 2 discretisations
+        diagonal_fuel = -transfer_fuel.copy()
+        if n_z > 1:
+            diagonal_fuel += conduction_below + conduction_above
+            blocks.append((fuel[..., 1:], fuel[..., :-1], -conduction_below[..., 1:]))
+            blocks.append((fuel[..., :-1], fuel[..., 1:], -conduction_above[..., :-1]))
+        blocks.append((fuel, fuel, diagonal_fuel))
+
+        # The coolant is heated by the fuel and, unless it is moved by the solver, advected upwards from the discretisation below
+        blocks.append((coolant, fuel, transfer_coolant))
+        blocks.append((coolant, coolant, -transfer_coolant - advection_coolant))
+        if advection:
+            blocks.append((coolant[..., 1:], coolant[..., :-1], advection_coolant[..., 1:]))
+
+        rows = np.concatenate([np.ravel(block[0]) for block in blocks])
+        columns = np.concatenate([np.ravel(block[1]) for block in blocks])
+
+        # Entries are stored in the order of the blocks, and the constant part is filled in now
+        self._values = np.zeros(len(rows))
+        self._values[self._n_kinetics:] = np.concatenate([np.ravel(block[2]) for block in blocks[2:]])
+
+        # Find where each listed entry ends up in the compressed sparse column matrix by converting the entry numbers with the matrix
+        self._matrix = coo_matrix((np.arange(1, len(rows) + 1, dtype=float), (rows, columns)), shape=(n_state_variables, n_state_variables)).tocsc()
+        self._order = self._matrix.data.astype(int) - 1
+
+    @property
+    def n_kinetics_variables(self):
+        '''Returns the number of kinetics variables, the neutrons and delayed neutron precursors, which come before the temperatures in the state array
+        self -- The Jacobian the value is being returned from (Jacobian)
+        [return] -- The number of kinetics variables (int)'''
+        return(self._n_delayed + 1)
+
+    @property
+    def thermal_matrix(self):
+        '''Returns the block of the Jacobian coupling the temperatures to each other, which doesn't depend on the state
+        The rate of change of the temperatures is thermal_matrix.dot(temperatures) + heating * n_neutron plus a constant from the coolant entering at the reference temperature
+        self -- The Jacobian the value is being returned from (Jacobian)
+        [return] -- The rates of change of the temperature gradients with respect to the temperatures (scipy.sparse.csc_matrix)'''
+
+        first_temperature = self._n_delayed + 1
+        matrix = self._matrix.copy()
+        matrix.data[:] = self._values[self._order]
+        return(matrix[first_temperature:, first_temperature:].tocsc())
+
+    @property
+    def heating(self):
+        '''Returns the column of the Jacobian giving the heating of the temperatures by the neutrons, which doesn't depend on the state
+        self -- The Jacobian the value is being returned from (Jacobian)
+        [return] -- The rates of change of the temperature gradients with respect to the number of neutrons (np.array[float])'''
+
+        first_temperature = self._n_delayed + 1
+        matrix = self._matrix.copy()
+        matrix.data[:] = self._values[self._order]
+        return(matrix[first_temperature:, 0].toarray().ravel())
+
+    @property
+    def feedback_weights(self):
+        '''Returns the rate of change of the reactivity with each temperature, so the feedback reactivity is feedback_weights.dot(temperatures) + feedback_offset
+        self -- The Jacobian the value is being returned from (Jacobian)
+        [return] -- The rate of change of the reactivity with each fuel and then each coolant temperature ($/K)(np.array[float])'''
+        return(np.concatenate([self._feedback_fuel * self._temperature_weights, self._feedback_coolant * self._temperature_weights]))
+
+    @property
+    def feedback_offset(self):
+        '''Returns the feedback reactivity with every temperature at zero, so the feedback reactivity is feedback_weights.dot(temperatures) + feedback_offset
+        self -- The Jacobian the value is being returned from (Jacobian)
+        [return] -- The offset of the feedback reactivity ($)(float)'''
+        return(-(self._feedback_fuel + self._feedback_coolant) * self._temperature_zero)
+
+    def driving_reactivity(self, time):
+        '''Returns the driving reactivity at a time
+        self -- The Jacobian the value is being returned from (Jacobian)
+        time -- The time (s)(float)
+        [return] -- The driving reactivity ($)(float)'''
+        return(self._reactivity_driving(time))
+
+    def kinetics_matrix(self, reactivity):
+        '''Returns the block of the Jacobian coupling the kinetics variables to each other at a given reactivity
+        For a fixed reactivity the rate of change of the kinetics variables is kinetics_matrix.dot(kinetics variables) plus the source in the neutron equation
+        self -- The Jacobian the value is being returned from (Jacobian)
+        reactivity -- The total reactivity ($)(float)
+        [return] -- The rates of change of the kinetics gradients with respect to the kinetics variables (np.array[float])'''
+
+        n_delayed = self._n_delayed
+        matrix = np.zeros((n_delayed + 1, n_delayed + 1))
+        matrix[0, 0] = self._neutron_coefficient * (reactivity - 1)
+        matrix[0, 1:] = self._lambdas
+        matrix[1:, 0] = self._delayed_coefficients * reactivity
+        matrix[range(1, n_delayed + 1), range(1, n_delayed + 1)] = -self._lambdas
+        return(matrix)
+
+    @property
+    def coolant_transport(self):
+        '''Returns what moves the coolant along its characteristics, which the solver uses in place of the advection term when the Jacobian is built without it
+        self -- The Jacobian the value is being returned from (Jacobian)
+        [return] -- The coolant transport, or None if the advection is part of the equations or the discretisations have different heights (CoolantTransport)'''
+        return(self._coolant_transport)
+
+    @property
+    def sparsity(self):
+        '''Returns the sparsity pattern of the Jacobian, suitable for use as jac_sparsity in scipy.integrate.solve_ivp
+        self -- The Jacobian the sparsity pattern is being returned from (Jacobian)
+        [return] -- A matrix which is 1 where the Jacobian may be non-zero (scipy.sparse.csc_matrix)'''
+
+        sparsity = self._matrix.copy()
+        sparsity.data[:] = 1
+        return(sparsity)
+
+    def __call__(self, state_array, time):
+        '''Calculates the Jacobian at the specified state and time
+        self -- The instance of Jacobian being called (Jacobian)
+        state_array -- The current state of the system contained in a single array (np.array[float])
+        time -- The current time of the state (s)(float)
+        [return] -- The Jacobian of the rate of change with respect to the state variables (scipy.sparse.csc_matrix)'''
+
+        n_temperatures = self._n_temperatures
+        n_delayed = self._n_delayed
+        n_neutron = state_array[0]
+        weights = self._temperature_weights
+
+        reactivity = self._reactivity_driving(time)
+        reactivity += self._feedback_fuel * (weights.dot(state_array[n_delayed + 1:n_delayed + n_temperatures + 1]) - self._temperature_zero)
+        reactivity += self._feedback_coolant * (weights.dot(state_array[n_delayed + n_temperatures + 1:]) - self._temperature_zero)
+
+        # The rates of change of the reactivity with the temperature of each discretisation
+        reactivity_fuel = self._feedback_fuel * weights
+        reactivity_coolant = self._feedback_coolant * weights
+
+        # The neutron row
+        neutron = self._values[:self._n_state_variables]
+        neutron[0] = self._neutron_coefficient * (reactivity - 1)
+        neutron[1:n_delayed + 1] = self._lambdas
+        neutron[n_delayed + 1:n_delayed + n_temperatures + 1] = self._neutron_coefficient * n_neutron * reactivity_fuel
+        neutron[n_delayed + n_temperatures + 1:] = self._neutron_coefficient * n_neutron * reactivity_coolant
+
+        # The precursor rows, one per row of the reshaped block
+        delayed = self._values[self._n_state_variables:self._n_kinetics].reshape(n_delayed, 2 + 2 * n_temperatures)
+        delayed[:, 0] = self._delayed_coefficients * reactivity
+        delayed[:, 1] = -self._lambdas
+        np.multiply.outer(self._delayed_coefficients * n_neutron, reactivity_fuel, out=delayed[:, 2:n_temperatures + 2])
+        np.multiply.outer(self._delayed_coefficients * n_neutron, reactivity_coolant, out=delayed[:, n_temperatures + 2:])
+
+        matrix = self._matrix.copy()
+        matrix.data[:] = self._values[self._order]
+        return(matrix)
+
+    def dense(self, state_array, time):
+        '''Calculates the Jacobian at the specified state and time as a dense array, suitable for use as Dfun in scipy.integrate.odeint
+        self -- The instance of Jacobian being used (Jacobian)
+        state_array -- The current state of the system contained in a single array (np.array[float])
+        time -- The current time of the state (s)(float)
+        [return] -- The Jacobian of the rate of change with respect to the state variables (np.array[float])'''
+
+        return(self(state_array, time).toarray())
@@ -0,0 +1,270 @@
+from reduced_jacobian import ReducedJacobian
+import scipy.sparse as sparse
+import numpy as np
+
+class KineticsModel():
+    '''Describes how the neutron kinetics are modelled, which sets the variables the solver integrates
+    "full" solves for the number of neutrons and every group of delayed neutron precursors, as StateVariables stores them
+    "prompt_jump" drops the number of neutrons, which follows the precursors instantly: its rate of change is taken to be zero so it is found from the precursors and the reactivity. This removes the generation time from the equations, and with it their stiffness, but is only valid below prompt critical ($1)
+    "one_group" lumps the precursors into a single group, with each group held at the fraction of the total it has in a steady state. The decay rate of the lumped group is the one which keeps the steady state unchanged
+    Full states are converted to the variables solved for by reduce, and back by expand, so everything other than the solver works with full states'''
+
+    # The models which are accepted
+    models = ("full", "prompt_jump", "one_group")
+
+    def __init__(self, problem_specification, name="full"):
+        '''Constructs the kinetics model
+        self -- The instance of KineticsModel being constructed (KineticsModel)
+        problem_specification -- The specification of the current physical system (ProblemSpecification)
+        name -- The name of the model, one of "full", "prompt_jump" or "one_group" (default "full")(str)'''
+
+        # If the model isn't recognised raise an exception
+        if name not in self.models:
+            raise ValueError("The kinetics model '{}' is not one of {}.".format(name, ", ".join(self.models)))
+
+        self._name = name
+        self._n_temperatures = problem_specification.n_temperatures
+        self._n_delayed = problem_specification.n_delayed
+        self._n_state_variables = problem_specification.n_state_variables
+
+        # The coefficients of the prompt jump approximation and of the reactivity it depends on
+        self._lambdas = np.asarray(problem_specification.lambdas, dtype=float)
+        self._source = problem_specification.source
+        self._neutron_coefficient = problem_specification.beta / problem_specification.generation_time
+        self._reactivity_driving = problem_specification.reactivity_driving
+        self._feedback_fuel = problem_specification.feedback_fuel
+        self._feedback_coolant = problem_specification.feedback_coolant
+        self._temperature_zero = problem_specification.temperature_zero
+        self._temperature_weights = problem_specification.temperature_weights.ravel()
+
+        # The fraction of the lumped precursors in each group, which is that of a steady state
+        steady_fractions = np.asarray(problem_specification.betas, dtype=float) / self._lambdas
+        self._weights = steady_fractions / steady_fractions.sum()
+
+        if name == "full":
+            self._n_solved_variables = self._n_state_variables
+        elif name == "prompt_jump":
+            self._n_solved_variables = self._n_state_variables - 1
+        else:
+            self._n_solved_variables = 2 * self._n_temperatures + 2
+
+        self._reduction_matrix = self._make_reduction_matrix()
+
+    @property
+    def name(self):
+        ''' Returns the name of the model
+        self -- The model the value is being returned from (KineticsModel)
+        [return] -- The name of the model (str)'''
+        return(self._name)
+
+    @property
+    def n_solved_variables(self):
+        ''' Returns the number of variables solved for
+        self -- The model the value is being returned from (KineticsModel)
+        [return] -- The number of variables solved for (int)'''
+        return(self._n_solved_variables)
+
+    @property
+    def weights(self):
+        ''' Returns the fraction of the lumped precursors in each group for the one group model
+        self -- The model the value is being returned from (KineticsModel)
+        [return] -- The fraction of the precursors in each group (np.array[float])'''
+        return(self._weights)
+
+    def __repr__(self):
+        '''Returns a string describing the model, used to identify the problem specification it belongs to
+        self -- The model being described (KineticsModel)
+        [return] -- The name of the model (str)'''
+        return("KineticsModel({!r})".format(self._name))
+
+    def reactivity(self, t_fuel, t_coolant, time):
+        '''Calculates the total reactivity, including the feedback from the mean temperatures
+        Each argument may instead have a leading dimension of one row per time
+        self -- The model being used (KineticsModel)
+        t_fuel -- The fuel temperatures, stored channel by channel as in the state array (K)(np.array[float])
+        t_coolant -- The coolant temperatures, stored channel by channel as in the state array (K)(np.array[float])
+        time -- The time or times of the states (s)(float or np.array[float])
+        [return] -- The reactivity ($)(float or np.array[float])'''
+
+        reactivity = np.asarray(self._reactivity_driving(time), dtype=float)
+        reactivity = reactivity + self._feedback_fuel * (np.dot(t_fuel, self._temperature_weights) - self._temperature_zero)
+        return(reactivity + self._feedback_coolant * (np.dot(t_coolant, self._temperature_weights) - self._temperature_zero))
+
+    def prompt_neutrons(self, n_delayed, t_fuel, t_coolant, time):
+        '''Calculates the number of neutrons of the prompt jump approximation, at which the rate of change of the number of neutrons is zero
+        Each argument may instead have a leading dimension of one row per time
+        self -- The model being used (KineticsModel)
+        n_delayed -- The number of delayed neutron precursors in each group (np.array[float])
+        t_fuel -- The fuel temperatures (K)(np.array[float])
+        t_coolant -- The coolant temperatures (K)(np.array[float])
+        time -- The time or times of the states (s)(float or np.array[float])
+        [return] -- The number of neutrons (float or np.array[float])'''
+
+        return((np.dot(n_delayed, self._lambdas) + self._source) / (self._neutron_coefficient * (1 - self.reactivity(t_fuel, t_coolant, time))))
+
+    def expand(self, solved_array, time):
+        '''Converts the variables solved for into a full state array in the order of StateVariables.as_array
+        For the full model the array is returned as it is
+        self -- The model being used (KineticsModel)
+        solved_array -- The variables solved for, or an array of them with one row per time (np.array[float])
+        time -- The time of the state, or the times of each row (s)(float or np.array[float])
+        [return] -- The full state array, or one row per time (np.array[float])'''
+
+        if self._name == "full":
+            return(solved_array)
+
+        solved_array = np.asarray(solved_array)
+        n_delayed = self._n_delayed
+        full_array = np.empty(solved_array.shape[:-1] + (self._n_state_variables,))
+
+        if self._name == "prompt_jump":
+            full_array[..., 1:] = solved_array
+            n_temperatures = self._n_temperatures
+            full_array[..., 0] = self.prompt_neutrons(solved_array[..., :n_delayed], solved_array[..., n_delayed:n_delayed + n_temperatures], solved_array[..., n_delayed + n_temperatures:], time)
+        else:
+            full_array[..., 0] = solved_array[..., 0]
+            full_array[..., 1:n_delayed + 1] = solved_array[..., 1:2] * self._weights
+            full_array[..., n_delayed + 1:] = solved_array[..., 2:]
+
+        return(full_array)
+
+    def reduce(self, full_array):
+        '''Converts a full state array, or the rate of change of one, into the variables solved for
+        For the full model the array is returned as it is
+        self -- The model being used (KineticsModel)
+        full_array -- The full state array, or an array of them with one row per time (np.array[float])
+        [return] -- The variables solved for, or one row per time (np.array[float])'''
+
+        if self._name == "full":
+            return(full_array)
+        elif self._name == "prompt_jump":
+            return(full_array[..., 1:])
+
+        n_delayed = self._n_delayed
+        return(np.concatenate([full_array[..., :1], full_array[..., 1:n_delayed + 1].sum(axis=-1, keepdims=True), full_array[..., n_delayed + 1:]], axis=-1))
+
+    def _make_reduction_matrix(self):
+        '''Creates the matrix which converts a full state array into the variables solved for
+        self -- The model being used (KineticsModel)
+        [return] -- The reduction matrix (scipy.sparse.csr_matrix)'''
+
+        n_delayed = self._n_delayed
+
+        if self._name == "full":
+            return(sparse.identity(self._n_state_variables, format="csr"))
+        elif self._name == "prompt_jump":
+            return(sparse.identity(self._n_state_variables, format="csr")[1:])
+
+        rows = np.concatenate([[0], np.ones(n_delayed, dtype=int), np.arange(2, self._n_solved_variables)])
+        return(sparse.csr_matrix((np.ones(len(rows)), (rows, np.arange(self._n_state_variables))), shape=(self._n_solved_variables, self._n_state_variables)))
+
+    @property
+    def reduction_matrix(self):
+        ''' Returns the matrix which converts a full state array, or the rate of change of one, into the variables solved for
+        self -- The model the value is being returned from (KineticsModel)
+        [return] -- The reduction matrix (scipy.sparse.csr_matrix)'''
+        return(self._reduction_matrix)
+
+    @property
+    def expansion_pattern(self):
+        '''Returns the entries of the rate of change of the full state array with the variables solved for which may be non-zero
+        In the prompt jump approximation the number of neutrons depends on every variable solved for, and every other full state variable is one of them
+        self -- The model the value is being returned from (KineticsModel)
+        [return] -- The pattern, with a 1 for each entry which may be non-zero (scipy.sparse.csc_matrix)'''
+
+        if self._name != "prompt_jump":
+            pattern = self.expansion_matrix(None, 0)
+        else:
+            n_solved = self._n_solved_variables
+            rows = np.concatenate([np.zeros(n_solved, dtype=int), np.arange(1, self._n_state_variables)])
+            columns = np.concatenate([np.arange(n_solved), np.arange(n_solved)])
+            pattern = sparse.csc_matrix((np.ones(2 * n_solved), (rows, columns)), shape=(self._n_state_variables, n_solved))
+
+        pattern.data[:] = 1
+        return(pattern)
+
+    def expansion_matrix(self, solved_array, time):
+        '''Calculates the rate of change of the full state array with the variables solved for
+        self -- The model being used (KineticsModel)
+        solved_array -- The variables solved for (np.array[float])
+        time -- The time of the state (s)(float)
+        [return] -- The rate of change of each full state variable with each variable solved for (scipy.sparse.csc_matrix)'''
+
+        n_delayed = self._n_delayed
+        n_temperatures = self._n_temperatures
+
+        if self._name == "full":
+            return(sparse.identity(self._n_state_variables, format="csc"))
+        elif self._name == "one_group":
+            rows = np.arange(self._n_state_variables)
+            columns = np.concatenate([[0], np.ones(n_delayed, dtype=int), np.arange(2, self._n_solved_variables)])
+            values = np.concatenate([[1], self._weights, np.ones(2 * n_temperatures)])
+            return(sparse.csc_matrix((values, (rows, columns)), shape=(self._n_state_variables, self._n_solved_variables)))
+
+        # Every solved variable is copied except the number of neutrons, which depends on the precursors and, through the reactivity, the mean temperatures
+        n_delayed_array = solved_array[:n_delayed]
+        t_fuel = solved_array[n_delayed:n_delayed + n_temperatures]
+        t_coolant = solved_array[n_delayed + n_temperatures:]
+        loss = self._neutron_coefficient * (1 - self.reactivity(t_fuel, t_coolant, time))
+        n_neutron = (np.dot(n_delayed_array, self._lambdas) + self._source) / loss
+
+        rows = np.concatenate([np.zeros(self._n_solved_variables, dtype=int), np.arange(1, self._n_state_variables)])
+        columns = np.concatenate([np.arange(self._n_solved_variables), np.arange(self._n_solved_variables)])
+        values = np.concatenate([self._lambdas / loss,
+                                 n_neutron * self._neutron_coefficient * self._feedback_fuel * self._temperature_weights / loss,
+                                 n_neutron * self._neutron_coefficient * self._feedback_coolant * self._temperature_weights / loss,
+                                 np.ones(self._n_solved_variables)])
+        return(sparse.csc_matrix((values, (rows, columns)), shape=(self._n_state_variables, self._n_solved_variables)))
+
+    def reduce_derivative(self, derivative_function):
+        '''Converts a function calculating the rate of change of the full state into one calculating the rate of change of the variables solved for
+        For the full model the function is returned as it is
+        self -- The model being used (KineticsModel)
+        derivative_function -- Calculates the rate of change from the full state array and time (function(np.array[float], float) -> np.array[float])
+        [return] -- The rate of change of the variables solved for (function(np.array[float], float) -> np.array[float])'''
+
+        if self._name == "full":
+            return(derivative_function)
+
+        def reduced_derivative(solved_array, time):
+            return(self.reduce(derivative_function(self.expand(solved_array, time), time)))
+
+        return(reduced_derivative)
+
+    def reduce_jacobian(self, jacobian):
+        '''Converts the Jacobian of the full state into the Jacobian of the variables solved for
+        For the full model the Jacobian is returned as it is
+        self -- The model being used (KineticsModel)
+        jacobian -- The analytic Jacobian of the full system (Jacobian)
+        [return] -- The Jacobian of the variables solved for (Jacobian or ReducedJacobian)'''
+
+        if self._name == "full":
+            return(jacobian)
+
+        return(ReducedJacobian(jacobian, self))
+
+def kinetics_error(trajectory, reference):
+    '''Compares a run with a reduced kinetics model to the same problem with full kinetics
+    trajectory -- The states at the output times with the reduced model (Trajectory)
+    reference -- The states at the same output times with full kinetics (Trajectory)
+    [return] -- For the power, mean temperatures and temperatures, the largest absolute error, the largest error relative to the largest reference value and the time of the largest error ({str: {str: float}})'''
+
+    quantities = {"power": (trajectory.power, reference.power),
+                  "t_fuel_mean": (trajectory.t_fuel_mean, reference.t_fuel_mean),
+                  "t_coolant_mean": (trajectory.t_coolant_mean, reference.t_coolant_mean),
+                  "t_fuel": (trajectory.t_fuel, reference.t_fuel),
+                  "t_coolant": (trajectory.t_coolant, reference.t_coolant)}
+
+    times = np.asarray(reference.times)
+    errors = {}
+    for name, (values, reference_values) in quantities.items():
+        difference = np.abs(np.asarray(values) - np.asarray(reference_values))
+        if difference.ndim > 1:
+            difference = difference.max(axis=1)
+        i_max = int(np.argmax(difference))
+        scale = np.abs(reference_values).max()
+        errors[name] = {"max_absolute": float(difference[i_max]),
+                        "max_relative": float(difference[i_max] / scale) if scale > 0 else 0.0,
+                        "time_of_max": float(times[i_max])}
+
+    return(errors)
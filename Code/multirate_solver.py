@@ -0,0 +1,347 @@
+from scipy.linalg import expm
+from scipy.sparse.linalg import splu
+import scipy.sparse as sparse
+import numpy as np
+
+class MultirateSolver():
+    '''A solver which integrates the fast neutron kinetics and the slow temperatures separately, each at its own rate, coupling them through the reactivity feedback
+    For a given reactivity the kinetics are linear, so they are advanced by matrix exponentials over substeps, which are exact while the reactivity is constant and fourth order as it changes
+    The temperatures are linear with a matrix which doesn't depend on the state, so they are advanced over long steps by a two stage, L-stable implicit Runge-Kutta method whose single matrix is factorised once for each step size
+    Over each step the kinetics are first advanced with the feedback extrapolated from the temperatures at the start, then the temperatures with the heating from those kinetics, and then both again with the feedback interpolated from the new temperatures
+    The error of each step, including that of the coupling, is estimated by comparing it with two steps of half the size, and the kinetics substeps are controlled in the same way
+    The solver needs the analytic Jacobian of a single system, from which it takes the blocks of the equations, and steps exactly onto the output times and breakpoints'''
+
+    # The coefficient of the two stage, second order, L-stable diagonally implicit Runge-Kutta method
+    gamma = 1 - 1 / np.sqrt(2)
+
+    # The offset of the Gauss points from the midpoint of a kinetics substep, as a fraction of the substep
+    gauss_offset = np.sqrt(3) / 6
+
+    # The limits on the change in step size after each step, and the safety factor on the size predicted from the error
+    min_factor = 0.2
+    max_factor = 5
+    safety = 0.9
+
+    # Whether the solver moves the coolant itself, which this solver leaves to the advection term of the equations
+    transports_coolant = False
+
+    def __init__(self, rtol=None, atol=None, max_step=None, first_step=None):
+        '''Constructs the solver
+        self -- The instance of MultirateSolver being constructed (MultirateSolver)
+        rtol -- The relative tolerance, or None for 1e-6 (default None)(float)
+        atol -- The absolute tolerance, or None for 1e-6 (default None)(float)
+        max_step -- The largest step the temperatures may take (s), or None for no limit (default None)(float)
+        first_step -- The size of the first step of the temperatures (s), or None for the solver to choose (default None)(float)'''
+
+        self._rtol = 1e-6 if rtol is None else rtol
+        self._atol = 1e-6 if atol is None else atol
+        self._max_step = np.inf if max_step is None else max_step
+        self._first_step = first_step
+
+    @property
+    def name(self):
+        ''' Returns the name of the solver
+        self -- The solver the value is being returned from (MultirateSolver)
+        [return] -- The name of the solver (str)'''
+        return("multirate")
+
+    def __repr__(self):
+        '''Returns a string describing the solver and its options, used to identify the problem specification it belongs to
+        self -- The solver being described (MultirateSolver)
+        [return] -- The name and options of the solver (str)'''
+        return("MultirateSolver({!r}, {!r}, {!r}, {!r})".format(self._rtol, self._atol, self._max_step, self._first_step))
+
+    def _error_norm(self, difference, state_array):
+        '''Returns the largest difference between two estimates of the state relative to the tolerance
+        self -- The solver being used (MultirateSolver)
+        difference -- The difference between the estimates (np.array[float])
+        state_array -- One of the estimates (np.array[float])
+        [return] -- The largest ratio of the difference to the tolerance, which is at most 1 for an acceptable step (float)'''
+        return(np.max(np.abs(difference) / (self._atol + self._rtol * np.abs(state_array))))
+
+    def _factor(self, error, order):
+        '''Returns the factor the step size is changed by after a step, given its error
+        self -- The solver being used (MultirateSolver)
+        error -- The error of the step relative to the tolerance (float)
+        order -- The order of the method, so that the error of a step grows with the step size to one more than this (int)
+        [return] -- The factor (float)'''
+
+        if error == 0:
+            return(self.max_factor)
+        return(min(self.max_factor, max(self.min_factor, self.safety * error ** (-1 / (order + 1)))))
+
+    def _quantise(self, step):
+        '''Rounds a step size down to a power of 2^(1/4), so that the step sizes repeat and the factorisation for each can be reused
+        self -- The solver being used (MultirateSolver)
+        step -- The step size (s)(float)
+        [return] -- The rounded step size (s)(float)'''
+        return(2 ** (np.floor(4 * np.log2(step)) / 4))
+
+    def _advance_kinetics(self, system, kinetics, time, step, feedback, substep):
+        '''Advances the kinetics variables over a step of the temperatures, in substeps controlled by comparing each with two substeps of half its size
+        The kinetics variables, along with the integral of the number of neutrons, are advanced over each substep by the exponential of the fourth order Magnus expansion of an augmented matrix, which is exact while the reactivity is constant
+        self -- The solver being used (MultirateSolver)
+        system -- The blocks of the equations ({str: value})
+        kinetics -- The kinetics variables at the start of the step (np.array[float])
+        time -- The time at the start of the step (s)(float)
+        step -- The size of the step (s)(float)
+        feedback -- The feedback reactivity as a function of the time since the start of the step ($)(function(float) -> float)
+        substep -- The size of the first substep (s)(float)
+        [return] -- The kinetics variables at the end of the step, the times since the start of the step at the ends of the substeps, the integral of the number of neutrons up to each, the size of the next substep and the number of substeps (np.array[float], np.array[float], np.array[float], float, int)'''
+
+        n_kinetics = len(kinetics)
+        jacobian = system["jacobian"]
+
+        # The augmented state is the kinetics variables, a constant 1 multiplying the source and the integral of the number of neutrons
+        augmented = np.concatenate([kinetics, [1, 0]])
+        matrix = np.zeros((n_kinetics + 2, n_kinetics + 2))
+        matrix[:n_kinetics, n_kinetics] = system["source"]
+        matrix[n_kinetics + 1, 0] = 1
+
+        # The fourth order Magnus expansion samples the matrix at the two Gauss points of the substep and corrects for their commutator
+        def augmented_matrix(since):
+            reactivity = jacobian.driving_reactivity(time + since) + feedback(since)
+            matrix[:n_kinetics, :n_kinetics] = jacobian.kinetics_matrix(reactivity)
+            return(matrix.copy())
+
+        def propagate(augmented, start, size):
+            first = augmented_matrix(start + (0.5 - self.gauss_offset) * size)
+            second = augmented_matrix(start + (0.5 + self.gauss_offset) * size)
+            exponent = (first + second) * (size / 2) + (second.dot(first) - first.dot(second)) * (np.sqrt(3) / 12 * size ** 2)
+            return(expm(exponent).dot(augmented))
+
+        offsets = [0]
+        integrals = [0]
+        offset = 0
+        n_substeps = 0
+        while offset < step:
+            size = min(substep, step - offset)
+
+            # The substep is checked against two substeps of half its size
+            whole = propagate(augmented, offset, size)
+            half = propagate(propagate(augmented, offset, size / 2), offset + size / 2, size / 2)
+            error = self._error_norm((half - whole) / 15, half)
+
+            if error > 1:
+                substep = size * self._factor(error, 4)
+                if substep < 1e-14 * max(1, abs(time)):
+                    raise RuntimeError("The solver 'multirate' failed at {}s: the kinetics substep became too small.".format(time + offset))
+                continue
+
+            augmented = half
+            offset = step if size == step - offset else offset + size
+            offsets.append(offset)
+            integrals.append(augmented[-1])
+            n_substeps += 1
+
+            # A substep cut short by the end of the step doesn't limit the next one
+            substep = max(substep, size * self._factor(error, 4)) if size < substep else size * self._factor(error, 4)
+
+        return(augmented[:n_kinetics], np.array(offsets), np.array(integrals), substep, n_substeps)
+
+    def _advance_temperatures(self, system, temperatures, step, integral_stage, integral_step, statistics):
+        '''Advances the temperatures over a step by the two stage diagonally implicit Runge-Kutta method, with the heating taken from the integral of the number of neutrons so that the energy deposited matches the kinetics exactly
+        self -- The solver being used (MultirateSolver)
+        system -- The blocks of the equations ({str: value})
+        temperatures -- The temperatures at the start of the step (K)(np.array[float])
+        step -- The size of the step (s)(float)
+        integral_stage -- The integral of the number of neutrons up to the first stage (s)(float)
+        integral_step -- The integral of the number of neutrons over the whole step (s)(float)
+        statistics -- The solver statistics, in which factorisations are counted (dict)
+        [return] -- The temperatures at the end of the step (K)(np.array[float])'''
+
+        gamma = self.gamma
+        factorisations = system["factorisations"]
+
+        # Both stages solve with the same matrix, which is only factorised again when the step size changes, ignoring differences in the step size from rounding
+        key = float("{:.12g}".format(step))
+        if key not in factorisations:
+            if len(factorisations) > 16:
+                factorisations.clear()
+            factorisations[key] = splu((system["identity"] - gamma * step * system["thermal_matrix"]).tocsc())
+            statistics["nlu"] += 1
+        factorisation = factorisations[key]
+
+        thermal_matrix = system["thermal_matrix"]
+        heating = system["heating"]
+        inlet = system["inlet"]
+
+        stage = factorisation.solve(temperatures + gamma * step * inlet + heating * integral_stage)
+        right_hand_side = temperatures + (1 - gamma) * step * (thermal_matrix.dot(stage) + inlet) + gamma * step * inlet + heating * integral_step
+        return(factorisation.solve(right_hand_side))
+
+    def _step(self, system, state_array, time, step, substep, statistics):
+        '''Takes a single coupled step of the kinetics and temperatures, advancing each with the feedback predicted and then corrected from the temperatures
+        self -- The solver being used (MultirateSolver)
+        system -- The blocks of the equations ({str: value})
+        state_array -- The state at the start of the step (np.array[float])
+        time -- The time at the start of the step (s)(float)
+        step -- The size of the step (s)(float)
+        substep -- The size of the first kinetics substep (s)(float)
+        statistics -- The solver statistics, in which substeps and factorisations are counted (dict)
+        [return] -- The state at the end of the step and the size of the next kinetics substep (np.array[float], float)'''
+
+        n_kinetics = system["n_kinetics"]
+        weights = system["feedback_weights"]
+        offset = system["feedback_offset"]
+        kinetics = state_array[:n_kinetics]
+        temperatures = state_array[n_kinetics:]
+
+        # The predictor extrapolates the feedback from the temperatures and their rate of change at the start of the step
+        feedback_start = weights.dot(temperatures) + offset
+        feedback_rate = weights.dot(system["thermal_matrix"].dot(temperatures) + system["heating"] * kinetics[0] + system["inlet"])
+        feedback = lambda since: feedback_start + feedback_rate * since
+
+        for i_pass in range(2):
+            end_kinetics, offsets, integrals, next_substep, n_substeps = self._advance_kinetics(system, kinetics, time, step, feedback, substep)
+            statistics["n_substeps"] += n_substeps
+            end_temperatures = self._advance_temperatures(system, temperatures, step, np.interp(self.gamma * step, offsets, integrals), integrals[-1], statistics)
+
+            # The corrector interpolates the feedback between the temperatures at the start and end of the step
+            feedback_end = weights.dot(end_temperatures) + offset
+            feedback = lambda since: feedback_start + (feedback_end - feedback_start) * since / step
+
+        return(np.concatenate([end_kinetics, end_temperatures]), next_substep)
+
+    def _integrate(self, derivative_function, jacobian, start_array, times, breakpoints, first_step, statistics):
+        '''Integrates the system from the start state, yielding the state at each of the requested times after the first as it is reached
+        self -- The solver being used (MultirateSolver)
+        derivative_function -- Calculates the rate of change from the state array and time (function(np.array[float], float) -> np.array[float])
+        jacobian -- The analytic Jacobian of the system (Jacobian)
+        start_array -- The state of the system at the first of the times (np.array[float])
+        times -- The times at which the state is to be returned (s)(np.array[float])
+        breakpoints -- Times at which the equations change suddenly, which the steps end on, or None if there are none (s)(np.array[float])
+        first_step -- The size of the first step, or None to use that of the solver (s)(float)
+        statistics -- The solver statistics, which are updated as the integration goes on (dict)
+        [return] -- The index of each time, the state at it and the size of the last step (iterator[(int, np.array[float], float)])'''
+
+        if jacobian is None or not hasattr(jacobian, "kinetics_matrix"):
+            raise ValueError("The solver 'multirate' needs the analytic Jacobian of a single system with full kinetics.")
+
+        n_kinetics = jacobian.n_kinetics_variables
+        thermal_matrix = jacobian.thermal_matrix
+
+        # With no neutrons, precursors or heat the rate of change is just the source and the coolant entering at the reference temperature
+        constant = derivative_function(np.zeros(len(start_array)), times[0]).copy()
+        statistics["nfev"] += 1
+
+        system = {"jacobian": jacobian,
+                  "n_kinetics": n_kinetics,
+                  "source": constant[:n_kinetics],
+                  "inlet": constant[n_kinetics:],
+                  "thermal_matrix": thermal_matrix,
+                  "heating": jacobian.heating,
+                  "identity": sparse.identity(thermal_matrix.shape[0], format="csc"),
+                  "feedback_weights": jacobian.feedback_weights,
+                  "feedback_offset": jacobian.feedback_offset,
+                  "factorisations": {}}
+
+        # The steps end on every output time and breakpoint
+        targets = times[1:]
+        if breakpoints is not None:
+            breakpoints = np.unique(breakpoints)
+            targets = np.union1d(targets, breakpoints[(breakpoints > times[0]) & (breakpoints < times[-1])])
+
+        if first_step is None:
+            first_step = self._first_step
+        if first_step is None:
+            first_step = min(targets[0] - times[0], 1e-3 * (times[-1] - times[0]))
+        step = min(self._quantise(first_step), self._max_step)
+        substep = step
+
+        state_array = np.array(start_array, dtype=float)
+        time = times[0]
+        i_time = 1
+        last_step = None
+
+        for target in targets:
+            while time < target:
+                size = min(step, target - time)
+
+                # The step is checked against two steps of half its size, which also checks the coupling of the kinetics and temperatures
+                whole, _ = self._step(system, state_array, time, size, substep, statistics)
+                half, half_substep = self._step(system, state_array, time, size / 2, substep, statistics)
+                half, half_substep = self._step(system, half, time + size / 2, size / 2, half_substep, statistics)
+                error = self._error_norm((half - whole) / 3, half)
+
+                if error > 1:
+                    statistics["n_rejected"] += 1
+                    step = self._quantise(size * self._factor(error, 2))
+                    if step < 1e-14 * max(1, abs(time)):
+                        raise RuntimeError("The solver 'multirate' failed at {}s: the step size became too small.".format(time))
+                    continue
+
+                state_array = half
+                substep = half_substep
+                time = target if size == target - time else time + size
+                last_step = size
+                statistics["n_steps"] += 1
+                statistics["step_times"].append(time)
+                statistics["step_sizes"].append(size)
+
+                # A step cut short by an output time or breakpoint doesn't limit the next one
+                new_step = self._quantise(size * self._factor(error, 2))
+                step = min(max(step, new_step) if size < step else new_step, self._max_step)
+
+            if i_time < len(times) and times[i_time] == target:
+                yield i_time, state_array, last_step
+                i_time += 1
+
+    def _new_statistics(self):
+        '''Returns the statistics of an integration before it starts
+        self -- The solver being used (MultirateSolver)
+        [return] -- The statistics, with the steps and substeps counted and the time and size of every step (dict)'''
+        return({"solver": self.name, "nfev": 0, "njev": 0, "nlu": 0, "n_steps": 0, "n_rejected": 0, "n_substeps": 0, "step_times": [], "step_sizes": []})
+
+    def __call__(self, derivative_function, jacobian, start_array, times, breakpoints=None):
+        '''Integrates the system from the start state, returning the state at each of the requested times
+        self -- The solver being used (MultirateSolver)
+        derivative_function -- Calculates the rate of change from the state array and time (function(np.array[float], float) -> np.array[float])
+        jacobian -- The analytic Jacobian of the system (Jacobian)
+        start_array -- The state of the system at the first of the times (np.array[float])
+        times -- The times at which the state is to be returned (s)(np.array[float])
+        breakpoints -- Times at which the equations change suddenly, which the steps end on (default None)(s)(np.array[float])
+        [return] -- The states at the requested times, one per row, and the solver statistics (np.array[float], dict)'''
+
+        statistics = self._new_statistics()
+        calculated_arrays = np.zeros((len(times), len(start_array)))
+        calculated_arrays[0] = start_array
+
+        for i_time, state_array, step_size in self._integrate(derivative_function, jacobian, start_array, times, breakpoints, None, statistics):
+            calculated_arrays[i_time] = state_array
+
+        statistics["step_times"] = np.array(statistics["step_times"])
+        statistics["step_sizes"] = np.array(statistics["step_sizes"])
+
+        return(calculated_arrays, statistics)
+
+    def stream(self, derivative_function, jacobian, start_array, times, chunk_size, first_step=None, breakpoints=None):
+        '''Integrates the system from the start state, yielding the states at the requested times in chunks as they are calculated
+        self -- The solver being used (MultirateSolver)
+        derivative_function -- Calculates the rate of change from the state array and time (function(np.array[float], float) -> np.array[float])
+        jacobian -- The analytic Jacobian of the system (Jacobian)
+        start_array -- The state of the system at the first of the times (np.array[float])
+        times -- The times at which the state is to be returned (s)(np.array[float])
+        chunk_size -- The number of times in each chunk (int)
+        first_step -- The size of the first step, replacing that of the solver, or None to keep it (default None)(float)
+        breakpoints -- Times at which the equations change suddenly, which the steps end on (default None)(s)(np.array[float])
+        [return] -- The times of each chunk, the states at those times, one per row, and the last step size, which is None before the first step (iterator[(np.array[float], np.array[float], float)])'''
+
+        statistics = self._new_statistics()
+        n_times = len(times)
+
+        i_chunk = 0
+        chunk = np.zeros((min(chunk_size, n_times), len(start_array)))
+        chunk[0] = start_array
+        if len(chunk) == 1:
+            yield times[:1], chunk, None
+            i_chunk = 1
+            chunk = np.zeros((min(chunk_size, n_times - 1), len(start_array)))
+
+        for i_time, state_array, step_size in self._integrate(derivative_function, jacobian, start_array, times, breakpoints, first_step, statistics):
+            chunk[i_time - i_chunk] = state_array
+            if i_time + 1 - i_chunk == len(chunk):
+                yield times[i_chunk:i_time + 1], chunk, step_size
+                i_chunk = i_time + 1
+                if i_chunk < n_times:
+                    chunk = np.zeros((min(chunk_size, n_times - i_chunk), len(start_array)))
@@ -1,48 +1,168 @@
 from input_reader import read_input
+from specification_cache import SpecificationCache
+from result_cache import ResultCache
 from state import State
 import numpy as np
 from future_states import calculate_future_states
-import matplotlib.pyplot as plt
+from sensitivity_future_states import calculate_sensitivities
+from steady_state import calculate_steady_state
+from report import make_report
+from instrumentation import Instrumentation
+from kinetics_model import kinetics_error
+import argparse
+import json
 import os
-import sys
-
-# Get the input file path from the first command line argument
-input_file_path = sys.argv[1]
-
-# Read the input file to form a problem specification
-problem_specification = read_input(input_file_path)
-
-# Set up the initial state
-initial_state = State(problem_specification, 0)
-initial_state.t_fuel = np.full(problem_specification.n_z, problem_specification.temperature_zero)
-initial_state.t_coolant = np.full(problem_specification.n_z, problem_specification.temperature_zero)
-
-# Find the other states of the system
-output_states = calculate_future_states(initial_state, problem_specification)
-
-# Make the output directory if it doesn't exist
-output_directory = os.path.join("outputs", problem_specification.simulation_name)
-if not os.path.exists(output_directory):
-    os.makedirs(output_directory)
-
-# Plot some outputs
-power= np.array([state.power for state in output_states])
-fig_power, ax_power = plt.subplots()
-ax_power.plot(problem_specification.output_times, power)
-ax_power.set_xlabel("Time(s)")
-ax_power.set_ylabel("Power(W)")
-fig_power.savefig(os.path.join(output_directory, "power.png"))
-
-temperature_fuel = np.array([state.t_fuel_mean for state in output_states])
-fig_temperature_fuel, ax_temperature_fuel = plt.subplots()
-ax_temperature_fuel.plot(problem_specification.output_times, temperature_fuel)
-ax_temperature_fuel.set_xlabel("Time(s)")
-ax_temperature_fuel.set_ylabel("Mean Fuel Temperature (K)")
-fig_temperature_fuel.savefig(os.path.join(output_directory, "temperature_fuel.png"))
-
-temperature_coolant = np.array([state.t_coolant_mean for state in output_states])
-fig_temperature_coolant, ax_temperature_coolant = plt.subplots()
-ax_temperature_coolant.plot(problem_specification.output_times, temperature_coolant)
-ax_temperature_coolant.set_xlabel("Time(s)")
-ax_temperature_coolant.set_ylabel("Mean Coolant Temperature (K)")
-fig_temperature_coolant.savefig(os.path.join(output_directory, "temperature_coolant.png"))
+
+def make_initial_state(problem_specification):
+    '''Sets up the state at the start of the simulation. By default there are no neutrons or precursors and everything is at the reference temperature
+    If the initial condition of the problem is "steady_state" the simulation instead starts from the steady state at the initial driving reactivity
+    problem_specification -- The specification of the problem (ProblemSpecification)
+    [return] -- The initial state of the system (State)'''
+
+    if problem_specification.initial_condition == "steady_state":
+        return calculate_steady_state(problem_specification, problem_specification.output_times[0])
+
+    initial_state = State(problem_specification, 0)
+    initial_state.t_fuel = np.full(problem_specification.temperature_shape, problem_specification.temperature_zero)
+    initial_state.t_coolant = np.full(problem_specification.temperature_shape, problem_specification.temperature_zero)
+
+    return initial_state
+
+def make_output_directory(problem_specification):
+    '''Makes the output directory of the simulation if it doesn't exist
+    problem_specification -- The specification of the problem (ProblemSpecification)
+    [return] -- The path of the output directory (str)'''
+
+    output_directory = os.path.join("outputs", problem_specification.simulation_name)
+    if not os.path.exists(output_directory):
+        os.makedirs(output_directory)
+
+    return output_directory
+
+def run(problem_specification, checkpoint_path=None, instrumentation=None, cache=None):
+    '''Simulates the problem from its initial state, or from the checkpoint it is to be restarted from
+    problem_specification -- The specification of the problem (ProblemSpecification)
+    checkpoint_path -- The path checkpoints are written to if the problem specification has a checkpoint interval (default None)(str)
+    instrumentation -- Records the evaluations of the equations and the steps of the solver, or None for the run not to be instrumented (default None)(Instrumentation)
+    cache -- Results of earlier runs which are reused if they match this one, or None not to use a cache (default None)(ResultCache)
+    [return] -- The states at the output times (Trajectory)'''
+
+    return calculate_future_states(make_initial_state(problem_specification), problem_specification, checkpoint_path=checkpoint_path, instrumentation=instrumentation, cache=cache)
+
+def plot_outputs(problem_specification, output_states, file_format="png"):
+    '''Plots the report of the simulation into its output directory: the power and mean temperatures against time and heatmaps of the temperatures against time and height
+    matplotlib is only imported by the processes rendering the figures, as importing it takes longer than short simulations
+    problem_specification -- The specification of the problem (ProblemSpecification)
+    output_states -- The states at the output times (Trajectory)
+    file_format -- The file format of the plots, such as "png", "pdf" or "svg" (default "png")(str)
+    [return] -- The paths of the plots ([str])'''
+
+    return make_report(output_states, make_output_directory(problem_specification), file_format)
+
+def report_kinetics_error(input_file_path, problem_specification, output_states):
+    '''Runs the problem again with full kinetics and reports the error of the reduced kinetics model against it, printing the largest errors and saving them all in kinetics_error.json in the output directory
+    input_file_path -- The path to the input file, which is read again with full kinetics (str)
+    problem_specification -- The specification of the problem with the reduced kinetics model (ProblemSpecification)
+    output_states -- The states at the output times with the reduced kinetics model (Trajectory)
+    [return] -- The errors of the power, mean temperatures and temperatures ({str: {str: float}})'''
+
+    reference = run(read_input(input_file_path, {"kinetics": "full"}))
+
+    # With adaptive output the two runs keep different times, so both are compared at every time either kept
+    if not np.array_equal(reference.times, output_states.times):
+        times = np.union1d(reference.times, output_states.times)
+        output_states, reference = output_states.interpolate(times), reference.interpolate(times)
+
+    errors = kinetics_error(output_states, reference)
+
+    with open(os.path.join(make_output_directory(problem_specification), "kinetics_error.json"), "w") as f:
+        json.dump({"kinetics": problem_specification.kinetics_model.name, "errors": errors}, f, indent=1)
+
+    for name in ("power", "t_fuel_mean", "t_coolant_mean"):
+        print("Largest error of {} against full kinetics: {:.3g} ({:.3g}% of its largest value) at {}s".format(name, errors[name]["max_absolute"], 100 * errors[name]["max_relative"], errors[name]["time_of_max"]))
+
+    return(errors)
+
+def report_events(problem_specification, output_states):
+    '''Prints the events which happened during the simulation and saves them in events.json in the output directory
+    problem_specification -- The specification of the problem (ProblemSpecification)
+    output_states -- The states at the output times, with the events which happened (Trajectory)
+    [return] -- The time and description of each event ([{str: value}])'''
+
+    events = [{"time": float(time), "event": event.description} for time, event in output_states.events]
+
+    with open(os.path.join(make_output_directory(problem_specification), "events.json"), "w") as f:
+        json.dump(events, f, indent=1)
+
+    for event in events:
+        print("Event '{}' at {}s".format(event["event"], event["time"]))
+
+    return(events)
+
+def report_sensitivities(problem_specification, sensitivities):
+    '''Prints the derivatives of the peak power and peak fuel temperature with respect to each parameter and saves them in sensitivities.json in the output directory
+    problem_specification -- The specification of the problem (ProblemSpecification)
+    sensitivities -- The derivatives of the states with respect to the parameters (Sensitivities)
+    [return] -- The derivatives of the peak power (W per unit of the parameter) and peak fuel temperature (K per unit of the parameter) for each parameter ({str: {str: float}})'''
+
+    report = {parameter: {"peak_power": float(peak_power), "peak_t_fuel": float(peak_t_fuel)} for parameter, peak_power, peak_t_fuel in zip(sensitivities.parameters, sensitivities.peak_power, sensitivities.peak_t_fuel)}
+
+    with open(os.path.join(make_output_directory(problem_specification), "sensitivities.json"), "w") as f:
+        json.dump(report, f, indent=1)
+
+    for parameter in report:
+        print("Sensitivity to {}: peak power {:.4g}, peak fuel temperature {:.4g}".format(parameter, report[parameter]["peak_power"], report[parameter]["peak_t_fuel"]))
+
+    return(report)
+
+def main(arguments=None):
+    '''Runs a simulation from the command line, reading the input file and options from the arguments
+    arguments -- The command line arguments, or None to use those the program was run with (default None)([str])
+    [return] -- The states at the output times (Trajectory)'''
+
+    parser = argparse.ArgumentParser(description="Simulates a nuclear reactor from an input file and plots the results.")
+    parser.add_argument("input_file_path", help="the path to the input file")
+    parser.add_argument("--no-plot", action="store_true", help="run the simulation without plotting the results")
+    parser.add_argument("--format", default="png", choices=["png", "pdf", "svg"], help="the file format of the plots (default png)")
+    parser.add_argument("--instrument", action="store_true", help="record where the time of the run is spent in instrumentation.json and trace.json in the output directory")
+    parser.add_argument("--no-kinetics-error", action="store_true", help="don't compare a run with reduced kinetics to the same problem with full kinetics")
+    parser.add_argument("--no-result-cache", action="store_true", help="run the simulation even if the same problem has been run before, without storing its results in outputs/results")
+    parser.add_argument("--sensitivities", nargs="+", metavar="PARAMETER", help="calculate the derivatives of the peak power and peak fuel temperature with respect to these input parameters alongside the simulation, saving them in sensitivities.json in the output directory")
+    options = parser.parse_args(arguments)
+
+    # Read the input file to form a problem specification, unless it has been read before
+    problem_specification = read_input(options.input_file_path, cache=SpecificationCache(os.path.join("outputs", "cache")))
+
+    # Checkpoints, if requested, are written to the output directory
+    if problem_specification.checkpoint_interval is not None:
+        checkpoint_path = os.path.join(make_output_directory(problem_specification), "checkpoint.npz")
+    else:
+        checkpoint_path = None
+
+    instrumentation = Instrumentation() if options.instrument else None
+
+    # The results of runs are cached so that running the same problem again, or for longer, reuses them
+    cache = None if options.no_result_cache else ResultCache(os.path.join("outputs", "results"))
+
+    # Find the states of the system and plot them, together with their sensitivities if they are requested
+    if options.sensitivities:
+        sensitivities = calculate_sensitivities(make_initial_state(problem_specification), problem_specification, options.sensitivities)
+        output_states = sensitivities.trajectory
+        report_sensitivities(problem_specification, sensitivities)
+    else:
+        output_states = run(problem_specification, checkpoint_path, instrumentation, cache)
+    if instrumentation is not None:
+        output_directory = make_output_directory(problem_specification)
+        instrumentation.save_summary(os.path.join(output_directory, "instrumentation.json"))
+        instrumentation.save_trace(os.path.join(output_directory, "trace.json"))
+    if output_states.events:
+        report_events(problem_specification, output_states)
+    if problem_specification.kinetics_model.name != "full" and not options.no_kinetics_error:
+        report_kinetics_error(options.input_file_path, problem_specification, output_states)
+    if not options.no_plot:
+        plot_outputs(problem_specification, output_states, options.format)
+
+    return output_states
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+from scipy.integrate import odeint
+import numpy as np
+
+class OdeintSolver():
+    '''A solver which integrates the system using scipy.integrate.odeint (LSODA)
+    Breakpoints are passed to odeint as critical times, which it steps onto rather than across
+    odeint only moves on to the next critical time at an output time, so each breakpoint is also added to the times odeint is asked for and its state is dropped afterwards'''
+    # Whether the solver moves the coolant itself, which this solver leaves to the advection term of the equations
+    transports_coolant = False
+
+    def __init__(self, rtol=None, atol=None, max_step=None, first_step=None):
+        '''Constructs the solver
+        self -- The instance of OdeintSolver being constructed (OdeintSolver)
+        rtol -- The relative tolerance, or None to use the odeint default (default None)(float)
+        atol -- The absolute tolerance, or None to use the odeint default (default None)(float)
+        max_step -- The largest step the solver may take (s), or None for no limit (default None)(float)
+        first_step -- The size of the first step (s), or None for the solver to choose (default None)(float)'''
+
+        # Only the options that have been set are passed to odeint so that it uses its own defaults for the rest
+        self._options = {}
+        if rtol is not None:
+            self._options["rtol"] = rtol
+        if atol is not None:
+            self._options["atol"] = atol
+        if max_step is not None:
+            self._options["hmax"] = max_step
+        if first_step is not None:
+            self._options["h0"] = first_step
+
+    @property
+    def name(self):
+        ''' Returns the name of the solver
+        self -- The solver the value is being returned from (OdeintSolver)
+        [return] -- The name of the solver (str)'''
+        return("odeint")
+
+    def __repr__(self):
+        '''Returns a string describing the solver and its options, used to identify the problem specification it belongs to
+        self -- The solver being described (OdeintSolver)
+        [return] -- The name and options of the solver (str)'''
+        return("OdeintSolver({!r})".format(sorted(self._options.items())))
+
+    def _add_breakpoints(self, times, breakpoints):
+        '''Adds the breakpoints within the period being integrated to the times odeint is asked for
+        self -- The solver being used (OdeintSolver)
+        times -- The times at which the state is to be returned (s)(np.array[float])
+        breakpoints -- Times at which the equations change suddenly, or None if there are none (s)(np.array[float])
+        [return] -- The times odeint is asked for, the critical times and the indices of the requested times within the times odeint is asked for (np.array[float], np.array[float], np.array[int])'''
+
+        if breakpoints is None:
+            return(times, None, None)
+
+        breakpoints = np.unique(breakpoints)
+        breakpoints = breakpoints[(breakpoints > times[0]) & (breakpoints < times[-1])]
+        if len(breakpoints) == 0:
+            return(times, None, None)
+
+        all_times = np.union1d(times, breakpoints)
+        return(all_times, breakpoints, np.searchsorted(all_times, times))
+
+    def _jacobian_options(self, jacobian):
+        '''Returns the function odeint calls for the Jacobian, which is banded if the Jacobian has bands and dense otherwise, and the options giving any bandwidths
+        self -- The solver being used (OdeintSolver)
+        jacobian -- The analytic Jacobian of the system, or None for the solver to estimate it (Jacobian)
+        [return] -- The function of the Jacobian, or None for odeint to estimate it, and the options of odeint (function(np.array[float], float) -> np.array[float], dict)'''
+
+        if jacobian is None:
+            return(None, {})
+
+        # odeint factorises a banded Jacobian within its bands, which for a block diagonal Jacobian is far cheaper than factorising it as a whole
+        if getattr(jacobian, "bandwidths", None) is not None:
+            lower, upper = jacobian.bandwidths
+            return(jacobian.banded, {"ml": lower, "mu": upper})
+
+        return(jacobian.dense, {})
+
+    def __call__(self, derivative_function, jacobian, start_array, times, breakpoints=None):
+        '''Integrates the system from the start state, returning the state at each of the requested times
+        self -- The solver being used (OdeintSolver)
+        derivative_function -- Calculates the rate of change from the state array and time (function(np.array[float], float) -> np.array[float])
+        jacobian -- The analytic Jacobian of the system, or None for the solver to estimate it (Jacobian)
+        start_array -- The state of the system at the first of the times (np.array[float])
+        times -- The times at which the state is to be returned (s)(np.array[float])
+        breakpoints -- Times at which the equations change suddenly, which odeint steps onto rather than across (default None)(s)(np.array[float])
+        [return] -- The states at the requested times, one per row, and the solver statistics (np.array[float], dict)'''
+
+        jacobian_function, options = self._jacobian_options(jacobian)
+        options.update(self._options)
+        all_times, critical_times, indices = self._add_breakpoints(times, breakpoints)
+        if critical_times is not None:
+            options["tcrit"] = critical_times
+
+        calculated_arrays, information = odeint(derivative_function, start_array, all_times, Dfun=jacobian_function, full_output=True, **options)
+        if indices is not None:
+            calculated_arrays = calculated_arrays[indices]
+
+        # odeint doesn't report the number of LU decompositions, and only reports the time reached and last step size at each output time
+        statistics = {"solver": self.name, "nfev": int(information["nfe"][-1]), "njev": int(information["nje"][-1]), "nlu": None, "n_steps": int(information["nst"][-1]),
+                      "step_times": information["tcur"], "step_sizes": information["hu"]}
+
+        return(calculated_arrays, statistics)
+
+    def stream(self, derivative_function, jacobian, start_array, times, chunk_size, first_step=None, breakpoints=None):
+        '''Integrates the system from the start state, yielding the states at the requested times in chunks as they are calculated
+        odeint can't be paused, so each chunk is a separate call starting from the last state of the previous chunk, with the first step set to the last step size of the previous chunk
+        self -- The solver being used (OdeintSolver)
+        derivative_function -- Calculates the rate of change from the state array and time (function(np.array[float], float) -> np.array[float])
+        jacobian -- The analytic Jacobian of the system, or None for the solver to estimate it (Jacobian)
+        start_array -- The state of the system at the first of the times (np.array[float])
+        times -- The times at which the state is to be returned (s)(np.array[float])
+        chunk_size -- The number of times in each chunk (int)
+        first_step -- The size of the first step, replacing that of the solver, or None to keep it (default None)(float)
+        breakpoints -- Times at which the equations change suddenly, which odeint steps onto rather than across (default None)(s)(np.array[float])
+        [return] -- The times of each chunk, the states at those times, one per row, and the last step size, which is None before the first step (iterator[(np.array[float], np.array[float], float)])'''
+
+        jacobian_function, options = self._jacobian_options(jacobian)
+        options.update(self._options)
+        if first_step is not None:
+            options["h0"] = first_step
+
+        # The start state is yielded on its own and each following window begins at the last time of the previous one
+        yield times[:1], start_array[None, :].copy(), None
+        state_array = start_array
+
+        for i_start in range(1, len(times), chunk_size):
+            # Integrate from the last time of the previous chunk and drop its repeated state
+            window = times[i_start - 1:i_start + chunk_size]
+            all_times, critical_times, indices = self._add_breakpoints(window, breakpoints)
+            window_options = dict(options)
+            if critical_times is not None:
+                window_options["tcrit"] = critical_times
+
+            calculated_arrays, information = odeint(derivative_function, state_array, all_times, Dfun=jacobian_function, full_output=True, **window_options)
+            if indices is not None:
+                calculated_arrays = calculated_arrays[indices]
+            state_array = calculated_arrays[-1]
+            options["h0"] = information["hu"][-1]
+
+            yield window[1:], calculated_arrays[1:], options["h0"]
\ No newline at end of file
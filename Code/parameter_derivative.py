@@ -0,0 +1,143 @@
+import numpy as np
+
+class ParameterDerivative():
+    '''The analytic derivative of the rate of change calculated by derivative with respect to some of the parameters of the input, for the full kinetics
+    The parameters are named by their identifiers in the input, with the delayed neutron precursor groups numbered from 1 as in "delayed_fraction_1" and "delayed_decay_rate_1"
+    Column k of the result is the rate of change of the gradient of every state variable with respect to parameter k, using the ordering of StateVariables.as_array'''
+
+    # The parameters which apply to the whole core, and those which also set the values of each channel so are only accepted for a single channel
+    core_parameters = ("feedback_fuel", "feedback_coolant", "source", "generation_time", "energy_fission", "heat_transfer_coefficient", "thermal_conductivity_fuel")
+    single_channel_parameters = ("heat_capacity_fuel", "heat_capacity_coolant", "speed_coolant")
+
+    def __init__(self, problem_specification, parameters):
+        '''Checks the parameters and precomputes the coefficients of the equations
+        self -- The instance of ParameterDerivative being constructed (ParameterDerivative)
+        problem_specification -- The specification of the current physical system (ProblemSpecification)
+        parameters -- The identifiers of the parameters (String)([String])'''
+
+        n_delayed = problem_specification.n_delayed
+        n_temperatures = problem_specification.n_temperatures
+
+        # If a parameter isn't one the derivative is known for raise an exception
+        group_parameters = ["delayed_fraction_" + str(i_delayed + 1) for i_delayed in range(n_delayed)] + ["delayed_decay_rate_" + str(i_delayed + 1) for i_delayed in range(n_delayed)]
+        for parameter in parameters:
+            if parameter in self.single_channel_parameters and problem_specification.n_channels != 1:
+                raise ValueError("The sensitivity to '{}' can only be found for a single channel.".format(parameter))
+            if parameter not in self.core_parameters + self.single_channel_parameters and parameter not in group_parameters:
+                raise ValueError("The sensitivity to '{}' can't be found. The parameters are {}, {} and delayed_fraction_ or delayed_decay_rate_ followed by the number of a group.".format(parameter, ", ".join(self.core_parameters), ", ".join(self.single_channel_parameters)))
+
+        self._parameters = list(parameters)
+        self._n_z = problem_specification.n_z
+        self._shape = problem_specification.temperature_shape
+        self._n_state_variables = problem_specification.n_state_variables
+
+        # The positions of the different variables in the state array, matching StateVariables.as_array
+        self._delayed = slice(1, n_delayed + 1)
+        self._fuel = slice(n_delayed + 1, n_delayed + n_temperatures + 1)
+        self._coolant = slice(n_delayed + n_temperatures + 1, n_delayed + 2 * n_temperatures + 1)
+
+        # The parameters and coefficients of the equations
+        self._betas = np.array(problem_specification.betas, dtype=float)
+        self._beta = problem_specification.beta
+        self._generation_time = problem_specification.generation_time
+        self._energy_fission = problem_specification.energy_fission
+        self._reactivity_driving = problem_specification.reactivity_driving
+        self._feedback_fuel = problem_specification.feedback_fuel
+        self._feedback_coolant = problem_specification.feedback_coolant
+        self._temperature_zero = problem_specification.temperature_zero
+        self._temperature_weights = problem_specification.temperature_weights.ravel()
+        self._n_channels = problem_specification.n_channels
+        self._heat_capacity_fuel = problem_specification.heat_capacity_fuel
+        self._heat_capacity_coolant = problem_specification.heat_capacity_coolant
+        self._heat_capacity_per_discretisation_fuel = problem_specification.heat_capacity_per_discretisation_fuel
+        self._heat_capacity_per_discretisation_coolant = problem_specification.heat_capacity_per_discretisation_coolant
+        self._power_distribution = problem_specification.power_distribution
+        self._heat_transfer_per_discretisation = problem_specification.heat_transfer_per_discretisation
+        self._channel_thermal_conductivity_fuel = problem_specification.channel_thermal_conductivity_fuel
+        self._conduction_below, self._conduction_above = problem_specification.conduction_factors
+        self._cell_heights = problem_specification.cell_heights
+        self._relative_cell_heights = problem_specification.relative_cell_heights
+
+    @property
+    def parameters(self):
+        ''' Returns the identifiers of the parameters
+        self -- The derivative the value is being returned from (ParameterDerivative)
+        [return] -- The identifiers of the parameters, in the order of the columns ([String])'''
+        return(self._parameters)
+
+    def _conduction(self, t_fuel):
+        '''Calculates the thermal diffusion term of the fuel equation for a unit conductivity and heat capacity
+        self -- The derivative being used (ParameterDerivative)
+        t_fuel -- The fuel temperatures, in the shape of the temperatures (K)(np.array[float])
+        [return] -- The thermal diffusion term, which is zero for a single discretisation (K/m^2)(np.array[float])'''
+
+        conduction = np.zeros(self._shape)
+        if self._n_z > 1:
+            conduction[..., 1:] += self._conduction_below[1:] * (t_fuel[..., 1:] - t_fuel[..., :-1])
+            conduction[..., :-1] += self._conduction_above[:-1] * (t_fuel[..., :-1] - t_fuel[..., 1:])
+        return(conduction)
+
+    def __call__(self, state_array, time):
+        '''Calculates the derivative of the rate of change with respect to each parameter at the specified state and time
+        self -- The instance of ParameterDerivative being called (ParameterDerivative)
+        state_array -- The current state of the system contained in a single array (np.array[float])
+        time -- The current time of the state (s)(float)
+        [return] -- The derivative of the rate of change of each state variable, one column per parameter (np.array[float])'''
+
+        n_neutron = state_array[0]
+        n_delayed = state_array[self._delayed]
+        t_fuel = state_array[self._fuel].reshape(self._shape)
+        t_coolant = state_array[self._coolant].reshape(self._shape)
+
+        t_fuel_mean = self._temperature_weights.dot(state_array[self._fuel])
+        t_coolant_mean = self._temperature_weights.dot(state_array[self._coolant])
+        reactivity = self._reactivity_driving(time) + self._feedback_fuel * (t_fuel_mean - self._temperature_zero) + self._feedback_coolant * (t_coolant_mean - self._temperature_zero)
+
+        # The terms of the temperature equations, before they are divided by the heat capacities
+        heating = n_neutron * self._energy_fission * self._power_distribution / self._generation_time
+        difference = t_fuel - t_coolant
+        transfer = difference * self._heat_transfer_per_discretisation
+
+        # Each column is filled in as a row, so that the temperatures can be viewed in their shape
+        result = np.zeros((len(self._parameters), self._n_state_variables))
+        for i_parameter, parameter in enumerate(self._parameters):
+            column = result[i_parameter]
+            fuel = column[self._fuel].reshape(self._shape)
+            coolant = column[self._coolant].reshape(self._shape)
+
+            if parameter in ("feedback_fuel", "feedback_coolant"):
+                # The reactivity changes with the feedback coefficient by the change in the mean temperature
+                mean_change = (t_fuel_mean if parameter == "feedback_fuel" else t_coolant_mean) - self._temperature_zero
+                column[0] = self._beta * n_neutron * mean_change / self._generation_time
+                column[self._delayed] = self._betas * n_neutron * mean_change / self._generation_time
+            elif parameter == "source":
+                column[0] = 1
+            elif parameter == "generation_time":
+                column[0] = -self._beta * (reactivity - 1) * n_neutron / self._generation_time ** 2
+                column[self._delayed] = -self._betas * reactivity * n_neutron / self._generation_time ** 2
+                fuel[...] = -heating / (self._generation_time * self._heat_capacity_per_discretisation_fuel)
+            elif parameter == "energy_fission":
+                fuel[...] = heating / (self._energy_fission * self._heat_capacity_per_discretisation_fuel)
+            elif parameter == "heat_transfer_coefficient":
+                fuel[...] = -difference * self._relative_cell_heights / (self._n_channels * self._heat_capacity_per_discretisation_fuel)
+                coolant[...] = difference * self._relative_cell_heights / (self._n_channels * self._heat_capacity_per_discretisation_coolant)
+            elif parameter == "thermal_conductivity_fuel":
+                fuel[...] = self._conduction(t_fuel) / (self._n_channels * self._heat_capacity_per_discretisation_fuel)
+            elif parameter == "heat_capacity_fuel":
+                # Every term of the fuel equation is divided by the heat capacity
+                fuel[...] = -(heating - transfer + self._channel_thermal_conductivity_fuel * self._conduction(t_fuel)) / (self._heat_capacity_per_discretisation_fuel * self._heat_capacity_fuel)
+            elif parameter == "heat_capacity_coolant":
+                coolant[...] = -transfer / (self._heat_capacity_per_discretisation_coolant * self._heat_capacity_coolant)
+            elif parameter == "speed_coolant":
+                # The coolant below the bottom discretisation is at the reference temperature
+                coolant[...] = -np.diff(t_coolant, prepend=self._temperature_zero) / self._cell_heights
+            elif parameter.startswith("delayed_fraction_"):
+                i_delayed = int(parameter[len("delayed_fraction_"):]) - 1
+                column[0] = (reactivity - 1) * n_neutron / self._generation_time
+                column[1 + i_delayed] = reactivity * n_neutron / self._generation_time
+            else:
+                i_delayed = int(parameter[len("delayed_decay_rate_"):]) - 1
+                column[0] = n_delayed[i_delayed]
+                column[1 + i_delayed] = -n_delayed[i_delayed]
+
+        return(result.T)
@@ -1,9 +1,13 @@
 import numpy as np
+import hashlib
+import copy
+from odeint_solver import OdeintSolver
+from kinetics_model import KineticsModel
 
 class ProblemSpecification:
     '''A description of the parameters of the problem to be solved'''
     # By setting a all variables in the constructor with the _ prefix to the variable names, it is indicated that these variables shouldn't be accessed from outside this file. They are accessed through the properties instead. This effectively makes instances of this class immutable as the internal variables should not be changed but may be retrieved.
-    def __init__(self, n_z, betas, reactivity_driving, generation_time, lambdas, source, feedback_fuel, temperature_zero, feedback_coolant, energy_fission, heat_capacity_fuel, total_height, heat_transfer_coefficient, thermal_conductivity_fuel, heat_capacity_coolant, speed_coolant, extrapolation_distance_bottom, extrapolation_distance_top, simulated_time, output_timestep, simulation_name):
+    def __init__(self, n_z, betas, reactivity_driving, generation_time, lambdas, source, feedback_fuel, temperature_zero, feedback_coolant, energy_fission, heat_capacity_fuel, total_height, heat_transfer_coefficient, thermal_conductivity_fuel, heat_capacity_coolant, speed_coolant, extrapolation_distance_bottom, extrapolation_distance_top, simulated_time, output_timestep, simulation_name, solver=None, checkpoint_interval=None, restart_from=None, initial_condition="cold", kinetics="full", n_channels=1, channel_peaking=None, channel_speeds=None, channel_heat_capacities_fuel=None, channel_heat_capacities_coolant=None, events=(), adaptive_output=None, axial_boundaries=None):
         '''Constructs the data for the problem specification
         self -- The instance of ProblemSpecification being constructed (ProblemSpecification)
         n_z -- The number of discretisations of the system (int)
@@ -28,12 +32,40 @@ class ProblemSpecification:
         simulated_time -- The time the reactor is to be simulated for (s)(float)
         output_timestep -- The time the reactor is to be simulated for (s)(float)
         simulation_name -- The name of the simulation (str)
+        solver -- The solver used to integrate the system, or None to use odeint with its default settings (default None)(OdeintSolver or SolveIvpSolver)
+        checkpoint_interval -- The simulated time between checkpoints, or None for no checkpoints (s)(default None)(float)
+        restart_from -- The path of a checkpoint the simulation is continued from, or None to start from the beginning (default None)(str)
+        initial_condition -- How the initial state is set up, either "cold" for no neutrons with everything at the reference temperature or "steady_state" for the steady state at the initial driving reactivity (default "cold")(str)
+        kinetics -- The model of the neutron kinetics, one of "full", "prompt_jump" or "one_group" (default "full")(str)
+        n_channels -- The number of vertical channels making up the core, which share the neutrons and the reactivity feedback (default 1)(int)
+        channel_peaking -- The relative power of each channel, which is normalised to give the fraction of the power in each, or None for equal powers (default None)(np.array[float])
+        channel_speeds -- The speed of the coolant in each channel, or None for speed_coolant in every channel (m/s)(default None)(np.array[float])
+        channel_heat_capacities_fuel -- The absolute heat capacity of the fuel of each channel, or None to divide heat_capacity_fuel equally between the channels (J/K)(default None)(np.array[float])
+        channel_heat_capacities_coolant -- The absolute heat capacity of the coolant of each channel, or None to divide heat_capacity_coolant equally between the channels (W/K)(default None)(np.array[float])
+        events -- Conditions on the state which stop the simulation, are recorded or scram the reactor when they are crossed (default ())((Event))
+        adaptive_output -- How the states at the output times are thinned out to those needed to follow the solution, or None to keep every output time (default None)(AdaptiveOutput)
+        axial_boundaries -- The heights of the boundaries between the discretisations from the bottom, 0, to the top, total_height, or None for discretisations of equal height (m)(default None)(np.array[float])
         '''
 
         # Set various values in the problem specification and calculate other values that are based on them
         self._n_z = n_z
         self._d_z = total_height / n_z
-        self._heights = np.array([self._d_z * (i + 0.5) for i in range(n_z)])
+        if axial_boundaries is None:
+            self._axial_boundaries = None
+            self._heights = np.array([self._d_z * (i + 0.5) for i in range(n_z)])
+            self._cell_heights = np.full(n_z, self._d_z)
+        else:
+            # If the boundaries don't divide the whole height into n_z discretisations in order from the bottom raise an exception
+            self._axial_boundaries = np.array(axial_boundaries, dtype=float)
+            if self._axial_boundaries.shape != (n_z + 1,):
+                raise ValueError("The core has {} discretisations but {} axial boundaries were given, not {}.".format(n_z, self._axial_boundaries.size, n_z + 1))
+            if self._axial_boundaries[0] != 0 or not np.isclose(self._axial_boundaries[-1], total_height, rtol=1e-12, atol=0):
+                raise ValueError("The axial boundaries must run from 0 to the total height {}, not {} to {}.".format(total_height, self._axial_boundaries[0], self._axial_boundaries[-1]))
+            if np.any(np.diff(self._axial_boundaries) <= 0):
+                raise ValueError("The axial boundaries must increase from the bottom to the top.")
+            self._axial_boundaries[-1] = total_height
+            self._heights = 0.5 * (self._axial_boundaries[:-1] + self._axial_boundaries[1:])
+            self._cell_heights = np.diff(self._axial_boundaries)
         self._betas = betas
         self._n_delayed = len(self._betas)
         self._beta = sum(betas)
@@ -53,19 +85,81 @@ class ProblemSpecification:
         self._speed_coolant = speed_coolant
         self._simulation_name = simulation_name
 
-        self._n_state_variables = 2 * n_z + self._n_delayed + 1
+        if solver is None:
+            solver = OdeintSolver()
+        self._solver = solver
+
+        # If the initial condition isn't recognised raise an exception
+        if initial_condition not in ("cold", "steady_state"):
+            raise ValueError("The initial condition '{}' is not 'cold' or 'steady_state'.".format(initial_condition))
+        self._initial_condition = initial_condition
+
+        self._checkpoint_interval = checkpoint_interval
+        self._restart_from = restart_from
+
+        # A simulation with events may end early or change its reactivity, so if it is also to be checkpointed or restarted raise an exception
+        self._events = tuple(events)
+        if self._events and (checkpoint_interval is not None or restart_from is not None):
+            raise ValueError("A simulation with events can't be checkpointed or restarted.")
+
+        # The output times of a simulation with adaptive output aren't known in advance, so if it has events or is to be checkpointed or restarted raise an exception
+        self._adaptive_output = adaptive_output
+        if adaptive_output is not None and (self._events or checkpoint_interval is not None or restart_from is not None):
+            raise ValueError("A simulation with adaptive output can't have events or be checkpointed or restarted.")
+
+        # The parameters of each channel, which default to the whole core divided equally between identical channels
+        self._n_channels = n_channels
+        self._channel_power_fractions = self._channel_values(channel_peaking, 1.0, "channel_peaking")
+        self._channel_power_fractions = self._channel_power_fractions / self._channel_power_fractions.sum()
+        self._channel_speeds = self._channel_values(channel_speeds, speed_coolant, "channel_speeds")
+        self._channel_heat_capacities_fuel = self._channel_values(channel_heat_capacities_fuel, heat_capacity_fuel / n_channels, "channel_heat_capacities_fuel")
+        self._channel_heat_capacities_coolant = self._channel_values(channel_heat_capacities_coolant, heat_capacity_coolant / n_channels, "channel_heat_capacities_coolant")
+
+        self._n_state_variables = 2 * n_channels * n_z + self._n_delayed + 1
 
         # Calculate the power profile of the system
+        # The power of each discretisation is the profile at its middle times its height, which for equal heights is just the profile
         self._power_profile = np.sin(np.pi * (extrapolation_distance_bottom + self.heights) / (total_height + extrapolation_distance_bottom + extrapolation_distance_top))
+        if axial_boundaries is not None:
+            self._power_profile *= self._cell_heights
         self._power_profile /= np.sum(self._power_profile)
 
         # Calculate the output times of the system
-        self._output_times = np.arange(0, simulated_time + output_timestep, output_timestep)
-        self._output_times[-1] = simulated_time
+        self._output_timestep = output_timestep
+        self._output_times = self._make_output_times(simulated_time)
+
+        # Calculate the heat capacity per discretisation, which for several channels is a column with one row per channel so that it broadcasts against the temperatures
+        if n_channels == 1:
+            self._heat_capacity_per_discretisation_fuel = heat_capacity_fuel / n_z
+            self._heat_capacity_per_discretisation_coolant = heat_capacity_coolant / n_z
+        else:
+            self._heat_capacity_per_discretisation_fuel = self._channel_heat_capacities_fuel[:, np.newaxis] / n_z
+            self._heat_capacity_per_discretisation_coolant = self._channel_heat_capacities_coolant[:, np.newaxis] / n_z
+
+        # The heat capacities of discretisations of different heights are in proportion to their heights, so are a row with a value per discretisation
+        if axial_boundaries is not None:
+            self._heat_capacity_per_discretisation_fuel = self._heat_capacity_per_discretisation_fuel * self.relative_cell_heights
+            self._heat_capacity_per_discretisation_coolant = self._heat_capacity_per_discretisation_coolant * self.relative_cell_heights
 
-        # Calculate the heat capacity per discretisation
-        self._heat_capacity_per_discretisation_fuel = heat_capacity_fuel / n_z
-        self._heat_capacity_per_discretisation_coolant = heat_capacity_coolant / n_z
+        # The kinetics model sets the variables the solver integrates, so it is made once everything it depends on is set
+        self._kinetics_model = KineticsModel(self, kinetics)
+
+    def _channel_values(self, values, default, name):
+        '''Returns a parameter with one value per channel, checking that the right number of values were given
+        self -- The problem specification being constructed (ProblemSpecification)
+        values -- The value for each channel, or None to use the default for every channel (np.array[float])
+        default -- The value of every channel if none are given (float)
+        name -- The name of the parameter, used in the error message (str)
+        [return] -- The value for each channel (np.array[float])'''
+
+        if values is None:
+            return(np.full(self._n_channels, default, dtype=float))
+
+        values = np.asarray(values, dtype=float)
+        # If there isn't one value per channel raise an exception
+        if values.shape != (self._n_channels,):
+            raise ValueError("The core has {} channels but {} has {} values.".format(self._n_channels, name, values.size))
+        return(values)
 
     @property
     def n_z(self):
@@ -76,11 +170,59 @@ class ProblemSpecification:
 
     @property
     def d_z(self):
-        ''' Returns the height of a single vertical discretisation 
+        ''' Returns the height of a single vertical discretisation, which for discretisations of different heights is their mean height
         self -- The problem specification the value is being returned from (ProblemSpecification)
         [return] -- The height of a single vertical discretisation  (float)'''
         return(self._d_z)
 
+    @property
+    def uniform_mesh(self):
+        ''' Returns whether every vertical discretisation has the same height
+        self -- The problem specification the value is being returned from (ProblemSpecification)
+        [return] -- True unless axial boundaries were given (bool)'''
+        return(self._axial_boundaries is None)
+
+    @property
+    def axial_boundaries(self):
+        ''' Returns the heights of the boundaries between the vertical discretisations, including the bottom and top
+        self -- The problem specification the value is being returned from (ProblemSpecification)
+        [return] -- The n_z + 1 boundary heights (m)(np.array[float])'''
+        if self._axial_boundaries is None:
+            return(np.linspace(0, self._total_height, self._n_z + 1))
+        return(self._axial_boundaries)
+
+    @property
+    def cell_heights(self):
+        ''' Returns the height of each vertical discretisation
+        self -- The problem specification the value is being returned from (ProblemSpecification)
+        [return] -- The height of each discretisation (m)(np.array[float])'''
+        return(self._cell_heights)
+
+    @property
+    def relative_cell_heights(self):
+        ''' Returns the height of each vertical discretisation relative to d_z, which every quantity of a discretisation that is in proportion to its size is scaled by
+        self -- The problem specification the value is being returned from (ProblemSpecification)
+        [return] -- The relative height of each discretisation, all 1 for discretisations of equal height (np.array[float])'''
+        return(self._cell_heights / self._d_z)
+
+    @property
+    def conduction_factors(self):
+        ''' Returns the geometric factors of the thermal diffusion term of each fuel discretisation with the discretisations below and above it
+        The heat conducted between two discretisations is in proportion to the difference in their temperatures over the distance between their middles, with d_z ** 2 replaced by d_z times that distance. The factor is the same from both sides, and the heat capacity the term is divided by is in proportion to the height of the discretisation, so the heat lost by one is gained by the other
+        self -- The problem specification the value is being returned from (ProblemSpecification)
+        [return] -- The factors with the discretisation below and with the discretisation above, which are zero at the bottom and top (1/m^2)(np.array[float], np.array[float])'''
+
+        below = np.zeros(self._n_z)
+        above = np.zeros(self._n_z)
+        if self._axial_boundaries is None:
+            below[1:] = 1 / self._d_z ** 2
+            above[:-1] = 1 / self._d_z ** 2
+        else:
+            faces = 1 / (self._d_z * np.diff(self._heights))
+            below[1:] = faces
+            above[:-1] = faces
+        return(below, above)
+
     @property
     def heights(self):
         ''' Returns the middle heights for each vertical discretisation
@@ -112,10 +254,86 @@ class ProblemSpecification:
     def reactivity_driving(self, time):
         ''' Evaluates the driving reactivity at the specified time
         self -- The problem specification the value is being returned from (ProblemSpecification)
-        time -- The time the driving reactivity is to be returned at (s)(float)
-        [return] -- The driving reactivity at the specified time ($)(float)'''
+        time -- The time or times the driving reactivity is to be returned at (s)(float or np.array[float])
+        [return] -- The driving reactivity at the specified time or times ($)(float or np.array[float])'''
         return(self._reactivity_driving(time))
 
+    @property
+    def reactivity_profile(self):
+        ''' Returns the driving reactivity as a function of time
+        self -- The problem specification the value is being returned from (ProblemSpecification)
+        [return] -- The driving reactivity ($ as a function of time in s)(ReactivityFunction)'''
+        return(self._reactivity_driving)
+
+    @property
+    def reactivity_breakpoints(self):
+        ''' Returns the times at which the driving reactivity or its rate of change jumps, which the solver should step onto rather than across
+        self -- The problem specification the value is being returned from (ProblemSpecification)
+        [return] -- The times of the breakpoints (s)(np.array[float])'''
+        return(self._reactivity_driving.breakpoints)
+
+    @property
+    def events(self):
+        ''' Returns the conditions on the state which are acted on when they are crossed
+        self -- The problem specification the value is being returned from (ProblemSpecification)
+        [return] -- The events ((Event))'''
+        return(self._events)
+
+    @property
+    def adaptive_output(self):
+        ''' Returns how the states at the output times are thinned out
+        self -- The problem specification the value is being returned from (ProblemSpecification)
+        [return] -- The adaptive output, or None if every output time is kept (AdaptiveOutput)'''
+        return(self._adaptive_output)
+
+    def with_reactivity(self, reactivity_driving):
+        ''' Returns a copy of the problem specification with a different driving reactivity, such as the one after a scram
+        self -- The problem specification being copied (ProblemSpecification)
+        reactivity_driving -- The new driving reactivity ($ as a function of time in s)(ReactivityFunction)
+        [return] -- The problem specification with the new driving reactivity (ProblemSpecification)'''
+
+        problem_specification = copy.copy(self)
+        problem_specification._reactivity_driving = reactivity_driving
+
+        # The kinetics model depends on the driving reactivity, so it is made again
+        problem_specification._kinetics_model = KineticsModel(problem_specification, self._kinetics_model.name)
+        return(problem_specification)
+
+    def with_feedback(self, feedback_fuel, feedback_coolant):
+        ''' Returns a copy of the problem specification with different reactivity feedback coefficients
+        self -- The problem specification being copied (ProblemSpecification)
+        feedback_fuel -- The new reactivity feedback coefficient for the fuel ($/K)(float)
+        feedback_coolant -- The new feedback coefficient for the coolant temperature ($/K)(float)
+        [return] -- The problem specification with the new feedback coefficients (ProblemSpecification)'''
+
+        problem_specification = copy.copy(self)
+        problem_specification._feedback_fuel = feedback_fuel
+        problem_specification._feedback_coolant = feedback_coolant
+
+        # The kinetics model depends on the feedback, so it is made again
+        problem_specification._kinetics_model = KineticsModel(problem_specification, self._kinetics_model.name)
+        return(problem_specification)
+
+    def with_simulated_time(self, simulated_time):
+        ''' Returns a copy of the problem specification simulated for a different time, with the same output timestep
+        self -- The problem specification being copied (ProblemSpecification)
+        simulated_time -- The new time the reactor is to be simulated for (s)(float)
+        [return] -- The problem specification with the new output times (ProblemSpecification)'''
+
+        problem_specification = copy.copy(self)
+        problem_specification._output_times = self._make_output_times(simulated_time)
+        return(problem_specification)
+
+    def _make_output_times(self, simulated_time):
+        '''Calculates the output times, which are spaced by the output timestep and end at the simulated time
+        self -- The problem specification the output times are being calculated for (ProblemSpecification)
+        simulated_time -- The time the reactor is to be simulated for (s)(float)
+        [return] -- The output times (s)(np.array[float])'''
+
+        output_times = np.arange(0, simulated_time + self._output_timestep, self._output_timestep)
+        output_times[-1] = simulated_time
+        return(output_times)
+
     @property
     def generation_time(self):
         ''' Returns the generation time
@@ -218,16 +436,129 @@ class ProblemSpecification:
     def heat_capacity_per_discretisation_fuel(self):
         ''' Returns the absolute heat capacity of the fuel in a single discretised slice
         self -- The problem specification the value is being returned from (ProblemSpecification)
-        [return] -- The absolute heat capacity of the fuel in a single discretised slice(J/K)(float)'''
+        [return] -- The absolute heat capacity of the fuel in a single discretised slice, a row with a value per discretisation for discretisations of different heights (J/K)(float or np.array[float])'''
         return(self._heat_capacity_per_discretisation_fuel)
 
     @property
     def heat_capacity_per_discretisation_coolant(self):
         ''' Returns the absolute heat capacity of the coolant in a single discretised slice
         self -- The problem specification the value is being returned from (ProblemSpecification)
-        [return] -- The absolute heat capacity of the coolant in a single discretised slice(J/K)(float)'''
+        [return] -- The absolute heat capacity of the coolant in a single discretised slice, a row with a value per discretisation for discretisations of different heights (J/K)(float or np.array[float])'''
         return(self._heat_capacity_per_discretisation_coolant)
 
+    def mean_temperature(self, temperatures):
+        '''Calculates the mean of the temperatures which gives the reactivity feedback, which is the axial mean of each channel weighted by the power of the channel
+        The axial mean weights each discretisation by its height
+        self -- The problem specification of the system (ProblemSpecification)
+        temperatures -- The fuel or coolant temperatures, whose last dimensions have the shape of the temperatures, for example one row per time (K)(np.array[float])
+        [return] -- The mean temperature, with the leading dimensions of temperatures (K)(float or np.array[float])'''
+
+        if self._axial_boundaries is None:
+            mean = np.mean(temperatures, axis=-1)
+        else:
+            mean = np.dot(temperatures, self._cell_heights / self._total_height)
+        return(mean if self._n_channels == 1 else np.dot(mean, self._channel_power_fractions))
+
+    @property
+    def n_channels(self):
+        ''' Returns the number of vertical channels making up the core
+        self -- The problem specification the value is being returned from (ProblemSpecification)
+        [return] -- The number of channels (int)'''
+        return(self._n_channels)
+
+    @property
+    def channel_power_fractions(self):
+        ''' Returns the fraction of the power produced in each channel
+        self -- The problem specification the value is being returned from (ProblemSpecification)
+        [return] -- The fraction of the power in each channel, which sum to 1 (np.array[float])'''
+        return(self._channel_power_fractions)
+
+    @property
+    def channel_speeds(self):
+        ''' Returns the speed of the coolant in each channel
+        self -- The problem specification the value is being returned from (ProblemSpecification)
+        [return] -- The speed of the coolant in each channel (m/s)(np.array[float])'''
+        return(self._channel_speeds)
+
+    @property
+    def channel_heat_capacities_fuel(self):
+        ''' Returns the absolute heat capacity of the fuel of each channel
+        self -- The problem specification the value is being returned from (ProblemSpecification)
+        [return] -- The heat capacity of the fuel of each channel (J/K)(np.array[float])'''
+        return(self._channel_heat_capacities_fuel)
+
+    @property
+    def channel_heat_capacities_coolant(self):
+        ''' Returns the absolute heat capacity of the coolant of each channel
+        self -- The problem specification the value is being returned from (ProblemSpecification)
+        [return] -- The heat capacity of the coolant of each channel (W/K)(np.array[float])'''
+        return(self._channel_heat_capacities_coolant)
+
+    @property
+    def temperature_shape(self):
+        ''' Returns the shape of the fuel and coolant temperatures, which have one row per channel if there are several channels
+        self -- The problem specification the value is being returned from (ProblemSpecification)
+        [return] -- The shape of the temperatures, (n_z,) or (n_channels, n_z) ((int))'''
+        return((self._n_z,) if self._n_channels == 1 else (self._n_channels, self._n_z))
+
+    @property
+    def n_temperatures(self):
+        ''' Returns the number of fuel temperatures, which is also the number of coolant temperatures
+        self -- The problem specification the value is being returned from (ProblemSpecification)
+        [return] -- The number of discretisations in every channel (int)'''
+        return(self._n_channels * self._n_z)
+
+    @property
+    def channel_heat_transfer_coefficient(self):
+        ''' Returns the linear heat transfer coefficient between the fuel and coolant of a single channel, the heat transfer of the core being divided equally between the channels
+        self -- The problem specification the value is being returned from (ProblemSpecification)
+        [return] -- The heat transfer coefficient of a channel (W/K/m)(float)'''
+        return(self._heat_transfer_coefficient / self._n_channels)
+
+    @property
+    def heat_transfer_per_discretisation(self):
+        ''' Returns the heat transfer coefficient between the fuel and coolant of a single discretisation of a channel, which is in proportion to the height of the discretisation
+        self -- The problem specification the value is being returned from (ProblemSpecification)
+        [return] -- The heat transfer coefficient of a channel for discretisations of equal height, otherwise a row with a value per discretisation (W/K/m)(float or np.array[float])'''
+        if self._axial_boundaries is None:
+            return(self.channel_heat_transfer_coefficient)
+        return(self.channel_heat_transfer_coefficient * self.relative_cell_heights)
+
+    @property
+    def channel_thermal_conductivity_fuel(self):
+        ''' Returns the constant related to the thermal conductivity of the fuel of a single channel, the conductivity of the core being divided equally between the channels
+        self -- The problem specification the value is being returned from (ProblemSpecification)
+        [return] -- The constant related to the thermal conductivity of the fuel of a channel (m^2/s)(float)'''
+        return(self._thermal_conductivity_fuel / self._n_channels)
+
+    @property
+    def coolant_speeds(self):
+        ''' Returns the speed of the coolant in a form which broadcasts against the temperatures: a single speed for one channel or a column with one row per channel
+        self -- The problem specification the value is being returned from (ProblemSpecification)
+        [return] -- The speed of the coolant (m/s)(float or np.array[float])'''
+        return(self._speed_coolant if self._n_channels == 1 else self._channel_speeds[:, np.newaxis])
+
+    @property
+    def advection_rates(self):
+        ''' Returns the rate at which the coolant of each discretisation is replaced by the coolant below, the speed of the coolant over the height of the discretisation
+        self -- The problem specification the value is being returned from (ProblemSpecification)
+        [return] -- The rate of each discretisation, in the shape of the temperatures (1/s)(np.array[float])'''
+        return(np.broadcast_to(self.coolant_speeds / self._cell_heights, self.temperature_shape))
+
+    @property
+    def power_distribution(self):
+        ''' Returns the fraction of the power produced in each discretisation of each channel, which is the power profile for a single channel
+        self -- The problem specification the value is being returned from (ProblemSpecification)
+        [return] -- The fraction of the power in each discretisation, in the shape of the temperatures (np.array[float])'''
+        return(self._power_profile if self._n_channels == 1 else np.outer(self._channel_power_fractions, self._power_profile))
+
+    @property
+    def temperature_weights(self):
+        ''' Returns the weight of each discretisation in the mean temperatures which give the reactivity feedback. The discretisations of a channel are weighted by their height, and the channels are weighted by their power
+        self -- The problem specification the value is being returned from (ProblemSpecification)
+        [return] -- The weights, which sum to 1, in the shape of the temperatures (np.array[float])'''
+        return(np.broadcast_to(self.relative_cell_heights / self._n_z, self.temperature_shape) * (1 if self._n_channels == 1 else self._channel_power_fractions[:, np.newaxis]))
+
     @property
     def n_state_variables(self):
         ''' Returns the number of variables which are to be solved for in the state class
@@ -235,6 +566,20 @@ class ProblemSpecification:
         [return] -- The number of variables which are to be solved for in the state class (int)'''
         return(self._n_state_variables)
         
+    @property
+    def kinetics_model(self):
+        ''' Returns the model of the neutron kinetics, which sets the variables the solver integrates
+        self -- The problem specification the value is being returned from (ProblemSpecification)
+        [return] -- The kinetics model (KineticsModel)'''
+        return(self._kinetics_model)
+
+    @property
+    def n_solved_variables(self):
+        ''' Returns the number of variables the solver integrates, which is fewer than the number of state variables for the reduced kinetics models
+        self -- The problem specification the value is being returned from (ProblemSpecification)
+        [return] -- The number of variables solved for (int)'''
+        return(self._kinetics_model.n_solved_variables)
+
     @property
     def output_times(self):
         ''' Returns the output times of the system
@@ -247,4 +592,76 @@ class ProblemSpecification:
         ''' Returns the name of this simulation
         self -- The problem specification the value is being returned from (ProblemSpecification)
         [return] -- The name of the simulation (str)'''
-        return(self._simulation_name)
\ No newline at end of file
+        return(self._simulation_name)
+
+    @property
+    def solver(self):
+        ''' Returns the solver used to integrate the system
+        self -- The problem specification the value is being returned from (ProblemSpecification)
+        [return] -- The solver used to integrate the system (OdeintSolver or SolveIvpSolver)'''
+        return(self._solver)
+
+    @property
+    def initial_condition(self):
+        ''' Returns how the initial state is set up
+        self -- The problem specification the value is being returned from (ProblemSpecification)
+        [return] -- Either "cold" or "steady_state" (str)'''
+        return(self._initial_condition)
+
+    @property
+    def checkpoint_interval(self):
+        ''' Returns the simulated time between checkpoints
+        self -- The problem specification the value is being returned from (ProblemSpecification)
+        [return] -- The simulated time between checkpoints, or None for no checkpoints (s)(float)'''
+        return(self._checkpoint_interval)
+
+    @property
+    def restart_from(self):
+        ''' Returns the path of the checkpoint the simulation is continued from
+        self -- The problem specification the value is being returned from (ProblemSpecification)
+        [return] -- The path of the checkpoint, or None to start from the beginning (str)'''
+        return(self._restart_from)
+
+    def _hash(self, include_output_times):
+        '''Calculates a hash of everything which affects the results of the simulation
+        The name of the simulation and the checkpoint settings don't affect the results and are not included
+        self -- The problem specification the value is being calculated for (ProblemSpecification)
+        include_output_times -- If True the output times are included, otherwise the hash is the same however long the problem is simulated for (bool)
+        [return] -- The hexadecimal SHA-256 hash of the problem specification (str)'''
+
+        content = hashlib.sha256()
+
+        # Scalars and profiles are included by their representation and arrays by their values
+        for value in (self._n_z, self._generation_time, self._source, self._feedback_fuel, self._temperature_zero, self._feedback_coolant, self._energy_fission, self._heat_capacity_fuel, self._total_height, self._heat_transfer_coefficient, self._thermal_conductivity_fuel, self._heat_capacity_coolant, self._speed_coolant, self._reactivity_driving, self._solver, self._initial_condition, self._kinetics_model, self._n_channels):
+            content.update(repr(value).encode())
+            content.update(b";")
+        for array in (self._betas, self._lambdas, self._power_profile, self._output_times, self._channel_power_fractions, self._channel_speeds, self._channel_heat_capacities_fuel, self._channel_heat_capacities_coolant):
+            if array is self._output_times and not include_output_times:
+                continue
+            content.update(np.ascontiguousarray(array, dtype=float).tobytes())
+            content.update(b";")
+
+        # Events, adaptive output and axial boundaries are only included if they are given, so the hash of a problem without them is the same as before they could be given
+        if self._events:
+            content.update(repr(self._events).encode())
+        if self._adaptive_output is not None:
+            content.update(repr(self._adaptive_output).encode())
+        if self._axial_boundaries is not None:
+            content.update(self._axial_boundaries.tobytes())
+
+        return(content.hexdigest())
+
+    @property
+    def content_hash(self):
+        ''' Calculates a hash of everything which affects the results of the simulation, so that results and checkpoints can be matched to the problem they came from
+        The name of the simulation and the checkpoint settings don't affect the results and are not included
+        self -- The problem specification the value is being calculated for (ProblemSpecification)
+        [return] -- The hexadecimal SHA-256 hash of the problem specification (str)'''
+        return(self._hash(True))
+
+    @property
+    def equations_hash(self):
+        ''' Calculates a hash of everything which affects the results of the simulation except the output times, which is the same for problems which differ only in how long they are simulated for
+        self -- The problem specification the value is being calculated for (ProblemSpecification)
+        [return] -- The hexadecimal SHA-256 hash of the problem specification without the output times (str)'''
+        return(self._hash(False))
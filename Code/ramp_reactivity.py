@@ -1,3 +1,5 @@
+import numpy as np
+
 class RampReactivity():
     '''A representation of a reactivity which is initially static, then changes linearly, then remains static again'''
     def __init__(self, start_time, stop_time, start_reactivity, stop_reactivity):
@@ -18,12 +20,27 @@ class RampReactivity():
         self._stop_reactivity = stop_reactivity
         self._gradient = (stop_reactivity - start_reactivity) / (stop_time - start_time)
 
+    @property
+    def breakpoints(self):
+        ''' Returns the times at which the reactivity or its rate of change jumps, which the solver should step onto rather than across
+        self -- The reactivity profile the value is being returned from (RampReactivity)
+        [return] -- The start and stop times of the ramp (s)(np.array[float])'''
+        return(np.array([self._start_time, self._stop_time], dtype=float))
+
+    def __repr__(self):
+        '''Returns a string describing the reactivity profile and its parameters, used to identify the problem specification it belongs to
+        self -- The reactivity profile being described (RampReactivity)
+        [return] -- The construction of the reactivity profile (str)'''
+        return("RampReactivity({!r}, {!r}, {!r}, {!r})".format(self._start_time, self._stop_time, self._start_reactivity, self._stop_reactivity))
+
     def __call__(self, time):
         ''' Returns the reactivity at a given time 
         self -- The reactivity profile the value is being returned from (ConstantReactivity)
-        time -- 
-        [return] -- The reactivity at the specified time'''
-        if time < self._start_time:
+        time -- The time or times the reactivity is to be returned at (s)(float or np.array[float])
+        [return] -- The reactivity at the specified time or times ($)(float or np.array[float])'''
+        if np.ndim(time) > 0:
+            return(np.interp(time, [self._start_time, self._stop_time], [self._start_reactivity, self._stop_reactivity]))
+        elif time < self._start_time:
             return self._start_reactivity
         elif time > self._stop_time:
             return self._stop_reactivity
@@ -0,0 +1,124 @@
+from input_reader import read_input
+from real_time_stepper import RealTimeStepper
+from functools import partial
+import argparse
+import asyncio
+import json
+import math
+
+def read_number(request, name):
+    '''Reads a number from a field of a request
+    request -- The request ({str: value})
+    name -- The name of the field (str)
+    [return] -- The number (float)'''
+
+    # If the field is missing or isn't a finite number raise an exception
+    try:
+        value = float(request[name])
+    except (KeyError, TypeError, ValueError):
+        value = None
+    if value is None or not math.isfinite(value):
+        raise ValueError("The field '{}' must be a finite number, not {}.".format(name, json.dumps(request.get(name))))
+
+    return(value)
+
+def respond(stepper, request):
+    '''Carries out a request from a client and returns the reply
+    The requests are "step" with the simulated time "dt" to advance by (s), "set_reactivity" with the driving reactivity "value" ($), "snapshot" and "statistics"
+    A step replies with the snapshot after the step, the wall clock time it took and whether it missed its deadline
+    stepper -- The stepper of the system being simulated (RealTimeStepper)
+    request -- The request, with its name under "command" ({str: value})
+    [return] -- The reply ({str: value})'''
+
+    command = request.get("command")
+
+    if command == "step":
+        stepper.step(read_number(request, "dt"))
+        reply = stepper.snapshot()
+        statistics = stepper.statistics
+        reply["latency"] = statistics["last_latency"]
+        reply["deadline_missed"] = statistics["last_deadline_missed"]
+        return(reply)
+    elif command == "set_reactivity":
+        stepper.set_reactivity(read_number(request, "value"))
+        return({"time": stepper.time, "driving_reactivity": stepper.state.driving_reactivity})
+    elif command == "snapshot":
+        return(stepper.snapshot())
+    elif command == "statistics":
+        return(stepper.statistics)
+
+    raise ValueError("The command '{}' is not one of step, set_reactivity, snapshot or statistics.".format(command))
+
+async def handle_client(stepper, reader, writer):
+    '''Answers the requests of a client, one JSON object per line, until it disconnects
+    A request which can't be read or carried out is answered with its error under "error", and the connection is kept open
+    stepper -- The stepper of the system being simulated, which is shared by every client (RealTimeStepper)
+    reader -- The stream the requests are read from (asyncio.StreamReader)
+    writer -- The stream the replies are written to (asyncio.StreamWriter)'''
+
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+
+            # Each request is carried out in full before the next is read, so the requests of several clients are never interleaved
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("A request must be a JSON object, not {}.".format(line.decode().strip()))
+                reply = respond(stepper, request)
+            except (ValueError, KeyError, TypeError, RuntimeError) as error:
+                reply = {"error": "{}: {}".format(type(error).__name__, error)}
+
+            writer.write((json.dumps(reply) + "\n").encode())
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+async def start_server(stepper, host="127.0.0.1", port=8765):
+    '''Starts a server which steps the system on the requests of its clients
+    stepper -- The stepper of the system being simulated (RealTimeStepper)
+    host -- The address the server listens on (default "127.0.0.1")(str)
+    port -- The port the server listens on, or 0 for any free port (default 8765)(int)
+    [return] -- The server, which is already listening (asyncio.Server)'''
+
+    return(await asyncio.start_server(partial(handle_client, stepper), host, port))
+
+async def serve(stepper, host="127.0.0.1", port=8765):
+    '''Serves the clients of the system until the server is stopped
+    stepper -- The stepper of the system being simulated (RealTimeStepper)
+    host -- The address the server listens on (default "127.0.0.1")(str)
+    port -- The port the server listens on (default 8765)(int)'''
+
+    server = await start_server(stepper, host, port)
+    print("Serving on {}".format(", ".join(str(socket.getsockname()) for socket in server.sockets)))
+    async with server:
+        await server.serve_forever()
+
+def main(arguments=None):
+    '''Serves a simulation from the command line, reading the input file and options from the arguments
+    arguments -- The command line arguments, or None to use those the program was run with (default None)([str])'''
+
+    parser = argparse.ArgumentParser(description="Steps a nuclear reactor on the requests of clients, such as a training simulator, sent as JSON lines over a socket.")
+    parser.add_argument("input_file_path", help="the path to the input file")
+    parser.add_argument("--host", default="127.0.0.1", help="the address to listen on (default 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="the port to listen on (default 8765)")
+    parser.add_argument("--method", default="BDF", help="the solve_ivp method used to integrate the system (default BDF)")
+    parser.add_argument("--rtol", type=float, default=None, help="the relative tolerance of the solver (default that of solve_ivp)")
+    parser.add_argument("--atol", type=float, default=None, help="the absolute tolerance of the solver (default that of solve_ivp)")
+    parser.add_argument("--deadline", type=float, default=None, help="the wall clock time in seconds a step may take before it counts as a missed deadline (default the simulated time of the step)")
+    options = parser.parse_args(arguments)
+
+    problem_specification = read_input(options.input_file_path)
+    stepper = RealTimeStepper(problem_specification, method=options.method, rtol=options.rtol, atol=options.atol, deadline=options.deadline)
+
+    try:
+        asyncio.run(serve(stepper, options.host, options.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+from state import State
+from compiled_derivative import CompiledDerivative
+from jacobian import Jacobian
+from controlled_reactivity import ControlledReactivity
+from solve_ivp_solver import SolveIvpSolver
+from nuclear_reactor import make_initial_state
+import numpy as np
+from time import perf_counter
+
+class RealTimeStepper():
+    '''Advances the system by steps of a given length on request, for coupling to a front end such as an operator training simulator which moves the control rods and reads back the state as it goes
+    A single solve_ivp solver object is kept between steps, so its step size, history and factorised Jacobian carry on from one step to the next rather than being found again each time. It is only restarted when the reactivity is set or at a breakpoint of the reactivity profile, starting with the step size it had reached
+    The driving reactivity follows the profile of the input until it is first set, and then holds the value it was set to
+    The wall clock time of each step is measured and counted as a missed deadline if it is longer than the deadline, which by default is the simulated time of the step so that the simulation keeps up with real time'''
+    def __init__(self, problem_specification, start_state=None, method="BDF", rtol=None, atol=None, deadline=None, max_solver_steps=1000):
+        '''Constructs the stepper
+        self -- The instance of RealTimeStepper being constructed (RealTimeStepper)
+        problem_specification -- The specification of the system (ProblemSpecification)
+        start_state -- The state the simulation starts from, or None for the initial state set by the initial condition of the problem (default None)(State)
+        method -- The name of the solve_ivp method used to integrate the system (default "BDF")(str)
+        rtol -- The relative tolerance, or None to use the solve_ivp default (default None)(float)
+        atol -- The absolute tolerance, or None to use the solve_ivp default (default None)(float)
+        deadline -- The longest a step may take before it is counted as missing its deadline, or None for the simulated time of the step (s)(default None)(float)
+        max_solver_steps -- The most steps the solver may take within a single step, which bounds the time a step can take (default 1000)(int)'''
+
+        # If the method isn't one solve_ivp provides or the problem has events, which aren't watched between steps, raise an exception
+        if method not in SolveIvpSolver.methods:
+            raise ValueError("The solver '{}' is not one of {}.".format(method, ", ".join(SolveIvpSolver.methods)))
+        if problem_specification.events:
+            raise ValueError("The real time stepper doesn't check events.")
+
+        # The stepper integrates a copy of the problem whose driving reactivity can be set
+        self._reactivity = ControlledReactivity(problem_specification.reactivity_profile)
+        self._problem_specification = problem_specification.with_reactivity(self._reactivity)
+        self._kinetics_model = self._problem_specification.kinetics_model
+
+        if start_state is None:
+            start_state = make_initial_state(problem_specification)
+
+        # The solver integrates the variables of the kinetics model, with the gradient copied as solve_ivp keeps hold of it
+        derivative_function = self._kinetics_model.reduce_derivative(CompiledDerivative(self._problem_specification))
+        self._function = lambda time, solved_array: derivative_function(solved_array, time).copy()
+
+        self._method_class = SolveIvpSolver.method_classes[method]
+        self._options = {}
+        if rtol is not None:
+            self._options["rtol"] = rtol
+        if atol is not None:
+            self._options["atol"] = atol
+        if method in SolveIvpSolver.implicit_methods:
+            jacobian = self._kinetics_model.reduce_jacobian(Jacobian(self._problem_specification))
+            if method == "LSODA":
+                self._options["jac"] = lambda time, solved_array: jacobian.dense(solved_array, time)
+            else:
+                self._options["jac"] = lambda time, solved_array: jacobian(solved_array, time)
+
+        self._time = float(start_state.time)
+        self._solved_array = np.array(self._kinetics_model.reduce(start_state.as_array), dtype=float)
+        self._solver = None
+        self._step_size = None
+
+        self._deadline = deadline
+        self._max_solver_steps = max_solver_steps
+
+        # The record of the time taken by each step
+        self._n_steps = 0
+        self._n_solver_steps = 0
+        self._n_solver_starts = 0
+        self._deadline_misses = 0
+        self._total_latency = 0.0
+        self._max_latency = 0.0
+        self._last_latency = None
+        self._last_deadline_missed = None
+
+    @property
+    def problem_specification(self):
+        ''' Returns the specification of the system being stepped, whose driving reactivity is the one set by the stepper
+        self -- The stepper the value is being returned from (RealTimeStepper)
+        [return] -- The specification of the system (ProblemSpecification)'''
+        return(self._problem_specification)
+
+    @property
+    def time(self):
+        ''' Returns the time the system has been stepped to
+        self -- The stepper the value is being returned from (RealTimeStepper)
+        [return] -- The current time (s)(float)'''
+        return(self._time)
+
+    @property
+    def state(self):
+        ''' Returns the current state of the system
+        self -- The stepper the value is being returned from (RealTimeStepper)
+        [return] -- The state at the current time (State)'''
+        return(State(self._problem_specification, self._time, np.array(self._kinetics_model.expand(self._solved_array, self._time), dtype=float)))
+
+    @property
+    def statistics(self):
+        ''' Returns the number of steps taken and the wall clock time they took
+        self -- The stepper the value is being returned from (RealTimeStepper)
+        [return] -- The numbers of steps, solver steps, starts of the solver and missed deadlines and the last, mean and largest time of a step (s)({str: value})'''
+
+        return({"n_steps": self._n_steps,
+                "n_solver_steps": self._n_solver_steps,
+                "n_solver_starts": self._n_solver_starts,
+                "deadline_misses": self._deadline_misses,
+                "last_latency": self._last_latency,
+                "last_deadline_missed": self._last_deadline_missed,
+                "mean_latency": self._total_latency / self._n_steps if self._n_steps else None,
+                "max_latency": self._max_latency if self._n_steps else None})
+
+    def _start_solver(self):
+        '''Starts the solver from the current state, integrating towards the next breakpoint of the reactivity
+        self -- The stepper being used (RealTimeStepper)'''
+
+        breakpoints = self._reactivity.breakpoints
+        breakpoints = np.sort(breakpoints[breakpoints > self._time])
+        t_bound = breakpoints[0] if len(breakpoints) > 0 else np.inf
+
+        # The solver starts with the step size it had reached, unless that would pass the breakpoint
+        options = dict(self._options)
+        if self._step_size is not None:
+            options["first_step"] = min(self._step_size, t_bound - self._time)
+
+        self._solver = self._method_class(self._function, self._time, self._solved_array, t_bound, **options)
+        self._n_solver_starts += 1
+
+    def set_reactivity(self, value):
+        '''Sets the driving reactivity, which holds this value from the current time
+        self -- The stepper being used (RealTimeStepper)
+        value -- The new driving reactivity ($)(float)'''
+
+        self._reactivity.value = value
+
+        # The solver's history is of the old reactivity, so it is restarted from the current state at the next step
+        if self._solver is not None:
+            self._step_size = self._solver.step_size or self._step_size
+            self._solver = None
+
+    def step(self, dt):
+        '''Advances the system by a period of time
+        self -- The stepper being used (RealTimeStepper)
+        dt -- The simulated time to advance by (s)(float)
+        [return] -- The wall clock time the step took (s)(float)'''
+
+        # If the step isn't forwards raise an exception
+        if not dt > 0:
+            raise ValueError("The step must be positive, not {}.".format(dt))
+
+        start = perf_counter()
+        target = self._time + dt
+
+        if self._solver is None:
+            self._start_solver()
+
+        # Step the solver until it passes the target, restarting it at any breakpoints on the way
+        n_solver_steps = 0
+        while self._solver.t < target:
+            if self._solver.status == "finished":
+                self._time = self._solver.t
+                self._solved_array = self._solver.y.copy()
+                self._step_size = self._solver.step_size or self._step_size
+                self._start_solver()
+
+            # If the step is taking too many steps of the solver, or the solver fails, raise an exception
+            if n_solver_steps == self._max_solver_steps:
+                raise RuntimeError("Stepping to {}s took more than {} steps of the solver.".format(target, self._max_solver_steps))
+            self._solver.step()
+            if self._solver.status == "failed":
+                raise RuntimeError("The solver failed at {}s.".format(self._solver.t))
+            n_solver_steps += 1
+
+        # The solver usually steps past the target, so the state at the target is interpolated from its last step
+        if self._solver.t > target:
+            self._solved_array = self._solver.dense_output()(target)
+        else:
+            self._solved_array = self._solver.y.copy()
+        self._time = target
+
+        latency = perf_counter() - start
+        deadline = dt if self._deadline is None else self._deadline
+
+        self._n_steps += 1
+        self._n_solver_steps += n_solver_steps
+        self._total_latency += latency
+        self._max_latency = max(self._max_latency, latency)
+        self._last_latency = latency
+        self._last_deadline_missed = latency > deadline
+        if self._last_deadline_missed:
+            self._deadline_misses += 1
+
+        return(latency)
+
+    def snapshot(self):
+        '''Returns the values a front end displays, as plain numbers and lists which can be written as JSON
+        self -- The stepper being used (RealTimeStepper)
+        [return] -- The time, power, reactivities and temperatures of the current state ({str: value})'''
+
+        state = self.state
+
+        return({"time": self._time,
+                "power": float(state.power),
+                "n_neutron": float(state.n_neutron),
+                "driving_reactivity": float(state.driving_reactivity),
+                "reactivity": float(state.driving_reactivity + state.fuel_reactivity + state.coolant_reactivity),
+                "t_fuel_mean": float(state.t_fuel_mean),
+                "t_coolant_mean": float(state.t_coolant_mean),
+                "max_t_fuel": float(np.max(state.t_fuel)),
+                "max_t_coolant": float(np.max(state.t_coolant)),
+                "t_fuel": np.asarray(state.t_fuel).tolist(),
+                "t_coolant": np.asarray(state.t_coolant).tolist()})
@@ -0,0 +1,42 @@
+class ReducedJacobian():
+    '''The Jacobian of the variables solved for by a reduced kinetics model, found from the Jacobian of the full system by the chain rule
+    It has the same interface as Jacobian, so it can be passed to the solvers in its place'''
+    def __init__(self, jacobian, kinetics_model):
+        '''Constructs the reduced Jacobian
+        self -- The instance of ReducedJacobian being constructed (ReducedJacobian)
+        jacobian -- The Jacobian of the full system (Jacobian)
+        kinetics_model -- The model converting between full states and the variables solved for (KineticsModel)'''
+
+        self._jacobian = jacobian
+        self._kinetics_model = kinetics_model
+
+        # Every entry which may be non-zero, found from the patterns of the full Jacobian and of the conversions
+        sparsity = abs(kinetics_model.reduction_matrix).dot(abs(jacobian.sparsity)).dot(kinetics_model.expansion_pattern).tocsc()
+        sparsity.data[:] = 1
+        self._sparsity = sparsity
+
+    @property
+    def sparsity(self):
+        ''' Returns the sparsity pattern of the reduced Jacobian
+        self -- The Jacobian the value is being returned from (ReducedJacobian)
+        [return] -- The sparsity pattern, with a 1 for each entry which may be non-zero (scipy.sparse.csc_matrix)'''
+        return(self._sparsity)
+
+    def __call__(self, solved_array, time):
+        '''Calculates the Jacobian as a sparse matrix
+        self -- The Jacobian being evaluated (ReducedJacobian)
+        solved_array -- The variables solved for (np.array[float])
+        time -- The current time of the state (s)(float)
+        [return] -- The Jacobian (scipy.sparse.csc_matrix)'''
+
+        model = self._kinetics_model
+        full_jacobian = self._jacobian(model.expand(solved_array, time), time)
+        return(model.reduction_matrix.dot(full_jacobian).dot(model.expansion_matrix(solved_array, time)).tocsc())
+
+    def dense(self, solved_array, time):
+        '''Calculates the Jacobian as a dense array
+        self -- The Jacobian being evaluated (ReducedJacobian)
+        solved_array -- The variables solved for (np.array[float])
+        time -- The current time of the state (s)(float)
+        [return] -- The Jacobian (np.array[float])'''
+        return(self(solved_array, time).toarray())
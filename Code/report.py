@@ -0,0 +1,201 @@
+from concurrent.futures import ProcessPoolExecutor
+from input_reader import read_input
+from trajectory import load_trajectory
+import numpy as np
+import argparse
+import os
+
+# The size and resolution of each figure, which set the number of points worth plotting across it
+figure_size = (6.4, 4.8)
+dpi = 100
+
+# The number of figures from which they are rendered in parallel unless the number of workers is given, as below it starting the worker processes, each of which imports matplotlib, takes longer than it saves
+parallel_figures = 8
+
+def downsample_min_max(times, values, n_bins):
+    '''Reduces a series to the smallest and largest value in each of a number of equal bins of its points, in time order
+    With one bin per pixel this draws the same line as the full series, since every point within a pixel lies between its smallest and largest value
+    times -- The times of the series (s)(np.array[float])
+    values -- The values of the series (np.array[float])
+    n_bins -- The number of bins (int)
+    [return] -- The times and values of the reduced series, with at most two points per bin (np.array[float], np.array[float])'''
+
+    n_points = len(times)
+    if n_points <= 2 * n_bins:
+        return(np.asarray(times), np.asarray(values))
+
+    # Bins are equal numbers of points, so the trailing points which don't fill a bin are given their own bin
+    bin_size = n_points // n_bins
+    n_full = bin_size * n_bins
+    binned = np.asarray(values[:n_full]).reshape(n_bins, bin_size)
+    i_min = np.argmin(binned, axis=1) + np.arange(n_bins) * bin_size
+    i_max = np.argmax(binned, axis=1) + np.arange(n_bins) * bin_size
+    indices = np.sort(np.concatenate([i_min, i_max]))
+
+    if n_full < n_points:
+        tail = np.asarray(values[n_full:])
+        indices = np.concatenate([indices, [n_full + np.argmin(tail), n_full + np.argmax(tail)]])
+        indices = np.sort(indices)
+
+    # The first and last points are kept so the plot spans the whole time
+    indices = np.unique(np.concatenate([[0], indices, [n_points - 1]]))
+
+    return(np.asarray(times[indices]), np.asarray(values[indices]))
+
+def downsample_lttb(times, values, n_out):
+    '''Reduces a series using the largest triangle three buckets method, which keeps the points which most change the shape of the line
+    The points other than the first and last are split into equal buckets and the point kept from each bucket is the one making the largest triangle with the point kept from the previous bucket and the mean of the next bucket
+    times -- The times of the series (s)(np.array[float])
+    values -- The values of the series (np.array[float])
+    n_out -- The number of points in the reduced series, at least 3 (int)
+    [return] -- The times and values of the reduced series (np.array[float], np.array[float])'''
+
+    n_points = len(times)
+    if n_points <= n_out:
+        return(np.asarray(times), np.asarray(values))
+
+    times = np.asarray(times)
+    values = np.asarray(values)
+    edges = np.linspace(1, n_points - 1, n_out - 1).astype(int)
+
+    indices = np.zeros(n_out, dtype=int)
+    indices[-1] = n_points - 1
+    for i_bucket in range(n_out - 2):
+        start, end = edges[i_bucket], edges[i_bucket + 1]
+
+        # The mean of the next bucket, which for the last bucket is the last point
+        if i_bucket < n_out - 3:
+            next_time = np.mean(times[end:edges[i_bucket + 2]])
+            next_value = np.mean(values[end:edges[i_bucket + 2]])
+        else:
+            next_time = times[-1]
+            next_value = values[-1]
+
+        previous_time = times[indices[i_bucket]]
+        previous_value = values[indices[i_bucket]]
+        areas = np.abs((previous_time - next_time) * (values[start:end] - previous_value) - (previous_time - times[start:end]) * (next_value - previous_value))
+        indices[i_bucket + 1] = start + np.argmax(areas)
+
+    return(times[indices], values[indices])
+
+def sample_columns(times, n_columns):
+    '''Chooses the indices of the times nearest to a number of evenly spaced times, so that a heatmap reads only as many states as it has columns of pixels
+    times -- The times of the states (s)(np.array[float])
+    n_columns -- The number of columns of the heatmap (int)
+    [return] -- The indices of the chosen states (np.array[int])'''
+
+    if len(times) <= n_columns:
+        return(np.arange(len(times)))
+
+    return(np.unique(np.linspace(0, len(times) - 1, n_columns).round().astype(int)))
+
+def _render_figure(figure):
+    '''Renders a single figure to its file. This may be run in a worker process, so matplotlib is imported here
+    figure -- The description of the figure, with its "kind" ("line" or "heatmap"), the data to plot, the axis labels and the path of the file ({str: value})'''
+
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=figure_size, dpi=dpi)
+
+    if figure["kind"] == "line":
+        ax.plot(figure["x"], figure["y"])
+    else:
+        # The heatmap has time along the x axis and height up the y axis
+        mesh = ax.pcolormesh(figure["x"], figure["y"], figure["values"].T, shading="nearest")
+        fig.colorbar(mesh, ax=ax, label=figure["colour_label"])
+
+    ax.set_xlabel(figure["x_label"])
+    ax.set_ylabel(figure["y_label"])
+    fig.savefig(figure["path"])
+    plt.close(fig)
+
+def make_figures(trajectory, output_directory, file_format="png", downsampling="min_max"):
+    '''Describes the figures of the report, with their data already reduced to what can be seen at the resolution of the figures
+    Only the reduced data is passed to the processes rendering the figures, so the cost of rendering doesn't grow with the number of output times
+    trajectory -- The states at the output times, which may be a memory map of a stored trajectory (Trajectory)
+    output_directory -- The directory the figures are saved to (str)
+    file_format -- The file format of the figures, such as "png", "pdf" or "svg" (default "png")(str)
+    downsampling -- The method used to reduce the line plots, either "min_max" or "lttb" (default "min_max")(str)
+    [return] -- The descriptions of the figures ([{str: value}])'''
+
+    n_pixels = int(figure_size[0] * dpi)
+    times = np.asarray(trajectory.times)
+    problem_specification = trajectory.problem_specification
+
+    figures = []
+
+    # Line plots of the power and mean temperatures
+    lines = [("power", trajectory.power, "Power(W)"),
+             ("temperature_fuel", trajectory.t_fuel_mean, "Mean Fuel Temperature (K)"),
+             ("temperature_coolant", trajectory.t_coolant_mean, "Mean Coolant Temperature (K)")]
+    for name, values, label in lines:
+        if downsampling == "lttb":
+            x, y = downsample_lttb(times, values, 2 * n_pixels)
+        else:
+            x, y = downsample_min_max(times, values, n_pixels)
+        figures.append({"kind": "line", "x": x, "y": y, "x_label": "Time(s)", "y_label": label, "path": os.path.join(output_directory, name + "." + file_format)})
+
+    # Heatmaps of the temperatures against time and height, reading only the states shown
+    # The states kept by adaptive output are unevenly spaced, so the columns are interpolated at evenly spaced times instead
+    if problem_specification.adaptive_output is not None:
+        column_times = np.linspace(times[0], times[-1], n_pixels)
+        shown = trajectory.interpolate(column_times)
+        columns = slice(None)
+    else:
+        columns = sample_columns(times, n_pixels)
+        column_times = times[columns]
+        shown = trajectory
+    heatmaps = [("temperature_fuel_map", shown.t_fuel, "Fuel Temperature (K)"),
+                ("temperature_coolant_map", shown.t_coolant, "Coolant Temperature (K)")]
+    for name, temperatures, label in heatmaps:
+        values = np.asarray(temperatures[columns])
+        # The temperatures of a core with several channels are shown as the mean of the channels weighted by their power
+        if problem_specification.n_channels > 1:
+            values = np.einsum("tcz,c->tz", values, problem_specification.channel_power_fractions)
+        figures.append({"kind": "heatmap", "x": column_times, "y": problem_specification.heights, "values": values, "x_label": "Time(s)", "y_label": "Height (m)", "colour_label": label, "path": os.path.join(output_directory, name + "." + file_format)})
+
+    return(figures)
+
+def make_report(trajectory, output_directory, file_format="png", downsampling="min_max", max_workers=None):
+    '''Plots the power and mean temperatures against time and heatmaps of the temperatures against time and height, rendering the figures in parallel worker processes if there are many of them or workers are asked for
+    trajectory -- The states at the output times, which may be a memory map of a stored trajectory (Trajectory)
+    output_directory -- The directory the figures are saved to, which is made if it doesn't exist (str)
+    file_format -- The file format of the figures, such as "png", "pdf" or "svg" (default "png")(str)
+    downsampling -- The method used to reduce the line plots, either "min_max" or "lttb" (default "min_max")(str)
+    max_workers -- The number of worker processes, 1 to render the figures in this process or None to render them in this process if there are fewer than parallel_figures and otherwise use one per figure up to one per processor (default None)(int)
+    [return] -- The paths of the figures ([str])'''
+
+    if not os.path.exists(output_directory):
+        os.makedirs(output_directory)
+
+    figures = make_figures(trajectory, output_directory, file_format, downsampling)
+
+    if max_workers is None and len(figures) < parallel_figures:
+        max_workers = 1
+    elif max_workers is None:
+        max_workers = min(len(figures), os.cpu_count())
+
+    if max_workers == 1:
+        for figure in figures:
+            _render_figure(figure)
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(_render_figure, figures))
+
+    return([figure["path"] for figure in figures])
+
+if __name__ == "__main__":
+    # Make the report of a stored trajectory from the input it was calculated for
+    parser = argparse.ArgumentParser(description="Plots the report of a stored trajectory.")
+    parser.add_argument("input_file_path", help="the path to the input file the trajectory was calculated for")
+    parser.add_argument("trajectory_file_path", help="the path to the .npy file of the trajectory")
+    parser.add_argument("--format", default="png", choices=["png", "pdf", "svg"], help="the file format of the figures (default png)")
+    parser.add_argument("--downsampling", default="min_max", choices=["min_max", "lttb"], help="the method used to reduce the line plots (default min_max)")
+    parser.add_argument("--workers", type=int, default=None, help="the number of worker processes rendering the figures (default none unless there are many figures)")
+    options = parser.parse_args()
+
+    problem_specification = read_input(options.input_file_path)
+    trajectory = load_trajectory(options.trajectory_file_path, problem_specification)
+    make_report(trajectory, os.path.join("outputs", problem_specification.simulation_name), options.format, options.downsampling, options.workers)
@@ -0,0 +1,185 @@
+import hashlib
+import json
+import os
+import numpy as np
+
+class ResultCache():
+    '''A directory of the results of simulations which have already been run, keyed by the content of the problem specification and the state it started from
+    Each entry holds the output times, the full state arrays at them and the solver statistics of a run, which are stored as JSON so that entries are loaded without unpickling anything from a directory other processes write to
+    The output times aren't part of the key, so a run of a problem which has only been extended in time finds the run it starts the same as and continues from its last shared output time
+    The directory is kept within a size by removing the entries which were used longest ago, and entries are written to a temporary file which then replaces any existing entry, so several processes may share a cache'''
+
+    # Changing the format of the cache needs a new version so that old entries are not used
+    format_version = 2
+
+    # The size the cache is kept within if no other is given
+    default_max_bytes = 2 ** 30
+
+    def __init__(self, directory, max_bytes=None):
+        '''Constructs the cache
+        self -- The instance of ResultCache being constructed (ResultCache)
+        directory -- The directory the cached results are stored in, which is made when the first is stored (str)
+        max_bytes -- The largest total size of the cached results, or None for the default size (default None)(int)'''
+
+        self._directory = directory
+        self._max_bytes = self.default_max_bytes if max_bytes is None else max_bytes
+
+    @property
+    def directory(self):
+        ''' Returns the directory the cached results are stored in
+        self -- The cache the value is being returned from (ResultCache)
+        [return] -- The directory of the cache (str)'''
+        return(self._directory)
+
+    @property
+    def max_bytes(self):
+        ''' Returns the largest total size of the cached results
+        self -- The cache the value is being returned from (ResultCache)
+        [return] -- The largest total size of the cached results (bytes)(int)'''
+        return(self._max_bytes)
+
+    def key(self, problem_specification, start_array, compiled=True, jacobian=True):
+        '''Calculates the key of the results of a problem, which is the same however long the problem is simulated for
+        self -- The cache being used (ResultCache)
+        problem_specification -- The specification of the problem (ProblemSpecification)
+        start_array -- The full state array the simulation starts from (np.array[float])
+        compiled -- Whether the rate of change is calculated by a CompiledDerivative (default True)(bool)
+        jacobian -- Whether the analytic Jacobian is supplied to the solver (default True)(bool)
+        [return] -- The key of the results (str)'''
+
+        content_hash = hashlib.sha256()
+        content_hash.update(repr(self.format_version).encode())
+        content_hash.update(problem_specification.equations_hash.encode())
+        content_hash.update(np.ascontiguousarray(start_array, dtype=float).tobytes())
+        content_hash.update(repr((bool(compiled), bool(jacobian))).encode())
+
+        return(content_hash.hexdigest())
+
+    def _file_path(self, key, times):
+        '''Returns the path of the file the results at a series of output times are cached in
+        self -- The cache being used (ResultCache)
+        key -- The key of the results (str)
+        times -- The output times of the results (s)(np.array[float])
+        [return] -- The path of the file (str)'''
+        return(os.path.join(self._directory, "{}_{}.npz".format(key, hashlib.sha256(np.ascontiguousarray(times, dtype=float).tobytes()).hexdigest()[:16])))
+
+    def _entry_paths(self):
+        '''Returns the paths of every entry in the cache
+        self -- The cache being used (ResultCache)
+        [return] -- The paths of the entries ([str])'''
+
+        try:
+            names = os.listdir(self._directory)
+        except OSError:
+            return([])
+
+        return([os.path.join(self._directory, name) for name in names if name.endswith(".npz")])
+
+    def load(self, key, times):
+        '''Loads the cached results which share the longest run of output times with those requested, from the first
+        self -- The cache being used (ResultCache)
+        key -- The key of the results (str)
+        times -- The output times requested (s)(np.array[float])
+        [return] -- The number of output times shared, the full state arrays at them, one per row, and the solver statistics of the cached run, or None if no cached run shares more than the first output time (int, np.array[float], dict)'''
+
+        # The results at exactly the requested times are checked first, as they are the most common match
+        exact_path = self._file_path(key, times)
+        candidate_paths = [exact_path] + sorted(path for path in self._entry_paths() if os.path.basename(path).startswith(key + "_") and path != exact_path)
+
+        best = None
+        for path in candidate_paths:
+            # A missing, unreadable or partly removed entry is treated as not being in the cache
+            try:
+                with np.load(path, allow_pickle=False) as entry:
+                    cached_times = entry["times"]
+                    n_compared = min(len(cached_times), len(times))
+                    mismatches = np.flatnonzero(cached_times[:n_compared] != times[:n_compared])
+                    n_shared = mismatches[0] if len(mismatches) > 0 else n_compared
+                    if n_shared > 1 and (best is None or n_shared > best[0]):
+                        best = (n_shared, entry["arrays"][:n_shared], self._load_statistics(entry["statistics"]))
+                        used_path = path
+            except (OSError, EOFError, ValueError, KeyError):
+                continue
+
+            if best is not None and best[0] == len(times):
+                break
+
+        if best is None:
+            return(None)
+
+        # Using an entry makes it the last to be removed
+        try:
+            os.utime(used_path)
+        except OSError:
+            pass
+
+        return(best)
+
+    def save(self, key, times, arrays, statistics):
+        '''Stores the results of a run in the cache and removes the entries used longest ago until the cache is within its size
+        self -- The cache being used (ResultCache)
+        key -- The key of the results (str)
+        times -- The output times of the run (s)(np.array[float])
+        arrays -- The full state arrays at the output times, one per row (np.array[float])
+        statistics -- The solver statistics of the run (dict)'''
+
+        os.makedirs(self._directory, exist_ok=True)
+
+        # Each process writes to its own temporary file, so processes storing the same results don't interfere
+        file_path = self._file_path(key, times)
+        temporary_path = "{}.{}.tmp".format(file_path, os.getpid())
+        with open(temporary_path, "wb") as f:
+            np.savez(f, times=times, arrays=arrays, statistics=self._save_statistics(statistics))
+        os.replace(temporary_path, file_path)
+
+        self._evict(file_path)
+
+    def _save_statistics(self, statistics):
+        '''Converts the solver statistics to JSON, with their arrays, such as the times of the steps, written as lists
+        self -- The cache being used (ResultCache)
+        statistics -- The solver statistics of a run (dict)
+        [return] -- The statistics as JSON, in an array which can be stored without pickling (np.array[str])'''
+
+        def convert(value):
+            if isinstance(value, np.ndarray):
+                return(value.tolist())
+            if isinstance(value, np.generic):
+                return(value.item())
+            raise TypeError("The solver statistic {!r} can't be stored in the cache.".format(value))
+
+        return(np.array(json.dumps(statistics, default=convert)))
+
+    def _load_statistics(self, stored):
+        '''Converts the solver statistics stored as JSON back to a dictionary, with the lists made into arrays again
+        self -- The cache being used (ResultCache)
+        stored -- The statistics as JSON (np.array[str])
+        [return] -- The solver statistics (dict)'''
+
+        statistics = json.loads(str(stored))
+        return({name: np.array(value) if isinstance(value, list) else value for name, value in statistics.items()})
+
+    def _evict(self, kept_path):
+        '''Removes the entries which were used longest ago until the cache is within its size
+        self -- The cache being used (ResultCache)
+        kept_path -- The path of an entry which is not removed, as it has just been stored (str)'''
+
+        # Entries another process removes in the meantime are skipped
+        entries = []
+        for path in self._entry_paths():
+            try:
+                status = os.stat(path)
+            except OSError:
+                continue
+            entries.append((status.st_mtime, status.st_size, path))
+
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_bytes <= self._max_bytes:
+                break
+            if path == kept_path:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total_bytes -= size
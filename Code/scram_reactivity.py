@@ -0,0 +1,50 @@
+import numpy as np
+
+class ScramReactivity():
+    '''A representation of a reactivity which follows another profile until a scram, from when the control rods are inserted, reducing it linearly over the insertion time'''
+    def __init__(self, reactivity, start_time, depth, insertion_time):
+        '''Constructs a scram reactivity profile
+        self -- The instance of the scram reactivity being constructed (ScramReactivity)
+        reactivity -- The driving reactivity before the scram, which the insertion is subtracted from ($ as a function of time in s)(ReactivityFunction)
+        start_time -- The time the control rods start to be inserted (s)(float)
+        depth -- The reactivity of the control rods once fully inserted ($)(float)
+        insertion_time -- The time taken to insert the control rods, which may be 0 for an instant insertion (s)(float)'''
+
+        # If the depth or insertion time are negative raise an exception
+        if depth < 0 or insertion_time < 0:
+            raise ValueError("The depth ({}) and insertion time ({}) of a scram must not be negative.".format(depth, insertion_time))
+
+        self._reactivity = reactivity
+        self._start_time = start_time
+        self._depth = depth
+        self._insertion_time = insertion_time
+
+    @property
+    def breakpoints(self):
+        ''' Returns the times at which the reactivity or its rate of change jumps, which the solver should step onto rather than across
+        self -- The reactivity profile the value is being returned from (ScramReactivity)
+        [return] -- The breakpoints of the reactivity before the scram and the start and end of the insertion (s)(np.array[float])'''
+        return(np.union1d(self._reactivity.breakpoints, [self._start_time, self._start_time + self._insertion_time]))
+
+    def __repr__(self):
+        '''Returns a string describing the reactivity profile and its parameters, used to identify the problem specification it belongs to
+        self -- The reactivity profile being described (ScramReactivity)
+        [return] -- The construction of the reactivity profile (str)'''
+        return("ScramReactivity({!r}, {!r}, {!r}, {!r})".format(self._reactivity, self._start_time, self._depth, self._insertion_time))
+
+    def __call__(self, time):
+        ''' Returns the reactivity at a given time
+        self -- The reactivity profile the value is being returned from (ScramReactivity)
+        time -- The time or times the reactivity is to be returned at (s)(float or np.array[float])
+        [return] -- The reactivity at the specified time or times ($)(float or np.array[float])'''
+
+        # The fraction of the control rods inserted, which jumps from 0 to 1 at the start time for an instant insertion
+        if self._insertion_time > 0:
+            inserted = np.clip((np.asarray(time, dtype=float) - self._start_time) / self._insertion_time, 0, 1)
+        else:
+            inserted = (np.asarray(time, dtype=float) >= self._start_time).astype(float)
+
+        reactivity = self._reactivity(time) - self._depth * inserted
+        if np.ndim(time) == 0:
+            return(float(reactivity))
+        return(reactivity)
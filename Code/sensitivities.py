@@ -0,0 +1,117 @@
+import numpy as np
+
+class Sensitivities:
+    '''The derivatives of the states of a trajectory with respect to some of the parameters of the input, calculated alongside the trajectory by calculate_sensitivities
+    The sensitivities are stored as a single array with one row per time and parameter in the order of StateVariables.as_array, and the state variables and derived values are returned with the parameters as their second dimension
+    The sensitivities of the peak values are those of the value at the time and discretisation the peak is found at, which is the derivative of the peak as long as it doesn't move onto a different output time or discretisation'''
+    def __init__(self, trajectory, parameters, arrays):
+        '''Constructs the sensitivities
+        self -- The instance of Sensitivities being constructed (Sensitivities)
+        trajectory -- The states the sensitivities are of (Trajectory)
+        parameters -- The identifiers of the parameters ([String])
+        arrays -- The derivatives of the state arrays, one row per time and parameter (np.array[float])'''
+
+        problem_specification = trajectory.problem_specification
+
+        # If the arrays don't match the trajectory and parameters raise an exception
+        if arrays.shape != (len(trajectory), len(parameters), problem_specification.n_state_variables):
+            raise ValueError("The arrays have shape {} but {} times of {} parameters of {} state variables were expected.".format(arrays.shape, len(trajectory), len(parameters), problem_specification.n_state_variables))
+
+        self._trajectory = trajectory
+        self._parameters = list(parameters)
+        self._arrays = arrays
+
+        n_delayed = problem_specification.n_delayed
+        n_temperatures = problem_specification.n_temperatures
+        self._fuel = slice(n_delayed + 1, n_delayed + n_temperatures + 1)
+        self._coolant = slice(n_delayed + n_temperatures + 1, n_delayed + 2 * n_temperatures + 1)
+        self._temperature_shape = (len(trajectory), len(parameters)) + problem_specification.temperature_shape
+
+    @property
+    def trajectory(self):
+        ''' Returns the states the sensitivities are of
+        self -- The sensitivities the value is being returned from (Sensitivities)
+        [return] -- The states at the output times (Trajectory)'''
+        return(self._trajectory)
+
+    @property
+    def parameters(self):
+        ''' Returns the identifiers of the parameters
+        self -- The sensitivities the value is being returned from (Sensitivities)
+        [return] -- The identifiers of the parameters, in the order of the second dimension of the sensitivities ([String])'''
+        return(self._parameters)
+
+    @property
+    def arrays(self):
+        ''' Returns the derivatives of the state arrays
+        self -- The sensitivities the value is being returned from (Sensitivities)
+        [return] -- The derivatives of the state arrays, one row per time and parameter (np.array[float])'''
+        return(self._arrays)
+
+    @property
+    def n_neutron(self):
+        ''' Returns the derivative of the number of neutrons at each time
+        self -- The sensitivities the value is being returned from (Sensitivities)
+        [return] -- A view of the derivatives, one row per time and one column per parameter (np.array[float])'''
+        return(self._arrays[:, :, 0])
+
+    @property
+    def t_fuel(self):
+        ''' Returns the derivative of the fuel temperature of each discretisation at each time
+        self -- The sensitivities the value is being returned from (Sensitivities)
+        [return] -- A view of the derivatives, one row per time and parameter, which for several channels has one row per channel (K)(np.array[float])'''
+        return(self._arrays[:, :, self._fuel].reshape(self._temperature_shape))
+
+    @property
+    def t_coolant(self):
+        ''' Returns the derivative of the coolant temperature of each discretisation at each time
+        self -- The sensitivities the value is being returned from (Sensitivities)
+        [return] -- A view of the derivatives, one row per time and parameter, which for several channels has one row per channel (K)(np.array[float])'''
+        return(self._arrays[:, :, self._coolant].reshape(self._temperature_shape))
+
+    @property
+    def t_fuel_mean(self):
+        ''' Calculates the derivative of the mean fuel temperature at each time
+        self -- The sensitivities the value is being calculated for (Sensitivities)
+        [return] -- The derivatives, one row per time and one column per parameter (K)(np.array[float])'''
+        return(self._trajectory.problem_specification.mean_temperature(self.t_fuel))
+
+    @property
+    def t_coolant_mean(self):
+        ''' Calculates the derivative of the mean coolant temperature at each time
+        self -- The sensitivities the value is being calculated for (Sensitivities)
+        [return] -- The derivatives, one row per time and one column per parameter (K)(np.array[float])'''
+        return(self._trajectory.problem_specification.mean_temperature(self.t_coolant))
+
+    @property
+    def power(self):
+        ''' Calculates the derivative of the power at each time, including the change in the energy released per neutron for the energy per fission and generation time
+        self -- The sensitivities the value is being calculated for (Sensitivities)
+        [return] -- The derivatives, one row per time and one column per parameter (W)(np.array[float])'''
+
+        problem_specification = self._trajectory.problem_specification
+        power = self.n_neutron * problem_specification.energy_fission / problem_specification.generation_time
+
+        for i_parameter, parameter in enumerate(self._parameters):
+            if parameter == "energy_fission":
+                power[:, i_parameter] += self._trajectory.power / problem_specification.energy_fission
+            elif parameter == "generation_time":
+                power[:, i_parameter] -= self._trajectory.power / problem_specification.generation_time
+
+        return(power)
+
+    @property
+    def peak_power(self):
+        ''' Calculates the derivative of the highest power of the trajectory
+        self -- The sensitivities the value is being calculated for (Sensitivities)
+        [return] -- The derivatives, one per parameter (W)(np.array[float])'''
+        return(self.power[np.argmax(self._trajectory.power)])
+
+    @property
+    def peak_t_fuel(self):
+        ''' Calculates the derivative of the highest fuel temperature of the trajectory, over every time and discretisation
+        self -- The sensitivities the value is being calculated for (Sensitivities)
+        [return] -- The derivatives, one per parameter (K)(np.array[float])'''
+
+        i_time, i_temperature = np.unravel_index(np.argmax(self._trajectory.arrays[:, self._fuel]), (len(self._trajectory), self._fuel.stop - self._fuel.start))
+        return(self._arrays[i_time, :, self._fuel.start + i_temperature])
@@ -0,0 +1,61 @@
+from compiled_derivative import CompiledDerivative
+from jacobian import Jacobian
+from parameter_derivative import ParameterDerivative
+import numpy as np
+
+class SensitivityDerivative():
+    '''Calculates the rate of change of the state together with its sensitivities to some parameters, the forward sensitivity equations
+    The sensitivities are the derivatives of the state variables with respect to each parameter, stored after the state, one parameter after another, so the system is integrated as a single array of length (n_parameters + 1) * n_state_variables
+    The rate of change of the sensitivities to a parameter is the Jacobian of the state equations times the sensitivities plus the derivative of the state equations with respect to the parameter
+    The returned array is reused by every call, so callers which need to keep the result must copy it'''
+    def __init__(self, problem_specification, parameters):
+        '''Constructs the equations of the state and of the derivatives with respect to the parameters
+        self -- The instance of SensitivityDerivative being constructed (SensitivityDerivative)
+        problem_specification -- The specification of the current physical system (ProblemSpecification)
+        parameters -- The identifiers of the parameters, as accepted by ParameterDerivative ([String])'''
+
+        self._n_state_variables = problem_specification.n_state_variables
+        self._n_parameters = len(parameters)
+        self._derivative = CompiledDerivative(problem_specification)
+        self._jacobian = Jacobian(problem_specification)
+        self._parameter_derivative = ParameterDerivative(problem_specification, parameters)
+
+        # The array the gradient is written into, with a view of the gradients of the sensitivities with one row per parameter
+        self._gradient = np.zeros((self._n_parameters + 1) * self._n_state_variables)
+        self._gradient_sensitivities = self._gradient[self._n_state_variables:].reshape(self._n_parameters, self._n_state_variables)
+
+    @property
+    def jacobian(self):
+        ''' Returns the analytic Jacobian of the state equations, which is also the Jacobian of the sensitivity equations with respect to the sensitivities
+        self -- The derivative the value is being returned from (SensitivityDerivative)
+        [return] -- The Jacobian of the state equations (Jacobian)'''
+        return(self._jacobian)
+
+    @property
+    def parameters(self):
+        ''' Returns the identifiers of the parameters
+        self -- The derivative the value is being returned from (SensitivityDerivative)
+        [return] -- The identifiers of the parameters, in the order their sensitivities are stored ([String])'''
+        return(self._parameter_derivative.parameters)
+
+    @property
+    def parameter_derivative(self):
+        ''' Returns the derivative of the state equations with respect to the parameters
+        self -- The derivative the value is being returned from (SensitivityDerivative)
+        [return] -- The derivative of the state equations with respect to the parameters (ParameterDerivative)'''
+        return(self._parameter_derivative)
+
+    def __call__(self, augmented_array, time):
+        '''Calculates the rate of change of the state and its sensitivities
+        self -- The instance of SensitivityDerivative being called (SensitivityDerivative)
+        augmented_array -- The state followed by its sensitivities to each parameter in turn (np.array[float])
+        time -- The current time of the state (s)(float)
+        [return] -- The rate of change of the state followed by those of its sensitivities (np.array[float])'''
+
+        state_array = augmented_array[:self._n_state_variables]
+        sensitivities = augmented_array[self._n_state_variables:].reshape(self._n_parameters, self._n_state_variables)
+
+        self._gradient[:self._n_state_variables] = self._derivative(state_array, time)
+        self._gradient_sensitivities[:] = (self._jacobian(state_array, time).dot(sensitivities.T) + self._parameter_derivative(state_array, time)).T
+
+        return(self._gradient)
@@ -0,0 +1,71 @@
+from trajectory import Trajectory
+from sensitivities import Sensitivities
+from sensitivity_derivative import SensitivityDerivative
+from sensitivity_jacobian import SensitivityJacobian
+from multirate_solver import MultirateSolver
+from scipy.sparse.linalg import spsolve
+import numpy as np
+
+def calculate_start_sensitivities(start_state, problem_specification, sensitivity_derivative):
+    '''Calculates the derivatives of the state at the start with respect to the parameters
+    A cold start has no neutrons with everything at the reference temperature whatever the parameters, so its sensitivities are zero
+    A steady state stays steady as the parameters change, so differentiating the equations, which are zero, gives the Jacobian times the sensitivities plus the derivatives of the equations with respect to the parameters, which is also zero
+    start_state -- The state at the start of the period being simulated (State)
+    problem_specification -- The specification of the current physical system (ProblemSpecification)
+    sensitivity_derivative -- The equations of the state and sensitivities (SensitivityDerivative)
+    [return] -- The derivatives of the start state, one row per parameter (np.array[float])'''
+
+    n_parameters = len(sensitivity_derivative.parameters)
+
+    if problem_specification.initial_condition != "steady_state":
+        return(np.zeros((n_parameters, problem_specification.n_state_variables)))
+
+    start_array = start_state.as_array
+    time = start_state.time
+    parameter_derivative = sensitivity_derivative.parameter_derivative(start_array, time)
+
+    # spsolve returns a single column as a flat array, so the columns are solved together and reshaped
+    start_sensitivities = spsolve(sensitivity_derivative.jacobian(start_array, time), -parameter_derivative)
+    return(np.asarray(start_sensitivities).reshape(problem_specification.n_state_variables, n_parameters).T)
+
+def calculate_sensitivities(start_state, problem_specification, parameters, jacobian=True):
+    '''Calculates the states at the output times and their derivatives with respect to some of the parameters of the input, by integrating the forward sensitivity equations alongside the state
+    This gives the sensitivities to every parameter from a single integration, where finite differences need two more runs for each parameter and are only as accurate as the tolerance of those runs allows
+    The state and sensitivities are integrated as a single system by the solver of the problem, whose error control covers both. The sensitivity equations are those of the full kinetics and the solver must integrate the equations as given, so the multirate and characteristics solvers aren't accepted
+    start_state -- The state at the start of the period being simulated, either cold or the steady state as set by the initial condition of the problem (State)
+    problem_specification -- The specification of the current physical system (ProblemSpecification)
+    parameters -- The identifiers of the parameters, as accepted by ParameterDerivative ([String])
+    jacobian -- If True the analytic Jacobian is supplied to the solver, otherwise the solver estimates it by finite differences (default True)(bool)
+    [return] -- The derivatives of the states at the output times with respect to the parameters, which hold the states (Sensitivities)'''
+
+    # The sensitivity equations are those of the full kinetics integrated directly, so if the problem uses anything else raise an exception
+    if problem_specification.kinetics_model.name != "full":
+        raise ValueError("Sensitivities can only be calculated with full kinetics.")
+    if isinstance(problem_specification.solver, MultirateSolver):
+        raise ValueError("Sensitivities can't be calculated with the {} solver.".format(problem_specification.solver.name))
+
+    # Events could stop the run or change its reactivity part of the way through, which the sensitivities don't account for, so if there are any raise an exception
+    if problem_specification.events:
+        raise ValueError("Sensitivities can't be calculated for a problem with events.")
+
+    # The sensitivities are returned at every output time, so if only some of them are to be kept raise an exception
+    if problem_specification.adaptive_output is not None:
+        raise ValueError("Sensitivities can't be calculated for a problem with adaptive output.")
+
+    n_state_variables = problem_specification.n_state_variables
+    output_times = problem_specification.output_times
+
+    sensitivity_derivative = SensitivityDerivative(problem_specification, parameters)
+
+    if jacobian:
+        analytic_jacobian = SensitivityJacobian(sensitivity_derivative.jacobian, len(parameters))
+    else:
+        analytic_jacobian = None
+
+    start_array = np.concatenate([start_state.as_array, calculate_start_sensitivities(start_state, problem_specification, sensitivity_derivative).ravel()])
+
+    calculated_arrays, statistics = problem_specification.solver(sensitivity_derivative, analytic_jacobian, start_array, output_times, problem_specification.reactivity_breakpoints)
+
+    # Split the combined arrays into the states and their sensitivities
+    trajectory = Trajectory(problem_specification, output_times, calculated_arrays[:, :n_state_variables])
+    return Sensitivities(trajectory, parameters, calculated_arrays[:, n_state_variables:].reshape(len(output_times), len(parameters), n_state_variables))
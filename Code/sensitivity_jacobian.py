@@ -0,0 +1,72 @@
+from scipy.sparse import block_diag
+import numpy as np
+
+class SensitivityJacobian():
+    '''The Jacobian of the state and sensitivity equations used by implicit solvers, which is the Jacobian of the state equations repeated on the diagonal for the state and the sensitivities to each parameter
+    The sensitivity equations also depend on the state through the second derivatives of the state equations, which are left out, as they are by the simultaneous corrector of CVODES
+    The solver's Newton iterations then converge to the same solution a little more slowly, and every block is the same, so the solvers which can factorise only the first block are told its size, and the others are given the Jacobian as bands no wider than a block'''
+    def __init__(self, jacobian, n_parameters):
+        '''Constructs the Jacobian
+        self -- The instance of SensitivityJacobian being constructed (SensitivityJacobian)
+        jacobian -- The analytic Jacobian of the state equations (Jacobian)
+        n_parameters -- The number of parameters the sensitivities are to (int)'''
+
+        self._jacobian = jacobian
+        self._n_blocks = n_parameters + 1
+        self._n_state_variables = jacobian.sparsity.shape[0]
+
+    @property
+    def block_size(self):
+        '''Returns the number of rows in each of the blocks repeated along the diagonal of the Jacobian
+        self -- The Jacobian the value is being returned from (SensitivityJacobian)
+        [return] -- The number of state variables (int)'''
+        return(self._n_state_variables)
+
+    @property
+    def bandwidths(self):
+        '''Returns the number of bands below and above the diagonal which may be non-zero, suitable for use as ml and mu in scipy.integrate.odeint
+        self -- The Jacobian the value is being returned from (SensitivityJacobian)
+        [return] -- The lower and upper bandwidths, which are those of a whole block (int, int)'''
+        return(self._n_state_variables - 1, self._n_state_variables - 1)
+
+    @property
+    def sparsity(self):
+        '''Returns the sparsity pattern of the Jacobian, suitable for use as jac_sparsity in scipy.integrate.solve_ivp
+        self -- The Jacobian the sparsity pattern is being returned from (SensitivityJacobian)
+        [return] -- A matrix which is 1 where the Jacobian may be non-zero (scipy.sparse.csc_matrix)'''
+
+        return(block_diag([self._jacobian.sparsity] * self._n_blocks, format="csc"))
+
+    def __call__(self, augmented_array, time):
+        '''Calculates the Jacobian at the specified state and time
+        self -- The instance of SensitivityJacobian being called (SensitivityJacobian)
+        augmented_array -- The state followed by its sensitivities to each parameter in turn (np.array[float])
+        time -- The current time of the state (s)(float)
+        [return] -- The Jacobian of the rates of change with respect to the state and sensitivities (scipy.sparse.csc_matrix)'''
+
+        return(block_diag([self._jacobian(augmented_array[:self._n_state_variables], time)] * self._n_blocks, format="csc"))
+
+    def dense(self, augmented_array, time):
+        '''Calculates the Jacobian at the specified state and time as a dense array, suitable for use as Dfun in scipy.integrate.odeint
+        self -- The instance of SensitivityJacobian being used (SensitivityJacobian)
+        augmented_array -- The state followed by its sensitivities to each parameter in turn (np.array[float])
+        time -- The current time of the state (s)(float)
+        [return] -- The Jacobian of the rates of change with respect to the state and sensitivities (np.array[float])'''
+
+        return(self(augmented_array, time).toarray())
+
+    def banded(self, augmented_array, time):
+        '''Calculates the Jacobian at the specified state and time packed as its bands, suitable for use as Dfun in scipy.integrate.odeint with the bandwidths as ml and mu
+        Element [i, j] of the Jacobian is held in row [bandwidth + i - j] of column j, which for the same blocks repeated along the diagonal is the packed first block repeated along the columns
+        self -- The Jacobian being used (SensitivityJacobian)
+        augmented_array -- The state followed by its sensitivities to each parameter in turn (np.array[float])
+        time -- The current time of the state (s)(float)
+        [return] -- The bands of the Jacobian, one per row from the highest to the lowest (np.array[float])'''
+
+        n_state_variables = self._n_state_variables
+        block = self._jacobian.dense(augmented_array[:n_state_variables], time)
+
+        rows, columns = np.indices(block.shape)
+        packed = np.zeros((2 * n_state_variables - 1, n_state_variables))
+        packed[n_state_variables - 1 + rows - columns, columns] = block
+        return(np.tile(packed, self._n_blocks))
@@ -0,0 +1,202 @@
+from scipy.integrate import solve_ivp, RK23, RK45, DOP853, Radau, BDF, LSODA
+from block_diagonal_method import block_diagonal_method
+import numpy as np
+
+class SolveIvpSolver():
+    '''A solver which integrates the system using one of the methods of scipy.integrate.solve_ivp
+    The solver takes its own steps and the states at the output times are sampled from its dense output
+    The integration is restarted at each breakpoint, so the solver steps exactly onto sudden changes in the equations rather than shrinking its steps to resolve them'''
+
+    # The methods which are accepted and those which make use of a Jacobian
+    methods = ("RK23", "RK45", "DOP853", "Radau", "BDF", "LSODA")
+    method_classes = {"RK23": RK23, "RK45": RK45, "DOP853": DOP853, "Radau": Radau, "BDF": BDF, "LSODA": LSODA}
+    implicit_methods = ("Radau", "BDF", "LSODA")
+
+    # The methods which factorise their matrices in a way that can be limited to a single block of a block diagonal Jacobian
+    block_methods = ("Radau", "BDF")
+
+    # Whether the solver moves the coolant itself, which this solver leaves to the advection term of the equations
+    transports_coolant = False
+
+    def __init__(self, method, rtol=None, atol=None, max_step=None, first_step=None):
+        '''Constructs the solver
+        self -- The instance of SolveIvpSolver being constructed (SolveIvpSolver)
+        method -- The name of the solve_ivp method to be used (str)
+        rtol -- The relative tolerance, or None to use the solve_ivp default (default None)(float)
+        atol -- The absolute tolerance, or None to use the solve_ivp default (default None)(float)
+        max_step -- The largest step the solver may take (s), or None for no limit (default None)(float)
+        first_step -- The size of the first step (s), or None for the solver to choose (default None)(float)'''
+
+        # If the method isn't one solve_ivp provides raise an exception
+        if method not in self.methods:
+            raise ValueError("The solver '{}' is not one of {}.".format(method, ", ".join(self.methods)))
+
+        self._method = method
+
+        # Only the options that have been set are passed to solve_ivp so that it uses its own defaults for the rest
+        self._options = {}
+        if rtol is not None:
+            self._options["rtol"] = rtol
+        if atol is not None:
+            self._options["atol"] = atol
+        if max_step is not None:
+            self._options["max_step"] = max_step
+        if first_step is not None:
+            self._options["first_step"] = first_step
+
+    @property
+    def name(self):
+        ''' Returns the name of the solver
+        self -- The solver the value is being returned from (SolveIvpSolver)
+        [return] -- The name of the solve_ivp method (str)'''
+        return(self._method)
+
+    def __repr__(self):
+        '''Returns a string describing the solver and its options, used to identify the problem specification it belongs to
+        self -- The solver being described (SolveIvpSolver)
+        [return] -- The method and options of the solver (str)'''
+        return("SolveIvpSolver({!r}, {!r})".format(self._method, sorted(self._options.items())))
+
+    def _prepare(self, derivative_function, jacobian):
+        '''Wraps the derivative and Jacobian in the form solve_ivp expects and gathers the method and options passed to it
+        self -- The solver being used (SolveIvpSolver)
+        derivative_function -- Calculates the rate of change from the state array and time (function(np.array[float], float) -> np.array[float])
+        jacobian -- The analytic Jacobian of the system, or None for the solver to estimate it (Jacobian)
+        [return] -- The rate of change as a function of time and state, the solve_ivp method and the options of the solver (function(float, np.array[float]) -> np.array[float], scipy.integrate.OdeSolver, dict)'''
+
+        # solve_ivp passes the time first and keeps hold of returned gradients, so the gradient is copied in case derivative_function reuses its array
+        def function(time, state_array):
+            return(derivative_function(state_array, time).copy())
+
+        options = dict(self._options)
+
+        # Radau and BDF can use the sparse Jacobian directly, while LSODA needs it dense, or banded if the Jacobian has bands
+        if jacobian is not None and self._method in self.implicit_methods:
+            if self._method == "LSODA" and getattr(jacobian, "bandwidths", None) is not None:
+                options["lband"], options["uband"] = jacobian.bandwidths
+                options["jac"] = lambda time, state_array: jacobian.banded(state_array, time)
+            elif self._method == "LSODA":
+                options["jac"] = lambda time, state_array: jacobian.dense(state_array, time)
+            else:
+                options["jac"] = lambda time, state_array: jacobian(state_array, time)
+
+        # If the Jacobian is a block repeated along its diagonal, Radau and BDF factorise only that block
+        method = self.method_classes[self._method]
+        if jacobian is not None and self._method in self.block_methods and getattr(jacobian, "block_size", None) is not None:
+            method = block_diagonal_method(method, jacobian.block_size)
+
+        return(function, method, options)
+
+    def _segment_ends(self, times, breakpoints):
+        '''Splits the period being integrated at the breakpoints within it
+        self -- The solver being used (SolveIvpSolver)
+        times -- The times at which the state is to be returned (s)(np.array[float])
+        breakpoints -- Times at which the equations change suddenly, or None if there are none (s)(np.array[float])
+        [return] -- The start and end times of each segment of the integration ([(float, float)])'''
+
+        ends = [times[0]]
+        if breakpoints is not None:
+            ends += [breakpoint for breakpoint in np.unique(breakpoints) if times[0] < breakpoint < times[-1]]
+        ends.append(times[-1])
+
+        return(list(zip(ends[:-1], ends[1:])))
+
+    def __call__(self, derivative_function, jacobian, start_array, times, breakpoints=None):
+        '''Integrates the system from the start state, returning the state at each of the requested times
+        self -- The solver being used (SolveIvpSolver)
+        derivative_function -- Calculates the rate of change from the state array and time (function(np.array[float], float) -> np.array[float])
+        jacobian -- The analytic Jacobian of the system, or None for the solver to estimate it (Jacobian)
+        start_array -- The state of the system at the first of the times (np.array[float])
+        times -- The times at which the state is to be returned (s)(np.array[float])
+        breakpoints -- Times at which the equations change suddenly, at which the integration is restarted (default None)(s)(np.array[float])
+        [return] -- The states at the requested times, one per row, and the solver statistics (np.array[float], dict)'''
+
+        function, method, options = self._prepare(derivative_function, jacobian)
+
+        calculated_arrays = np.zeros((len(times), len(start_array)))
+        statistics = {"solver": self.name, "nfev": 0, "njev": 0, "nlu": 0, "n_steps": 0}
+        state_array = start_array
+        step_times = [times[:1]]
+
+        for segment_start, segment_end in self._segment_ends(times, breakpoints):
+            result = solve_ivp(function, (segment_start, segment_end), state_array, method=method, dense_output=True, **options)
+
+            if not result.success:
+                raise RuntimeError("The solver '{}' failed: {}".format(self._method, result.message))
+
+            # Sample the output times within the segment, of which there may be none
+            i_start = np.searchsorted(times, segment_start, side="left")
+            i_end = np.searchsorted(times, segment_end, side="right")
+            if i_end > i_start:
+                calculated_arrays[i_start:i_end] = result.sol(times[i_start:i_end]).T
+            state_array = result.y[:, -1]
+
+            statistics["nfev"] += int(result.nfev)
+            statistics["njev"] += int(result.njev)
+            statistics["nlu"] += int(result.nlu)
+            statistics["n_steps"] += len(result.t) - 1
+            step_times.append(result.t[1:])
+
+        # The time reached by and size of every step
+        statistics["step_times"] = np.concatenate(step_times)[1:]
+        statistics["step_sizes"] = np.diff(np.concatenate(step_times))
+
+        return(calculated_arrays, statistics)
+
+    def stream(self, derivative_function, jacobian, start_array, times, chunk_size, first_step=None, breakpoints=None):
+        '''Integrates the system from the start state, yielding the states at the requested times in chunks as they are calculated
+        A solve_ivp solver object takes every step between two breakpoints, so the state of the solver is carried from one chunk to the next and the result matches a single call
+        self -- The solver being used (SolveIvpSolver)
+        derivative_function -- Calculates the rate of change from the state array and time (function(np.array[float], float) -> np.array[float])
+        jacobian -- The analytic Jacobian of the system, or None for the solver to estimate it (Jacobian)
+        start_array -- The state of the system at the first of the times (np.array[float])
+        times -- The times at which the state is to be returned (s)(np.array[float])
+        chunk_size -- The number of times in each chunk (int)
+        first_step -- The size of the first step, replacing that of the solver, or None to keep it (default None)(float)
+        breakpoints -- Times at which the equations change suddenly, at which the integration is restarted (default None)(s)(np.array[float])
+        [return] -- The times of each chunk, the states at those times, one per row, and the last step size, which is None before the first step (iterator[(np.array[float], np.array[float], float)])'''
+
+        function, method, options = self._prepare(derivative_function, jacobian)
+        segments = self._segment_ends(times, breakpoints)
+        i_segment = 0
+
+        segment_options = dict(options)
+        if first_step is not None:
+            segment_options["first_step"] = min(first_step, segments[0][1] - segments[0][0])
+        solver = method(function, segments[0][0], start_array, segments[0][1], **segment_options)
+
+        n_times = len(times)
+        i_chunk = 0
+        chunk = np.zeros((min(chunk_size, n_times), len(start_array)))
+        chunk[0] = start_array
+        i_time = 1
+        if len(chunk) == 1:
+            yield times[:1], chunk, None
+            i_chunk = 1
+            chunk = np.zeros((min(chunk_size, n_times - 1), len(start_array)))
+
+        while i_time < n_times:
+            # Start a new solver from the end of each segment
+            if solver.status == "finished":
+                i_segment += 1
+                solver = method(function, segments[i_segment][0], solver.y, segments[i_segment][1], **options)
+
+            solver.step()
+            if solver.status == "failed":
+                raise RuntimeError("The solver '{}' failed at {}s.".format(self._method, solver.t))
+
+            # Interpolate every output time passed by this step, yielding the chunk whenever it is full
+            i_end = np.searchsorted(times, solver.t, side="right")
+            if i_end > i_time:
+                interpolant = solver.dense_output()
+                while i_time < i_end:
+                    i_stop = min(i_end, i_chunk + len(chunk))
+                    chunk[i_time - i_chunk:i_stop - i_chunk] = interpolant(times[i_time:i_stop]).T
+                    i_time = i_stop
+                    if i_time - i_chunk == len(chunk):
+                        yield times[i_chunk:i_time], chunk, solver.step_size
+                        i_chunk = i_time
+                        chunk = np.zeros((min(chunk_size, n_times - i_chunk), len(start_array)))
+
+        if i_time > i_chunk:
+            yield times[i_chunk:i_time], chunk, solver.step_size
@@ -0,0 +1,118 @@
+import hashlib
+import os
+import pickle
+
+# The hash of the source of the code, which is found the first time it is needed
+_code_hash = None
+
+class SpecificationCache():
+    '''A directory of problem specifications which have already been read, stored in a binary form keyed by the content of the input they were read from
+    Loading a cached problem specification skips both reading the input and constructing the arrays derived from it
+    The files the input refers to, such as reactivity tables, are recorded with their content so that a cached problem specification is not used if they have changed
+    The key includes a hash of the source of the code, so an entry stored by code whose classes had a different layout, or which read inputs differently, is never used'''
+
+    # Changing the format of the cache itself needs a new version so that old entries are not used
+    format_version = 6
+
+    def __init__(self, directory):
+        '''Constructs the cache
+        self -- The instance of SpecificationCache being constructed (SpecificationCache)
+        directory -- The directory the cached problem specifications are stored in, which is made when the first is stored (str)'''
+
+        self._directory = directory
+
+    @property
+    def directory(self):
+        ''' Returns the directory the cached problem specifications are stored in
+        self -- The cache the value is being returned from (SpecificationCache)
+        [return] -- The directory of the cache (str)'''
+        return(self._directory)
+
+    def key(self, content, overrides=None):
+        '''Calculates the key of the problem specification read from an input
+        self -- The cache being used (SpecificationCache)
+        content -- The content of the input file (bytes)
+        overrides -- Values which replace those in the input, as described in input_reader.apply_overrides (default None)({String: value})
+        [return] -- The key of the problem specification (str)'''
+
+        content_hash = hashlib.sha256()
+        content_hash.update(repr(self.format_version).encode())
+        content_hash.update(code_hash().encode())
+        content_hash.update(content)
+        content_hash.update(repr(sorted((str(key), str(value)) for key, value in (overrides or {}).items())).encode())
+
+        return(content_hash.hexdigest())
+
+    def _file_path(self, key):
+        '''Returns the path of the file a problem specification is cached in
+        self -- The cache being used (SpecificationCache)
+        key -- The key of the problem specification (str)
+        [return] -- The path of the file (str)'''
+        return(os.path.join(self._directory, key + ".pickle"))
+
+    def load(self, key):
+        '''Loads a problem specification from the cache
+        self -- The cache being used (SpecificationCache)
+        key -- The key of the problem specification (str)
+        [return] -- The problem specification, or None if it isn't in the cache or the files it depends on have changed (ProblemSpecification)'''
+
+        # A missing or unreadable entry is treated as not being in the cache
+        try:
+            with open(self._file_path(key), "rb") as f:
+                entry = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            return(None)
+
+        for dependency_path, dependency_hash in entry["dependencies"].items():
+            if file_hash(dependency_path) != dependency_hash:
+                return(None)
+
+        return(entry["problem_specification"])
+
+    def save(self, key, problem_specification, dependency_paths=()):
+        '''Stores a problem specification in the cache
+        The entry is written to a temporary file which then replaces any existing entry, so an entry is never partly written
+        self -- The cache being used (SpecificationCache)
+        key -- The key of the problem specification (str)
+        problem_specification -- The problem specification being stored (ProblemSpecification)
+        dependency_paths -- The paths of the files, other than the input, which the problem specification was read from (default ())([str])'''
+
+        if not os.path.exists(self._directory):
+            os.makedirs(self._directory)
+
+        entry = {"problem_specification": problem_specification,
+                 "dependencies": {dependency_path: file_hash(dependency_path) for dependency_path in dependency_paths}}
+
+        file_path = self._file_path(key)
+        temporary_path = file_path + ".tmp"
+        with open(temporary_path, "wb") as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, file_path)
+
+def file_hash(file_path):
+    '''Calculates the hash of the content of a file
+    file_path -- The path of the file (str)
+    [return] -- The SHA-256 hash of the content, or None if the file can't be read (str)'''
+
+    try:
+        with open(file_path, "rb") as f:
+            return(hashlib.sha256(f.read()).hexdigest())
+    except OSError:
+        return(None)
+
+def code_hash():
+    '''Calculates the hash of the source of every module of the code, which changes whenever the classes stored in the cache or the way inputs are read might have changed
+    The modules are those in the directory of this module, so the hash is the same whichever of them have been imported
+    [return] -- The SHA-256 hash of the names and content of the modules (str)'''
+
+    global _code_hash
+    if _code_hash is None:
+        directory = os.path.dirname(os.path.abspath(__file__))
+        content_hash = hashlib.sha256()
+        for name in sorted(os.listdir(directory)):
+            if name.endswith(".py"):
+                content_hash.update(name.encode())
+                content_hash.update(file_hash(os.path.join(directory, name)).encode())
+        _code_hash = content_hash.hexdigest()
+
+    return(_code_hash)
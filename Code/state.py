@@ -10,16 +10,16 @@ class State(StateVariables):
     def t_fuel_mean(self):
         '''Calculates the  mean temperature of the coolant
         self -- The instance of State the value is being calculated (State)
-        [return] -- The mean fuel temperature (K)(float)'''
-        return np.mean(self.t_fuel)
+        [return] -- The mean fuel temperature, weighted by the power of each channel (K)(float)'''
+        return self._problem_specification.mean_temperature(self.t_fuel)
 
     @property
     def t_coolant_mean(self):
         '''Calculates the  mean temperature of the fuel
         self -- The instance of State the value is being calculated (State)
-        [return] -- The mean coolant temperature (K)(float)'''
+        [return] -- The mean coolant temperature, weighted by the power of each channel (K)(float)'''
 
-        return np.mean(self.t_coolant)
+        return self._problem_specification.mean_temperature(self.t_coolant)
 
     @property
     def driving_reactivity(self):
@@ -51,4 +51,18 @@ class State(StateVariables):
         self -- The instance of State the value is being calculated (State)
         [return] -- The power of the state (W)(float)'''
 
-        return self.n_neutron * self._problem_specification.energy_fission / self._problem_specification.generation_time
\ No newline at end of file
+        return self.n_neutron * self._problem_specification.energy_fission / self._problem_specification.generation_time
+
+    @property
+    def inverse_period(self):
+        '''Calculates the inverse of the reactor period, the rate of change of the number of neutrons relative to the number of neutrons, which is positive while the power rises
+        With no neutrons, as at a cold start, any change is infinitely fast relative to the number of neutrons, so the inverse period is infinite with the sign of the rate of change, or zero if nothing changes
+        self -- The instance of State the value is being calculated (State)
+        [return] -- The inverse of the reactor period (1/s)(float)'''
+
+        reactivity = self.driving_reactivity + self.fuel_reactivity + self.coolant_reactivity
+        rate_of_change = self._problem_specification.beta * (reactivity - 1) * self.n_neutron / self._problem_specification.generation_time + np.dot(self._problem_specification.lambdas, self.n_delayed) + self._problem_specification.source
+
+        if self.n_neutron == 0:
+            return np.sign(rate_of_change) * np.inf if rate_of_change != 0 else 0.0
+        return rate_of_change / self.n_neutron
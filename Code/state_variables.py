@@ -20,18 +20,39 @@ class StateVariables():
         except TypeError:
             self.n_neutron = 0
             self.n_delayed = np.zeros(problem_specification.n_delayed)
-            self.t_fuel = np.zeros(problem_specification.n_z)
-            self.t_coolant = np.zeros(problem_specification.n_z)
+            self.t_fuel = np.zeros(problem_specification.temperature_shape)
+            self.t_coolant = np.zeros(problem_specification.temperature_shape)
 
     def populate_from_array(self, array):
         '''Populates the state from the provided array
         self -- The state being populated (StateVariables)
         array -- The array providing the values (np.array[float])'''
 
+        # The temperatures of a core with several channels are stored channel by channel and viewed with one row per channel
+        n_delayed = self._problem_specification.n_delayed
+        n_temperatures = self._problem_specification.n_temperatures
+        shape = self._problem_specification.temperature_shape
+
         self.n_neutron = array[0]
-        self.n_delayed = array[1:self._problem_specification.n_delayed + 1]
-        self.t_fuel = array[self._problem_specification.n_delayed + 1: self._problem_specification.n_delayed + self._problem_specification.n_z + 1]
-        self.t_coolant = array[self._problem_specification.n_delayed + self._problem_specification.n_z + 1: self._problem_specification.n_delayed + 2 * self._problem_specification.n_z + 1]
+        self.n_delayed = array[1:n_delayed + 1]
+        self.t_fuel = array[n_delayed + 1: n_delayed + n_temperatures + 1].reshape(shape)
+        self.t_coolant = array[n_delayed + n_temperatures + 1: n_delayed + 2 * n_temperatures + 1].reshape(shape)
+
+    def populate_from_solved_array(self, array):
+        '''Populates the state from an array of the variables integrated by the solver, which depend on the kinetics model of the problem specification
+        Variables which aren't solved for, such as the number of neutrons in the prompt jump approximation, are calculated from the others at the time of the state
+        self -- The state being populated (StateVariables)
+        array -- The array providing the values solved for (np.array[float])'''
+
+        self.populate_from_array(self._problem_specification.kinetics_model.expand(array, self.time))
+
+    @property
+    def as_solved_array(self):
+        '''Creates an array of the variables integrated by the solver, which depend on the kinetics model of the problem specification
+        self -- The state being represented (StateVariables)
+        [return] -- The array containing the values solved for (np.array[float])'''
+
+        return(self._problem_specification.kinetics_model.reduce(self.as_array))
 
     @property
     def as_array(self):
@@ -41,10 +62,13 @@ class StateVariables():
 
         array = np.zeros(self._problem_specification.n_state_variables)
 
+        n_delayed = self._problem_specification.n_delayed
+        n_temperatures = self._problem_specification.n_temperatures
+
         array[0] = self.n_neutron
-        array[1:self._problem_specification.n_delayed + 1] = self.n_delayed
-        array[self._problem_specification.n_delayed + 1: self._problem_specification.n_delayed + self._problem_specification.n_z + 1] = self.t_fuel
-        array[self._problem_specification.n_delayed + self._problem_specification.n_z + 1: self._problem_specification.n_delayed + 2 * self._problem_specification.n_z + 1] = self.t_coolant
+        array[1:n_delayed + 1] = self.n_delayed
+        array[n_delayed + 1: n_delayed + n_temperatures + 1] = np.ravel(self.t_fuel)
+        array[n_delayed + n_temperatures + 1: n_delayed + 2 * n_temperatures + 1] = np.ravel(self.t_coolant)
 
         return(array)
 
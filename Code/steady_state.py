@@ -0,0 +1,73 @@
+from state import State
+from compiled_derivative import CompiledDerivative
+from jacobian import Jacobian
+from scipy.sparse.linalg import spsolve
+import numpy as np
+
+def calculate_steady_state(problem_specification, time=0, tolerance=1e-10, max_iterations=50, scale=1):
+    '''Calculates the state in which nothing changes, with the driving reactivity held at its value at the given time
+    The equations of derivative are set to zero and solved by Newton's method, using the analytic Jacobian and a sparse LU solve for each iteration
+    The first guess has every temperature at the reference temperature and the neutrons and precursors balanced for the driving reactivity alone:
+    setting the precursor equations to zero gives lambda_k * C_k = beta_k * reactivity * n / generation_time, and substituting this into the neutron equation gives n = source * generation_time / (beta * (1 - 2 * reactivity))
+    problem_specification -- The specification of the current physical system (ProblemSpecification)
+    time -- The time at which the driving reactivity is evaluated and which the state is given (s)(default 0)(float)
+    tolerance -- The largest change in any variable in the final iteration, relative to the size of the variable plus the scale (default 1e-10)(float)
+    max_iterations -- The number of iterations after which the solve is abandoned (default 50)(int)
+    scale -- The size added to that of each variable when measuring its change, so that variables which are zero in the steady state, such as the precursors with no driving reactivity, still converge (default 1)(float)
+    [return] -- The steady state of the system (State)'''
+
+    derivative_function = CompiledDerivative(problem_specification)
+    jacobian = Jacobian(problem_specification)
+
+    # Make the first guess from the analytic balance of the neutrons and precursors, falling back to no driving reactivity if there is no balance for it
+    reactivity = problem_specification.reactivity_driving(time)
+    if 1 - 2 * reactivity <= 0:
+        reactivity = 0
+    guess = State(problem_specification, time)
+    guess.n_neutron = problem_specification.source * problem_specification.generation_time / (problem_specification.beta * (1 - 2 * reactivity))
+    guess.n_delayed = problem_specification.betas * reactivity * guess.n_neutron / (problem_specification.generation_time * problem_specification.lambdas)
+    guess.t_fuel = np.full(problem_specification.temperature_shape, problem_specification.temperature_zero)
+    guess.t_coolant = np.full(problem_specification.temperature_shape, problem_specification.temperature_zero)
+    state_array = guess.as_array
+
+    for iteration in range(max_iterations):
+        residual = derivative_function(state_array, time)
+        step = spsolve(jacobian(state_array, time), -residual)
+
+        # If the step would make the number of neutrons negative, shorten it
+        for halving in range(50):
+            if state_array[0] + step[0] >= 0:
+                break
+            step *= 0.5
+
+        state_array = state_array + step
+
+        # The change is measured relative to the variable, or absolutely for variables much smaller than the scale
+        if np.all(np.abs(step) <= tolerance * (np.abs(state_array) + scale)):
+            return State(problem_specification, time, state_array)
+
+    raise RuntimeError("The steady state was not found within {} iterations.".format(max_iterations))
+
+def calculate_steady_temperature_rises(problem_specification, power):
+    '''Calculates how far the fuel and coolant temperatures rise above the reference temperature when nothing changes with the power held fixed
+    The temperature equations are linear in the temperatures for a fixed power, so they are solved directly with the temperature part of the analytic Jacobian, starting from the reference temperature so that small rises keep their precision
+    problem_specification -- The specification of the current physical system (ProblemSpecification)
+    power -- The power the neutrons are held at (W)(float)
+    [return] -- The rises of the fuel and coolant temperatures, in the shape of the temperatures (K)(np.array[float], np.array[float])'''
+
+    derivative_function = CompiledDerivative(problem_specification)
+    jacobian = Jacobian(problem_specification)
+
+    state = State(problem_specification, 0)
+    state.n_neutron = power * problem_specification.generation_time / problem_specification.energy_fission
+    state.n_delayed = np.zeros(problem_specification.n_delayed)
+    state.t_fuel = np.full(problem_specification.temperature_shape, problem_specification.temperature_zero)
+    state.t_coolant = np.full(problem_specification.temperature_shape, problem_specification.temperature_zero)
+    state_array = state.as_array
+
+    first_temperature = problem_specification.n_delayed + 1
+    residual = derivative_function(state_array, 0)[first_temperature:]
+    rises = spsolve(jacobian(state_array, 0)[first_temperature:, first_temperature:], -residual)
+
+    n_temperatures = problem_specification.n_temperatures
+    return(rises[:n_temperatures].reshape(problem_specification.temperature_shape), rises[n_temperatures:].reshape(problem_specification.temperature_shape))
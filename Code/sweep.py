@@ -0,0 +1,144 @@
+from concurrent.futures import ProcessPoolExecutor
+from input_reader import parse_content, split_content, override_specification, read_sweep
+from nuclear_reactor import run, make_initial_state
+from ensemble_future_states import ensemble_key, calculate_ensemble_future_states
+from sweep_results import SweepResults
+from specification_cache import SpecificationCache
+from result_cache import ResultCache
+import numpy as np
+import os
+import sys
+
+# The content, lines and problem specification of the base input and the caches of problem specifications and results, set up once by each worker process when it starts
+_base_content = None
+_base_lines = None
+_base_specification = None
+_cache = None
+_result_cache = None
+
+def _initialise_worker(base_path, cache_directory, result_cache_directory):
+    '''Reads the base input into the worker process and builds its problem specification, so that neither is repeated for every run
+    base_path -- The relative file path to the base input file (str)
+    cache_directory -- The directory of the cache of problem specifications, or None not to use a cache (str)
+    result_cache_directory -- The directory of the cache of results, which the workers share, or None not to use a cache (str)'''
+
+    global _base_content, _base_lines, _base_specification, _cache, _result_cache
+    with open(base_path, "rb") as f:
+        _base_content = f.read()
+    _cache = SpecificationCache(cache_directory) if cache_directory is not None else None
+    _result_cache = ResultCache(result_cache_directory) if result_cache_directory is not None else None
+    _base_lines = split_content(_base_content)
+    _base_specification = parse_content(_base_content, None, _cache)
+
+def _make_specification(overrides):
+    '''Makes the problem specification of a member of the sweep, changing the base problem specification if only cheap values are swept and reading the base input with the overrides otherwise
+    overrides -- The values of the swept parameters for this run ({str: value})
+    [return] -- The specification of the problem (ProblemSpecification)'''
+
+    problem_specification = override_specification(_base_specification, _base_lines, overrides)
+    if problem_specification is None:
+        problem_specification = parse_content(_base_content, overrides, _cache)
+    return(problem_specification)
+
+def _extract_outputs(output_states):
+    '''Extracts the time dependent outputs of a run
+    output_states -- The states of the run at the output times (Trajectory)
+    [return] -- The outputs of the run, keyed by the names in SweepResults.output_names ({str: np.array[float]})'''
+
+    return {"times": output_states.times,
+            "power": output_states.power,
+            "t_fuel_mean": output_states.t_fuel_mean,
+            "t_coolant_mean": output_states.t_coolant_mean}
+
+def _run_single(overrides):
+    '''Runs a single member of the sweep in a worker process and extracts its time dependent outputs
+    overrides -- The values of the swept parameters for this run ({str: value})
+    [return] -- The outputs of the run, keyed by the names in SweepResults.output_names ({str: np.array[float]})'''
+
+    problem_specification = _make_specification(overrides)
+    return _extract_outputs(run(problem_specification, cache=_result_cache))
+
+def _run_ensemble(batch):
+    '''Runs a batch of members of the sweep in a worker process, integrating those which can be integrated together as ensembles and the rest on their own
+    Members are integrated together if they have the same ensemble_key, so a batch sweeping a value which changes the number of discretisations is split into an ensemble for each number. Ensembles don't use the result cache
+    batch -- The values of the swept parameters for each run of the batch ([{str: value}])
+    [return] -- The outputs of each run, keyed by the names in SweepResults.output_names ([{str: np.array[float]}])'''
+
+    problem_specifications = [_make_specification(overrides) for overrides in batch]
+    run_outputs = [None] * len(batch)
+
+    # Gather the members which can be integrated together, running any which can't be a member of an ensemble on its own
+    groups = {}
+    for i_run, problem_specification in enumerate(problem_specifications):
+        key = ensemble_key(problem_specification)
+        if key is None:
+            run_outputs[i_run] = _extract_outputs(run(problem_specification, cache=_result_cache))
+        else:
+            groups.setdefault(key, []).append(i_run)
+
+    for group in groups.values():
+        group_specifications = [problem_specifications[i_run] for i_run in group]
+        trajectories = calculate_ensemble_future_states([make_initial_state(problem_specification) for problem_specification in group_specifications], group_specifications)
+        for i_run, trajectory in zip(group, trajectories):
+            run_outputs[i_run] = _extract_outputs(trajectory)
+
+    return run_outputs
+
+def run_sweep(sweep_specification, max_workers=None, cache_directory=None, result_cache_directory=None):
+    '''Runs every member of a parameter sweep in a pool of worker processes and gathers the results
+    If the sweep has an ensemble size the runs are handed to the workers in batches of that size, and the members of each batch which can be are integrated together as an ensemble
+    sweep_specification -- The specification of the sweep (SweepSpecification)
+    max_workers -- The number of worker processes, or None to use one per processor (default None)(int)
+    cache_directory -- The directory of a cache of problem specifications, so that repeating the sweep doesn't read the inputs again, or None not to use a cache (default None)(str)
+    result_cache_directory -- The directory of a cache of results, so that runs which have been run before, including by other sweeps, aren't run again, or None not to use a cache (default None)(str)
+    [return] -- The results of the sweep (SweepResults)'''
+
+    overrides = sweep_specification.overrides
+    n_runs = len(overrides)
+
+    if max_workers is None:
+        max_workers = os.cpu_count()
+
+    ensemble_size = sweep_specification.ensemble_size
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_initialise_worker, initargs=(sweep_specification.base_path, cache_directory, result_cache_directory)) as executor:
+        if ensemble_size is None:
+            # Runs are handed out in chunks so that the cost of sending work to the processes is small compared to the runs themselves
+            chunksize = max(1, n_runs // (4 * max_workers))
+            run_outputs = list(executor.map(_run_single, overrides, chunksize=chunksize))
+        else:
+            batches = [overrides[i_start:i_start + ensemble_size] for i_start in range(0, n_runs, ensemble_size)]
+            run_outputs = [outputs for batch_outputs in executor.map(_run_ensemble, batches) for outputs in batch_outputs]
+
+    # Gather the outputs into columns, padding runs with fewer output times with NaN
+    n_times = max(len(outputs["times"]) for outputs in run_outputs)
+    columns = {}
+    for name in SweepResults.output_names:
+        columns[name] = np.full((n_runs, n_times), np.nan)
+        for i_run, outputs in enumerate(run_outputs):
+            columns[name][i_run, :len(outputs[name])] = outputs[name]
+
+    # Store parameters as numbers where possible
+    parameters = {}
+    for name in sweep_specification.parameter_names:
+        values = np.array([str(run_overrides[name]) for run_overrides in overrides])
+        try:
+            parameters[name] = values.astype(float)
+        except ValueError:
+            parameters[name] = values
+
+    return SweepResults(np.arange(n_runs), parameters, columns)
+
+if __name__ == "__main__":
+    # Get the sweep file path from the first command line argument and the optional number of workers from the second
+    sweep_file_path = sys.argv[1]
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+
+    # Problem specifications and results are cached in the output directory so that repeating the sweep doesn't read the inputs or run the simulations again
+    output_directory = "outputs"
+    results = run_sweep(read_sweep(sweep_file_path), max_workers, os.path.join(output_directory, "cache"), os.path.join(output_directory, "results"))
+
+    # Make the output directory if it doesn't exist and save the results there
+    if not os.path.exists(output_directory):
+        os.makedirs(output_directory)
+    results.save(os.path.join(output_directory, os.path.splitext(os.path.basename(sweep_file_path))[0] + ".npz"))
@@ -0,0 +1,61 @@
+import numpy as np
+
+class SweepResults:
+    '''The results of a parameter sweep stored as columns, with one row per run in the order of the run ids
+    Each parameter is stored as a column of its values. The time dependent outputs are stored as two dimensional arrays with one row per run
+    If the runs have different numbers of output times the shorter rows are padded with NaN'''
+
+    # The time dependent outputs that are recorded for each run
+    output_names = ("times", "power", "t_fuel_mean", "t_coolant_mean")
+
+    def __init__(self, run_ids, parameters, outputs):
+        '''Constructs the results
+        self -- The instance of SweepResults being constructed (SweepResults)
+        run_ids -- The id of each run (np.array[int])
+        parameters -- The value of each parameter for each run ({str: np.array})
+        outputs -- The time dependent outputs of each run, keyed by the names in output_names ({str: np.array[float]})'''
+
+        self._run_ids = np.asarray(run_ids)
+        self._parameters = {name: np.asarray(values) for name, values in parameters.items()}
+        self._outputs = {name: np.asarray(outputs[name], dtype=float) for name in self.output_names}
+
+    @property
+    def run_ids(self):
+        ''' Returns the ids of the runs
+        self -- The results the value is being returned from (SweepResults)
+        [return] -- The id of each run (np.array[int])'''
+        return(self._run_ids)
+
+    @property
+    def parameters(self):
+        ''' Returns the values of the swept parameters
+        self -- The results the value is being returned from (SweepResults)
+        [return] -- The value of each parameter for each run ({str: np.array})'''
+        return(self._parameters)
+
+    def __getitem__(self, name):
+        ''' Returns one of the time dependent outputs of every run
+        self -- The results the value is being returned from (SweepResults)
+        name -- The name of the output, one of output_names (str)
+        [return] -- The output with one row per run (np.array[float])'''
+        return(self._outputs[name])
+
+    def save(self, file_path):
+        '''Saves the results to a .npz file. Parameters are stored with the prefix "parameter/"
+        self -- The results being saved (SweepResults)
+        file_path -- The path of the file to be written (str)'''
+
+        columns = {"run_ids": self._run_ids}
+        columns.update({"parameter/" + name: values for name, values in self._parameters.items()})
+        columns.update(self._outputs)
+        np.savez(file_path, **columns)
+
+def load_sweep_results(file_path):
+    '''Loads results previously saved by SweepResults.save
+    file_path -- The path of the file to be read (str)
+    [return] -- The results of the sweep (SweepResults)'''
+
+    with np.load(file_path) as columns:
+        parameters = {name[len("parameter/"):]: columns[name] for name in columns.files if name.startswith("parameter/")}
+        outputs = {name: columns[name] for name in SweepResults.output_names}
+        return SweepResults(columns["run_ids"], parameters, outputs)
@@ -0,0 +1,103 @@
+import itertools
+
+class SweepSpecification:
+    '''A description of a parameter sweep: a base input file and the values its parameters take in each run
+    Parameters are identified in the same way as the overrides of input_reader.apply_overrides, so any value of the input may be swept, including the fields of the reactivity line
+    There are three modes:
+    "grid" -- Every combination of the listed values of each parameter is run
+    "list" -- The listed values of each parameter are taken together in order, so every parameter must have the same number of values
+    "latin_hypercube" -- Each parameter is given a lower and upper bound and the requested number of samples are drawn from a Latin hypercube over the bounds. Parameters which are whole numbers, such as n_z, are drawn as whole numbers from the lower to the upper bound, each equally likely'''
+    modes = ("grid", "list", "latin_hypercube")
+
+    def __init__(self, base_path, mode, parameters, samples=None, seed=None, integer_parameters=(), ensemble_size=None):
+        '''Constructs the sweep specification
+        self -- The instance of SweepSpecification being constructed (SweepSpecification)
+        base_path -- The relative file path to the base input file (str)
+        mode -- How the values of the parameters are combined, one of "grid", "list" or "latin_hypercube" (str)
+        parameters -- The values of each parameter, or the lower and upper bound for a Latin hypercube ({str: [value]})
+        samples -- The number of runs drawn from a Latin hypercube (default None)(int)
+        seed -- The seed of the random numbers used to draw the Latin hypercube (default None)(int)
+        integer_parameters -- The parameters whose values are whole numbers (default ())([str])
+        ensemble_size -- The number of runs integrated together as an ensemble, or None to integrate each run on its own (default None)(int)'''
+
+        # If the mode or the parameters are inconsistent raise an exception
+        if mode not in self.modes:
+            raise ValueError("The sweep mode '{}' is not one of {}.".format(mode, ", ".join(self.modes)))
+        if mode == "list" and len(set(len(values) for values in parameters.values())) > 1:
+            raise ValueError("Every parameter of a list sweep must have the same number of values.")
+        if mode == "latin_hypercube":
+            if samples is None:
+                raise ValueError("A latin_hypercube sweep must specify the number of samples.")
+            if any(len(values) != 2 for values in parameters.values()):
+                raise ValueError("Every parameter of a latin_hypercube sweep must have a lower and upper bound.")
+            for name in integer_parameters:
+                if any(float(value) != int(float(value)) for value in parameters[name]):
+                    raise ValueError("The bounds of '{}' must be whole numbers, not {}.".format(name, " ".join(str(value) for value in parameters[name])))
+
+        if ensemble_size is not None and ensemble_size < 1:
+            raise ValueError("The ensemble size must be at least 1, not {}.".format(ensemble_size))
+
+        self._base_path = base_path
+        self._mode = mode
+        self._parameters = dict(parameters)
+        self._samples = samples
+        self._seed = seed
+        self._integer_parameters = tuple(integer_parameters)
+        self._ensemble_size = ensemble_size
+
+    @property
+    def base_path(self):
+        ''' Returns the path to the base input file
+        self -- The sweep specification the value is being returned from (SweepSpecification)
+        [return] -- The relative file path to the base input file (str)'''
+        return(self._base_path)
+
+    @property
+    def mode(self):
+        ''' Returns how the values of the parameters are combined
+        self -- The sweep specification the value is being returned from (SweepSpecification)
+        [return] -- The mode of the sweep (str)'''
+        return(self._mode)
+
+    @property
+    def ensemble_size(self):
+        ''' Returns the number of runs integrated together as an ensemble
+        self -- The sweep specification the value is being returned from (SweepSpecification)
+        [return] -- The number of runs in each ensemble, or None if each run is integrated on its own (int)'''
+        return(self._ensemble_size)
+
+    @property
+    def parameter_names(self):
+        ''' Returns the identifiers of the swept parameters
+        self -- The sweep specification the value is being returned from (SweepSpecification)
+        [return] -- The identifiers of the swept parameters ([str])'''
+        return(list(self._parameters))
+
+    @property
+    def overrides(self):
+        ''' Returns the values of the parameters for every run of the sweep, in the order of the run ids
+        self -- The sweep specification the value is being returned from (SweepSpecification)
+        [return] -- The overrides of the base input for each run ([{str: value}])'''
+
+        names = self.parameter_names
+
+        if self._mode == "grid":
+            combinations = itertools.product(*[self._parameters[name] for name in names])
+        elif self._mode == "list":
+            combinations = zip(*[self._parameters[name] for name in names])
+        else:
+            # scipy.stats is slow to import, so it is only imported when a Latin hypercube is needed
+            from scipy.stats import qmc
+            bounds = [[float(value) for value in self._parameters[name]] for name in names]
+
+            # A whole number is drawn between its lower bound and one above its upper bound and rounded down, so that every whole number from one bound to the other is equally likely
+            integers = [name in self._integer_parameters for name in names]
+            for bound, integer in zip(bounds, integers):
+                if integer:
+                    bound[1] += 1
+
+            samples = qmc.LatinHypercube(d=len(names), seed=self._seed).random(self._samples)
+            combinations = qmc.scale(samples, [bound[0] for bound in bounds], [bound[1] for bound in bounds])
+            combinations = [[int(min(value // 1, bound[1] - 1)) if integer else value for value, bound, integer in zip(combination, bounds, integers)] for combination in combinations]
+
+        return([dict(zip(names, combination)) for combination in combinations])
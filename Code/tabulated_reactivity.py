@@ -0,0 +1,108 @@
+from bisect import bisect_right
+import numpy as np
+
+class TabulatedReactivity():
+    '''A reactivity interpolated from a table of times and reactivities, such as a rod withdrawal or scram schedule
+    The reactivity is held at the first value before the first time and at the last value after the last time
+    With linear interpolation a time may be repeated to give a jump in the reactivity, the later value applying from that time onwards
+    Each segment between two times is stored as a polynomial in the time since the start of the segment
+    The segment used by the last call is remembered, so the solver's small forward steps are found without a search, and other times are found by a binary search'''
+    interpolations = ("linear", "spline")
+
+    def __init__(self, times, reactivities, interpolation="linear"):
+        '''Constructs a tabulated reactivity profile
+        self -- The instance of the tabulated reactivity being constructed (TabulatedReactivity)
+        times -- The times of the table, in increasing order (s)(np.array[float])
+        reactivities -- The reactivity at each time of the table ($)(np.array[float])
+        interpolation -- Either "linear" for straight lines between the points or "spline" for a cubic spline through them (default "linear")(str)'''
+
+        times = np.array(times, dtype=float)
+        reactivities = np.array(reactivities, dtype=float)
+
+        # If the table isn't valid raise an exception
+        if interpolation not in self.interpolations:
+            raise ValueError("The interpolation '{}' is not one of {}.".format(interpolation, ", ".join(self.interpolations)))
+        if len(times) != len(reactivities) or len(times) < 2:
+            raise ValueError("A reactivity table needs at least 2 times and the same number of reactivities.")
+        if np.any(np.diff(times) < 0) or (interpolation == "spline" and np.any(np.diff(times) == 0)):
+            raise ValueError("The times of a reactivity table must be increasing, and strictly increasing for a spline.")
+
+        self._times = times
+        self._reactivities = reactivities
+        self._interpolation = interpolation
+
+        if interpolation == "linear":
+            # Repeated times give segments of no length, which are never used, so their gradient is left as zero
+            lengths = np.diff(times)
+            gradients = np.divide(np.diff(reactivities), lengths, out=np.zeros(len(lengths)), where=lengths > 0)
+            self._coefficients = np.array([gradients, reactivities[:-1]])
+            # Every point is a change of gradient
+            self._breakpoints = np.unique(times)
+        else:
+            # scipy.interpolate is slow to import, so it is only imported when a spline is needed
+            from scipy.interpolate import CubicSpline
+            self._coefficients = CubicSpline(times, reactivities).c
+            # The spline is smooth between its ends, where it joins the constant values
+            self._breakpoints = times[[0, -1]]
+
+        # Python lists are faster than arrays for looking up single times
+        self._times_list = list(times)
+        self._coefficients_list = [list(segment) for segment in self._coefficients.T]
+        self._hint = 0
+
+    @property
+    def breakpoints(self):
+        ''' Returns the times at which the reactivity or its rate of change jumps, which the solver should step onto rather than across
+        self -- The reactivity profile the value is being returned from (TabulatedReactivity)
+        [return] -- The times of the breakpoints (s)(np.array[float])'''
+        return(self._breakpoints)
+
+    def __repr__(self):
+        '''Returns a string describing the reactivity profile and its parameters, used to identify the problem specification it belongs to
+        self -- The reactivity profile being described (TabulatedReactivity)
+        [return] -- The construction of the reactivity profile (str)'''
+        return("TabulatedReactivity({!r}, {!r}, {!r})".format(self._times.tolist(), self._reactivities.tolist(), self._interpolation))
+
+    def __call__(self, time):
+        ''' Returns the reactivity at a given time
+        self -- The reactivity profile the value is being returned from (TabulatedReactivity)
+        time -- The time or times the reactivity is to be returned at (s)(float or np.array[float])
+        [return] -- The reactivity at the specified time or times ($)(float or np.array[float])'''
+
+        if np.ndim(time) > 0:
+            return(self._evaluate_array(np.asarray(time, dtype=float)))
+
+        times = self._times_list
+        if time < times[0]:
+            return(self._reactivities[0])
+        if time >= times[-1]:
+            return(self._reactivities[-1])
+
+        # Use the segment of the last call if the time is in it, otherwise search for the segment
+        segment = self._hint
+        if not times[segment] <= time < times[segment + 1]:
+            segment = bisect_right(times, time) - 1
+            self._hint = segment
+
+        # Evaluate the polynomial of the segment by Horner's method
+        offset = time - times[segment]
+        reactivity = 0.0
+        for coefficient in self._coefficients_list[segment]:
+            reactivity = reactivity * offset + coefficient
+        return(reactivity)
+
+    def _evaluate_array(self, time):
+        ''' Returns the reactivity at an array of times
+        self -- The reactivity profile the value is being returned from (TabulatedReactivity)
+        time -- The times the reactivity is to be returned at (s)(np.array[float])
+        [return] -- The reactivity at the specified times ($)(np.array[float])'''
+
+        segment = np.clip(np.searchsorted(self._times, time, side="right") - 1, 0, len(self._times) - 2)
+        offset = time - self._times[segment]
+        reactivity = np.zeros(time.shape)
+        for coefficients in self._coefficients:
+            reactivity = reactivity * offset + coefficients[segment]
+
+        reactivity[time < self._times[0]] = self._reactivities[0]
+        reactivity[time >= self._times[-1]] = self._reactivities[-1]
+        return(reactivity)
@@ -0,0 +1,39 @@
+from compiled_derivative import CompiledDerivative
+from instrumented_derivative import InstrumentedDerivative
+from instrumentation import Instrumentation
+from future_states import calculate_future_states
+from nuclear_reactor import make_initial_state
+from test_jacobian import make_problem, make_state_array
+import numpy as np
+import unittest
+
+class TestInstrumentation(unittest.TestCase):
+    '''Checks instrumenting a run changes neither its rate of change nor its results, and the rejected steps are only inferred where they can be'''
+
+    def test_identical_gradients(self):
+        '''Checks the instrumented rate of change is identical to the compiled one, with and without the advection of the coolant'''
+
+        for problem_specification in (make_problem(overrides={"n_z": 8}), make_problem(["n_channels 2", "channel_peaking 1.2 0.8"], {"n_z": 5})):
+            state_array = make_state_array(problem_specification)
+            for advection in (True, False):
+                instrumentation = Instrumentation()
+                instrumented = InstrumentedDerivative(problem_specification, instrumentation, advection)(state_array, 1.5).copy()
+                np.testing.assert_array_equal(instrumented, CompiledDerivative(problem_specification, advection)(state_array, 1.5))
+                self.assertEqual(instrumentation.summary["derivative"]["calls"], 1)
+
+    def test_rejected_steps(self):
+        '''Checks the rejected steps are inferred for RK45, counted by the multirate solver and unknown for Radau, and the results are those of an uninstrumented run'''
+
+        for solver, source in (("RK45", "inferred"), ("multirate", "solver"), ("Radau", "unknown")):
+            problem_specification = make_problem(["solver " + solver], {"n_z": 5, "simulated_time": 2})
+            instrumentation = Instrumentation()
+            instrumented = calculate_future_states(make_initial_state(problem_specification), problem_specification, instrumentation=instrumentation)
+            plain = calculate_future_states(make_initial_state(problem_specification), problem_specification)
+
+            rejected_steps = instrumentation.summary["rejected_steps"]
+            self.assertEqual(rejected_steps["source"], source)
+            self.assertEqual(rejected_steps["count"] is None, source == "unknown")
+            np.testing.assert_array_equal(instrumented.arrays, plain.arrays)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+from input_reader import parse_content
+from compiled_derivative import CompiledDerivative
+from derivative import derivative
+from jacobian import Jacobian
+import numpy as np
+import os
+import unittest
+
+# The sample input, which each test changes with extra lines and overrides
+sample_input_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Inputs", "sample_input1.txt")
+
+def make_problem(extra_lines=(), overrides=None):
+    '''Reads the sample input with some lines added and some values replaced
+    extra_lines -- The lines added to the end of the input ([str])
+    overrides -- Values which replace those in the input, as described in input_reader.apply_overrides (default None)({str: value})
+    [return] -- The specification of the problem (ProblemSpecification)'''
+
+    with open(sample_input_path, "rb") as f:
+        content = f.read()
+    content += ("\n" + "\n".join(extra_lines) + "\n").encode()
+    return(parse_content(content, overrides))
+
+def make_state_array(problem_specification):
+    '''Makes a full state in the middle of a transient, with the temperatures varying with height and channel so that every term of the equations contributes
+    problem_specification -- The specification of the problem (ProblemSpecification)
+    [return] -- The state (np.array[float])'''
+
+    shape = problem_specification.temperature_shape
+    profile = np.linspace(0, 1, np.prod(shape)).reshape(shape)
+    return(np.concatenate([[1e10], 1e10 * np.asarray(problem_specification.betas) / np.asarray(problem_specification.lambdas),
+                           (problem_specification.temperature_zero + 150 * profile + 20 * profile ** 2).ravel(),
+                           (problem_specification.temperature_zero + 60 * profile).ravel()]))
+
+def central_differences(function, array, time):
+    '''Estimates the Jacobian of a function by central differences, with a step in each variable relative to its size
+    function -- Calculates the rate of change from the array and time (function(np.array[float], float) -> np.array[float])
+    array -- The variables the Jacobian is found at (np.array[float])
+    time -- The time the Jacobian is found at (s)(float)
+    [return] -- The estimated Jacobian (np.array[float])'''
+
+    jacobian = np.zeros((len(array), len(array)))
+    for i_variable in range(len(array)):
+        step = 1e-6 * (abs(array[i_variable]) + 1)
+        above, below = array.copy(), array.copy()
+        above[i_variable] += step
+        below[i_variable] -= step
+        jacobian[:, i_variable] = (np.array(function(above, time)) - np.array(function(below, time))) / (2 * step)
+    return(jacobian)
+
+class TestJacobian(unittest.TestCase):
+    '''Compares the analytic Jacobian with central differences of the rate of change, and the compiled rate of change with the original'''
+
+    # The time the Jacobian is found at, which is during the ramp of the driving reactivity of the sample input
+    time = 1.5
+
+    def assert_jacobians_match(self, analytic, estimated):
+        '''Checks two Jacobians agree to within the error of the central differences, which is relative to each entry but may be as large as a small fraction of the largest entry of its row
+        self -- The test being run (TestJacobian)
+        analytic -- The analytic Jacobian (np.array[float])
+        estimated -- The Jacobian estimated by central differences (np.array[float])'''
+
+        row_scales = np.max(np.abs(estimated), axis=1, keepdims=True)
+        self.assertTrue(np.all(np.abs(analytic - estimated) <= 1e-6 * np.abs(estimated) + 1e-9 * row_scales))
+
+    def check_problem(self, problem_specification):
+        '''Checks the Jacobian of a problem, with and without the advection of the coolant, and the sparsity pattern covers it
+        self -- The test being run (TestJacobian)
+        problem_specification -- The specification of the problem (ProblemSpecification)'''
+
+        state_array = make_state_array(problem_specification)
+        for advection in (True, False):
+            jacobian = Jacobian(problem_specification, advection)
+            analytic = jacobian.dense(state_array, self.time)
+            self.assert_jacobians_match(analytic, central_differences(CompiledDerivative(problem_specification, advection), state_array, self.time))
+            self.assertTrue(np.all(jacobian.sparsity.toarray()[analytic != 0] == 1))
+
+    def check_derivatives_match(self, problem_specification):
+        '''Checks the compiled rate of change is the same as that of derivative
+        self -- The test being run (TestJacobian)
+        problem_specification -- The specification of the problem (ProblemSpecification)'''
+
+        state_array = make_state_array(problem_specification)
+        for advection in (True, False):
+            compiled = CompiledDerivative(problem_specification, advection)(state_array, self.time)
+            np.testing.assert_allclose(compiled, derivative(state_array, self.time, problem_specification, advection), rtol=1e-12, atol=1e-12 * np.max(np.abs(compiled)))
+
+    def test_uniform_mesh(self):
+        '''Checks the Jacobian of the sample input with its discretisations of equal height'''
+        problem_specification = make_problem(overrides={"n_z": 8})
+        self.check_problem(problem_specification)
+        self.check_derivatives_match(problem_specification)
+
+    def test_geometric_mesh(self):
+        '''Checks the Jacobian with discretisations of different heights, whose conduction and advection depend on the heights'''
+        problem_specification = make_problem(["axial_mesh geometric", "axial_grading 0.2"], {"n_z": 8})
+        self.check_problem(problem_specification)
+        self.check_derivatives_match(problem_specification)
+
+    def test_several_channels(self):
+        '''Checks the Jacobian of a core with channels of different peaking, coolant speed and heat capacities'''
+        problem_specification = make_problem(["n_channels 3", "channel_peaking 1.2 1 0.8", "channel_speed_coolant 4 5 6",
+                                              "channel_heat_capacity_fuel 1e7 2e7 1.5e7", "channel_heat_capacity_coolant 1e7 0.5e7 2e7"], {"n_z": 5})
+        self.check_problem(problem_specification)
+        self.check_derivatives_match(problem_specification)
+
+    def test_reduced_kinetics(self):
+        '''Checks the Jacobians of the prompt jump and one group kinetics models against central differences of their reduced rates of change'''
+        for kinetics in ("prompt_jump", "one_group"):
+            problem_specification = make_problem(["kinetics " + kinetics], {"n_z": 6})
+            model = problem_specification.kinetics_model
+            solved_array = model.reduce(make_state_array(problem_specification)[np.newaxis, :])[0]
+
+            analytic = model.reduce_jacobian(Jacobian(problem_specification)).dense(solved_array, self.time)
+            estimated = central_differences(model.reduce_derivative(CompiledDerivative(problem_specification)), solved_array, self.time)
+            self.assert_jacobians_match(analytic, estimated)
+
+if __name__ == "__main__":
+    unittest.main()
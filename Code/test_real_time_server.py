@@ -0,0 +1,72 @@
+from input_reader import read_input
+from real_time_stepper import RealTimeStepper
+from real_time_server import start_server
+import asyncio
+import json
+import os
+import unittest
+
+class TestRealTimeServer(unittest.TestCase):
+    '''Round trips requests through the real time server with a client on the same machine'''
+    def setUp(self):
+        '''Makes a stepper of the sample input
+        self -- The test being run (TestRealTimeServer)'''
+
+        problem_specification = read_input(os.path.join(os.path.dirname(os.path.abspath(__file__)), "Inputs", "sample_input1.txt"))
+        self.stepper = RealTimeStepper(problem_specification)
+
+    def exchange(self, requests):
+        '''Starts a server on a free port, sends each request from a client over one connection and returns the replies
+        self -- The test being run (TestRealTimeServer)
+        requests -- The requests, which are sent as they are if they are strings and as JSON otherwise ([value])
+        [return] -- The replies ([{str: value}])'''
+
+        async def run_client():
+            server = await start_server(self.stepper, port=0)
+            async with server:
+                reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+                replies = []
+                for request in requests:
+                    line = request if isinstance(request, str) else json.dumps(request)
+                    writer.write((line + "\n").encode())
+                    await writer.drain()
+                    replies.append(json.loads(await asyncio.wait_for(reader.readline(), 60)))
+                writer.close()
+                await writer.wait_closed()
+            return(replies)
+
+        return(asyncio.run(run_client()))
+
+    def test_step_and_snapshot(self):
+        '''Steps the system and checks the replies follow the simulated time'''
+
+        replies = self.exchange([{"command": "step", "dt": 0.1}, {"command": "step", "dt": 0.1}, {"command": "snapshot"}, {"command": "statistics"}])
+
+        self.assertAlmostEqual(replies[0]["time"], 0.1)
+        self.assertAlmostEqual(replies[1]["time"], 0.2)
+        self.assertIn("latency", replies[0])
+        self.assertIn("deadline_missed", replies[0])
+        self.assertAlmostEqual(replies[2]["time"], 0.2)
+        self.assertEqual(replies[2]["power"], replies[1]["power"])
+        self.assertNotIn("error", replies[3])
+
+    def test_set_reactivity(self):
+        '''Sets the driving reactivity and checks it is held by the stepper'''
+
+        replies = self.exchange([{"command": "set_reactivity", "value": 0.5}, {"command": "step", "dt": 0.1}])
+
+        self.assertEqual(replies[0]["driving_reactivity"], 0.5)
+        self.assertNotIn("error", replies[1])
+
+    def test_bad_requests(self):
+        '''Sends requests which can't be carried out and checks each is answered with an error while the connection stays open'''
+
+        replies = self.exchange(["not json", "[1, 2]", {"command": "step", "dt": None}, {"command": "step"}, {"command": "step", "dt": "soon"},
+                                 {"command": "set_reactivity", "value": [1]}, {"command": "jump"}, {"command": "step", "dt": 0.1}])
+
+        for reply in replies[:-1]:
+            self.assertIn("error", reply)
+        self.assertAlmostEqual(replies[-1]["time"], 0.1)
+
+if __name__ == "__main__":
+    unittest.main()
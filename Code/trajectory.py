@@ -0,0 +1,208 @@
+from state import State
+import numpy as np
+
+class Trajectory:
+    '''The states of the system at a series of times, stored as a single array with one row per time in the order of StateVariables.as_array
+    The state variables are returned as views of the array, so no data is copied, and the derived values are calculated over every time at once
+    Indexing or iterating gives instances of State for individual times
+    A trajectory may be saved to a .npy file and loaded again as a memory map, so it doesn't have to fit in memory'''
+    def __init__(self, problem_specification, times, arrays, events=()):
+        '''Constructs the trajectory
+        self -- The instance of Trajectory being constructed (Trajectory)
+        problem_specification -- The specification of the system (ProblemSpecification)
+        times -- The times of the states (s)(np.array[float])
+        arrays -- The state arrays, one row per time (np.array[float])
+        events -- The time of each event which happened and the event, in the order they happened (default ())([(float, Event)])'''
+
+        # If the arrays don't match the times or the problem specification raise an exception
+        if arrays.shape != (len(times), problem_specification.n_state_variables):
+            raise ValueError("The arrays have shape {} but {} times of {} state variables were expected.".format(arrays.shape, len(times), problem_specification.n_state_variables))
+
+        self._problem_specification = problem_specification
+        self._times = times
+        self._arrays = arrays
+        self._events = list(events)
+
+        n_delayed = problem_specification.n_delayed
+        n_temperatures = problem_specification.n_temperatures
+        self._delayed = slice(1, n_delayed + 1)
+        self._fuel = slice(n_delayed + 1, n_delayed + n_temperatures + 1)
+        self._coolant = slice(n_delayed + n_temperatures + 1, n_delayed + 2 * n_temperatures + 1)
+        self._temperature_shape = (len(times),) + problem_specification.temperature_shape
+
+    @property
+    def problem_specification(self):
+        ''' Returns the specification of the system
+        self -- The trajectory the value is being returned from (Trajectory)
+        [return] -- The specification of the system (ProblemSpecification)'''
+        return(self._problem_specification)
+
+    @property
+    def times(self):
+        ''' Returns the times of the states
+        self -- The trajectory the value is being returned from (Trajectory)
+        [return] -- The times of the states (s)(np.array[float])'''
+        return(self._times)
+
+    @property
+    def arrays(self):
+        ''' Returns the state arrays
+        self -- The trajectory the value is being returned from (Trajectory)
+        [return] -- The state arrays, one row per time (np.array[float])'''
+        return(self._arrays)
+
+    @property
+    def events(self):
+        ''' Returns the events which happened during the simulation
+        self -- The trajectory the value is being returned from (Trajectory)
+        [return] -- The time of each event and the event, in the order they happened ([(float, Event)])'''
+        return(self._events)
+
+    @property
+    def n_neutron(self):
+        ''' Returns the number of neutrons at each time
+        self -- The trajectory the value is being returned from (Trajectory)
+        [return] -- A view of the number of neutrons (np.array[float])'''
+        return(self._arrays[:, 0])
+
+    @property
+    def n_delayed(self):
+        ''' Returns the number of each group of delayed neutron precursors at each time
+        self -- The trajectory the value is being returned from (Trajectory)
+        [return] -- A view of the number of precursors, one row per time (np.array[float])'''
+        return(self._arrays[:, self._delayed])
+
+    @property
+    def t_fuel(self):
+        ''' Returns the fuel temperature of each discretisation at each time
+        self -- The trajectory the value is being returned from (Trajectory)
+        [return] -- A view of the fuel temperatures, one row per time, which for several channels has one row per channel at each time (K)(np.array[float])'''
+        return(self._arrays[:, self._fuel].reshape(self._temperature_shape))
+
+    @property
+    def t_coolant(self):
+        ''' Returns the coolant temperature of each discretisation at each time
+        self -- The trajectory the value is being returned from (Trajectory)
+        [return] -- A view of the coolant temperatures, one row per time, which for several channels has one row per channel at each time (K)(np.array[float])'''
+        return(self._arrays[:, self._coolant].reshape(self._temperature_shape))
+
+    @property
+    def t_fuel_mean(self):
+        ''' Calculates the mean fuel temperature at each time
+        self -- The trajectory the value is being calculated for (Trajectory)
+        [return] -- The mean fuel temperature, weighted by the power of each channel (K)(np.array[float])'''
+        return(self._problem_specification.mean_temperature(self.t_fuel))
+
+    @property
+    def t_coolant_mean(self):
+        ''' Calculates the mean coolant temperature at each time
+        self -- The trajectory the value is being calculated for (Trajectory)
+        [return] -- The mean coolant temperature, weighted by the power of each channel (K)(np.array[float])'''
+        return(self._problem_specification.mean_temperature(self.t_coolant))
+
+    @property
+    def power(self):
+        ''' Calculates the power at each time
+        self -- The trajectory the value is being calculated for (Trajectory)
+        [return] -- The power (W)(np.array[float])'''
+        return(self.n_neutron * self._problem_specification.energy_fission / self._problem_specification.generation_time)
+
+    @property
+    def driving_reactivity(self):
+        ''' Calculates the driving reactivity at each time
+        self -- The trajectory the value is being calculated for (Trajectory)
+        [return] -- The reactivity contribution from the driving reactivity ($)(np.array[float])'''
+        return(np.asarray(self._problem_specification.reactivity_driving(np.asarray(self._times)), dtype=float))
+
+    @property
+    def fuel_reactivity(self):
+        ''' Calculates the reactivity due to the temperature of the fuel at each time
+        self -- The trajectory the value is being calculated for (Trajectory)
+        [return] -- The reactivity contribution from the fuel temperature ($)(np.array[float])'''
+        return(self._problem_specification.feedback_fuel * (self.t_fuel_mean - self._problem_specification.temperature_zero))
+
+    @property
+    def coolant_reactivity(self):
+        ''' Calculates the reactivity due to the temperature of the coolant at each time
+        self -- The trajectory the value is being calculated for (Trajectory)
+        [return] -- The reactivity contribution from the coolant temperature ($)(np.array[float])'''
+        return(self._problem_specification.feedback_coolant * (self.t_coolant_mean - self._problem_specification.temperature_zero))
+
+    def __len__(self):
+        ''' Returns the number of times in the trajectory
+        self -- The trajectory the value is being returned from (Trajectory)
+        [return] -- The number of times (int)'''
+        return(len(self._times))
+
+    def __getitem__(self, index):
+        ''' Returns the state at one of the times
+        self -- The trajectory the state is being returned from (Trajectory)
+        index -- The index of the time (int)
+        [return] -- The state at that time, which shares its data with the trajectory (State)'''
+        return(State(self._problem_specification, self._times[index], self._arrays[index]))
+
+    def __iter__(self):
+        ''' Iterates over the states at each of the times
+        self -- The trajectory being iterated over (Trajectory)
+        [return] -- The states in order of time (iterator[State])'''
+        for index in range(len(self._times)):
+            yield self[index]
+
+    def interpolate(self, times):
+        '''Calculates the states at other times by joining the states either side of each with a straight line, as for a trajectory with adaptive output, whose states are kept so that this follows the solution to within its tolerances
+        self -- The trajectory being interpolated (Trajectory)
+        times -- The times of the states, which must lie within the times of the trajectory (s)(np.array[float])
+        [return] -- The states at the times (Trajectory)'''
+
+        times = np.asarray(times, dtype=float)
+        own_times = np.asarray(self._times)
+
+        # If any of the times are outside those of the trajectory raise an exception
+        if len(times) > 0 and (times.min() < own_times[0] or times.max() > own_times[-1]):
+            raise ValueError("The times must lie between {}s and {}s.".format(own_times[0], own_times[-1]))
+
+        if len(own_times) == 1:
+            return(Trajectory(self._problem_specification, times, np.repeat(np.asarray(self._arrays), len(times), axis=0)))
+
+        # The index of the state before each time and how far each time is towards the next state
+        i_before = np.clip(np.searchsorted(own_times, times, side="right") - 1, 0, len(own_times) - 2)
+        fractions = ((times - own_times[i_before]) / (own_times[i_before + 1] - own_times[i_before]))[:, None]
+        arrays = (1 - fractions) * self._arrays[i_before] + fractions * self._arrays[i_before + 1]
+
+        return(Trajectory(self._problem_specification, times, arrays))
+
+    def save(self, file_path):
+        '''Saves the trajectory to a .npy file with the times in the first column followed by the state arrays
+        The file is written through a memory map, so the combined array is never held in memory
+        self -- The trajectory being saved (Trajectory)
+        file_path -- The path of the .npy file to be written (str)'''
+
+        data = np.lib.format.open_memmap(file_path, mode="w+", dtype=float, shape=(len(self._times), self._arrays.shape[1] + 1))
+        data[:, 0] = self._times
+        data[:, 1:] = self._arrays
+        data.flush()
+        del data
+
+def load_trajectory(file_path, problem_specification, mmap_mode="r"):
+    '''Loads a trajectory previously saved by Trajectory.save or written by TrajectoryWriter
+    If the file was not completely written, for example because the run was stopped, the rows which were written are loaded
+    file_path -- The path of the .npy file to be read (str)
+    problem_specification -- The specification of the system the trajectory was calculated for (ProblemSpecification)
+    mmap_mode -- The mode the file is memory mapped with, or None to read it all into memory (default "r")(str)
+    [return] -- The trajectory, whose arrays are views of the file (Trajectory)'''
+
+    # Read the header to find where the data starts and how many complete rows there are
+    with open(file_path, "rb") as f:
+        if np.lib.format.read_magic(f) == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+        f.seek(0, 2)
+        n_rows = min(shape[0], (f.tell() - offset) // (shape[1] * dtype.itemsize))
+
+    data = np.memmap(file_path, dtype=dtype, mode=mmap_mode or "r", offset=offset, shape=(n_rows, shape[1]))
+    if mmap_mode is None:
+        data = np.array(data)
+
+    return Trajectory(problem_specification, data[:, 0], data[:, 1:])
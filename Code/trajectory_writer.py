@@ -0,0 +1,49 @@
+import numpy as np
+
+class TrajectoryWriter():
+    '''Writes a trajectory to a .npy file one chunk of times at a time, so the whole trajectory is never held in memory
+    The header is written first for the full number of times and each chunk is appended and flushed as it arrives
+    If the run stops early the rows which were written can still be loaded with load_trajectory'''
+    def __init__(self, file_path, n_times, n_state_variables):
+        '''Opens the file and writes the header
+        self -- The instance of TrajectoryWriter being constructed (TrajectoryWriter)
+        file_path -- The path of the .npy file to be written (str)
+        n_times -- The total number of times which will be written (int)
+        n_state_variables -- The number of state variables at each time (int)'''
+
+        self._file = open(file_path, "wb")
+        np.lib.format.write_array_header_1_0(self._file, {"descr": np.lib.format.dtype_to_descr(np.dtype(float)), "fortran_order": False, "shape": (n_times, n_state_variables + 1)})
+        self._n_rows = 0
+
+    @property
+    def n_rows(self):
+        ''' Returns the number of times written so far
+        self -- The writer the value is being returned from (TrajectoryWriter)
+        [return] -- The number of times written (int)'''
+        return(self._n_rows)
+
+    def append(self, trajectory):
+        '''Appends the times and states of a chunk of a trajectory to the file
+        self -- The writer being used (TrajectoryWriter)
+        trajectory -- The chunk of the trajectory to be written (Trajectory)'''
+
+        data = np.column_stack((trajectory.times, trajectory.arrays)).astype(float, copy=False)
+        self._file.write(data.tobytes())
+        self._file.flush()
+        self._n_rows += len(data)
+
+    def close(self):
+        '''Closes the file
+        self -- The writer being closed (TrajectoryWriter)'''
+        self._file.close()
+
+    def __enter__(self):
+        '''Allows the writer to be used in a with statement, closing the file at the end of the block
+        self -- The writer being used (TrajectoryWriter)
+        [return] -- The writer (TrajectoryWriter)'''
+        return(self)
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        '''Closes the file at the end of a with statement
+        self -- The writer being used (TrajectoryWriter)'''
+        self.close()